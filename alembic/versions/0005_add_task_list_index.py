@@ -0,0 +1,39 @@
+"""add composite index for filtered keyset listing of tasks
+
+Revision ID: 0005_task_list_index
+Revises: 0004_retry_count
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_task_list_index"
+down_revision = "0004_retry_count"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add (status, type, created_at, id) index backing GET /tasks."""
+    # Build concurrently so the tasks table stays writable on large installs
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_tasks_status_type_created_at_id",
+            "tasks",
+            ["status", "type", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the composite listing index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_tasks_status_type_created_at_id",
+            table_name="tasks",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
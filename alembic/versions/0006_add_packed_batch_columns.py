@@ -0,0 +1,30 @@
+"""add packed int64 columns for batch pairs and results
+
+Revision ID: 0006_packed_batch
+Revises: 0005_task_list_index
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006_packed_batch"
+down_revision = "0005_task_list_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add pairs_packed/results_packed binary columns to tasks table."""
+    # Existing rows keep their JSON pairs/results, which the model still reads
+    op.add_column("tasks", sa.Column("pairs_packed", sa.LargeBinary(), nullable=True))
+    op.add_column("tasks", sa.Column("results_packed", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove packed batch columns from tasks table."""
+    op.drop_column("tasks", "results_packed")
+    op.drop_column("tasks", "pairs_packed")
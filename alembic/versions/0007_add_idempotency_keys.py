@@ -0,0 +1,37 @@
+"""add idempotency_keys table for safe task creation retries
+
+Revision ID: 0007_idempotency_keys
+Revises: 0006_packed_batch
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_idempotency_keys"
+down_revision = "0006_packed_batch"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create idempotency_keys table keyed by the client Idempotency-Key."""
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column(
+            "task_id",
+            sa.Integer(),
+            sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Drop idempotency_keys table."""
+    op.drop_table("idempotency_keys")
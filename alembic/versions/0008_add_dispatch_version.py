@@ -0,0 +1,30 @@
+"""add dispatch_version to tasks table
+
+Revision ID: 0008_dispatch_version
+Revises: 0007_idempotency_keys
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008_dispatch_version"
+down_revision = "0007_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add dispatch_version column to tasks table."""
+    op.add_column(
+        "tasks",
+        sa.Column("dispatch_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Remove dispatch_version column from tasks table."""
+    op.drop_column("tasks", "dispatch_version")
@@ -0,0 +1,50 @@
+"""add task_outbox table for transactional task dispatch
+
+Revision ID: 0009_task_outbox
+Revises: 0008_dispatch_version
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009_task_outbox"
+down_revision = "0008_dispatch_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create task_outbox table and its relay indexes."""
+    op.create_table(
+        "task_outbox",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, primary_key=True),
+        sa.Column(
+            "task_id",
+            sa.Integer(),
+            sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("dispatched_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # Partial index keeps the relay scan proportional to the undispatched backlog
+    op.create_index(
+        "ix_task_outbox_undispatched",
+        "task_outbox",
+        ["id"],
+        postgresql_where=sa.text("dispatched_at IS NULL"),
+    )
+    op.create_index("ix_task_outbox_dispatched_at", "task_outbox", ["dispatched_at"])
+    op.create_index("ix_task_outbox_task_id", "task_outbox", ["task_id"])
+
+
+def downgrade() -> None:
+    """Drop task_outbox table."""
+    op.drop_index("ix_task_outbox_task_id", table_name="task_outbox")
+    op.drop_index("ix_task_outbox_dispatched_at", table_name="task_outbox")
+    op.drop_index("ix_task_outbox_undispatched", table_name="task_outbox")
+    op.drop_table("task_outbox")
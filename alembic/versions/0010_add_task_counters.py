@@ -0,0 +1,122 @@
+"""add trigger-maintained task_counters table
+
+Revision ID: 0010_task_counters
+Revises: 0009_task_outbox
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0010_task_counters"
+down_revision = "0009_task_outbox"
+branch_labels = None
+depends_on = None
+
+# Writers add to one of this many rows per key, picked by backend pid, so
+# concurrent workers rarely contend on the same counter row
+SHARDS = 16
+
+
+def _apply_deltas(deltas: str) -> str:
+    """Upsert grouped ``(status, type, priority, delta)`` rows in key order.
+
+    Sorting the upsert keeps row lock order identical across sessions that
+    share a shard, which rules out deadlocks between them.
+    """
+    return f"""
+        INSERT INTO task_counters (status, type, priority, shard, n)
+        SELECT status, type, priority, pg_backend_pid() % {SHARDS}, delta
+        FROM ({deltas}) deltas
+        WHERE delta <> 0
+        ORDER BY status, type, priority
+        ON CONFLICT (status, type, priority, shard)
+        DO UPDATE SET n = task_counters.n + EXCLUDED.n;
+    """
+
+
+COUNTER_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION task_counters_apply() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {_apply_deltas('''
+            SELECT status, type, priority, count(*) AS delta FROM new_rows
+            GROUP BY status, type, priority
+        ''')}
+    ELSIF TG_OP = 'DELETE' THEN
+        {_apply_deltas('''
+            SELECT status, type, priority, -count(*) AS delta FROM old_rows
+            GROUP BY status, type, priority
+        ''')}
+    ELSE
+        {_apply_deltas('''
+            SELECT status, type, priority, sum(delta) AS delta FROM (
+                SELECT status, type, priority, -1 AS delta FROM old_rows
+                UNION ALL
+                SELECT status, type, priority, 1 AS delta FROM new_rows
+            ) changes
+            GROUP BY status, type, priority
+        ''')}
+    END IF;
+    RETURN NULL;
+END;
+$$;
+"""
+
+TRIGGERS = {
+    "task_counters_insert": "AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows",
+    "task_counters_update": (
+        "AFTER UPDATE ON tasks "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    ),
+    "task_counters_delete": "AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    """Create task_counters, seed it and keep it current with triggers."""
+    op.create_table(
+        "task_counters",
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="taskstatus", create_type=False),
+            primary_key=True,
+        ),
+        sa.Column(
+            "type",
+            postgresql.ENUM(name="tasktype", create_type=False),
+            primary_key=True,
+        ),
+        sa.Column("priority", sa.Integer(), primary_key=True),
+        sa.Column("shard", sa.SmallInteger(), primary_key=True),
+        sa.Column("n", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+    # Block writers while seeding so no transition is counted twice or missed
+    op.execute("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        """
+        INSERT INTO task_counters (status, type, priority, shard, n)
+        SELECT status, type, priority, 0, count(*) FROM tasks
+        GROUP BY status, type, priority
+        """
+    )
+    op.execute(COUNTER_FUNCTION)
+    for name, timing in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {timing} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_apply()"
+        )
+
+
+def downgrade() -> None:
+    """Drop the counter triggers, function and table."""
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_counters_apply()")
+    op.drop_table("task_counters")
@@ -0,0 +1,111 @@
+"""move batch pairs and results into task_payloads
+
+Revision ID: 0011_task_payloads
+Revises: 0010_task_counters
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0011_task_payloads"
+down_revision = "0010_task_counters"
+branch_labels = None
+depends_on = None
+
+# Little-endian int64 bytes of a bigint, matching app.utils.columnar
+INT8LE_FUNCTION = r"""
+CREATE FUNCTION pg_temp.int8le(value bigint) RETURNS bytea
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT decode(
+        regexp_replace(
+            lpad(to_hex(value), 16, '0'),
+            '(..)(..)(..)(..)(..)(..)(..)(..)',
+            '\8\7\6\5\4\3\2\1'
+        ),
+        'hex'
+    )
+$$;
+"""
+
+
+def upgrade() -> None:
+    """Create task_payloads and move packed and legacy JSON payloads into it."""
+    op.create_table(
+        "task_payloads",
+        sa.Column(
+            "task_id",
+            sa.Integer(),
+            sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("pair_count", sa.Integer(), nullable=False),
+        sa.Column("pairs", sa.LargeBinary(), nullable=False),
+        sa.Column("results", sa.LargeBinary(), nullable=True),
+    )
+    # Out of line but uncompressed, so result slices only read the chunks
+    # they cover
+    op.execute(
+        "ALTER TABLE task_payloads "
+        "ALTER COLUMN pairs SET STORAGE EXTERNAL, "
+        "ALTER COLUMN results SET STORAGE EXTERNAL"
+    )
+
+    # Block writers while copying so no payload or result is lost
+    op.execute("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE")
+    op.execute(
+        """
+        INSERT INTO task_payloads (task_id, pair_count, pairs, results)
+        SELECT id, length(pairs_packed) / 16, pairs_packed, results_packed
+        FROM tasks WHERE pairs_packed IS NOT NULL
+        """
+    )
+    # Rows created before packing still hold JSON; pack them on the way
+    op.execute(INT8LE_FUNCTION)
+    op.execute(
+        """
+        INSERT INTO task_payloads (task_id, pair_count, pairs, results)
+        SELECT
+            t.id,
+            json_array_length(t.pairs),
+            coalesce((
+                SELECT string_agg(
+                    pg_temp.int8le(coalesce((p.pair->>'a')::bigint, 0))
+                    || pg_temp.int8le(coalesce((p.pair->>'b')::bigint, 0)),
+                    ''::bytea ORDER BY p.i
+                )
+                FROM json_array_elements(t.pairs) WITH ORDINALITY AS p(pair, i)
+            ), ''::bytea),
+            CASE WHEN t.results IS NOT NULL THEN coalesce((
+                SELECT string_agg(
+                    pg_temp.int8le(r.value::text::bigint), ''::bytea ORDER BY r.i
+                )
+                FROM json_array_elements(t.results) WITH ORDINALITY AS r(value, i)
+            ), ''::bytea) END
+        FROM tasks t
+        WHERE t.pairs_packed IS NULL AND json_typeof(t.pairs) = 'array'
+        """
+    )
+
+    op.drop_column("tasks", "results_packed")
+    op.drop_column("tasks", "pairs_packed")
+    op.drop_column("tasks", "results")
+    op.drop_column("tasks", "pairs")
+
+
+def downgrade() -> None:
+    """Move payloads back into packed tasks columns and drop task_payloads."""
+    op.add_column("tasks", sa.Column("pairs", sa.JSON(), nullable=True))
+    op.add_column("tasks", sa.Column("results", sa.JSON(), nullable=True))
+    op.add_column("tasks", sa.Column("pairs_packed", sa.LargeBinary(), nullable=True))
+    op.add_column("tasks", sa.Column("results_packed", sa.LargeBinary(), nullable=True))
+    op.execute(
+        """
+        UPDATE tasks SET pairs_packed = p.pairs, results_packed = p.results
+        FROM task_payloads p WHERE p.task_id = tasks.id
+        """
+    )
+    op.drop_table("task_payloads")
@@ -0,0 +1,132 @@
+"""range partition tasks by created_at
+
+Revision ID: 0012_partition_tasks
+Revises: 0011_task_payloads
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from datetime import datetime, timezone
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0012_partition_tasks"
+down_revision = "0011_task_payloads"
+branch_labels = None
+depends_on = None
+
+# Monthly partitions created beyond the current month; later ones are
+# created by the maintain_task_partitions beat job
+MONTHS_AHEAD = 2
+
+INDEXES = {
+    "ix_tasks_priority": "priority",
+    "ix_tasks_scheduled_for": "scheduled_for",
+    "ix_tasks_recurrence_rule_id": "recurrence_rule_id",
+    "ix_tasks_status_type_created_at_id": "status, type, created_at, id",
+}
+
+# Tables whose task_id referenced tasks; a partitioned tasks table can only
+# be referenced together with created_at, so the application cleans them up
+REFERENCING = ("idempotency_keys", "task_outbox", "task_payloads")
+
+TRIGGERS = {
+    "task_counters_insert": "AFTER INSERT ON tasks REFERENCING NEW TABLE AS new_rows",
+    "task_counters_update": (
+        "AFTER UPDATE ON tasks "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    ),
+    "task_counters_delete": "AFTER DELETE ON tasks REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def _month_start(moment: datetime) -> datetime:
+    """Get the start of the UTC month containing ``moment``."""
+    return moment.astimezone(timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    """Get the first day of the month ``months`` after ``month``."""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _create_partition(month: datetime):
+    """Create the tasks partition holding rows created during ``month``."""
+    upper = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE tasks_p{month:%Y_%m} PARTITION OF tasks "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+    )
+
+
+def _rebuild_tasks(partitioned: bool):
+    """Copy tasks into a new table of the other kind and swap it in.
+
+    Counter triggers are dropped for the copy, which moves rows without
+    changing any count, and recreated on the new table.
+    """
+    op.execute("LOCK TABLE tasks IN ACCESS EXCLUSIVE MODE")
+    for name in TRIGGERS:
+        op.execute(f"DROP TRIGGER {name} ON tasks")
+    for table in REFERENCING:
+        op.execute(
+            f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_task_id_fkey"
+        )
+
+    op.execute("ALTER TABLE tasks RENAME TO tasks_old")
+    op.execute(
+        "CREATE TABLE tasks (LIKE tasks_old INCLUDING DEFAULTS INCLUDING STORAGE)"
+        + (" PARTITION BY RANGE (created_at)" if partitioned else "")
+    )
+    if partitioned:
+        now = datetime.now(timezone.utc)
+        first = op.get_bind().exec_driver_sql("SELECT min(created_at) FROM tasks_old")
+        month = _month_start(min(first.scalar() or now, now))
+        last = _add_months(_month_start(now), MONTHS_AHEAD)
+        while month <= last:
+            _create_partition(month)
+            month = _add_months(month, 1)
+        op.execute("CREATE TABLE tasks_default PARTITION OF tasks DEFAULT")
+
+    op.execute("INSERT INTO tasks SELECT * FROM tasks_old")
+    op.execute("ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id")
+    op.execute("DROP TABLE tasks_old")
+
+    op.execute(
+        "ALTER TABLE tasks ADD CONSTRAINT tasks_pkey PRIMARY KEY "
+        + ("(id, created_at)" if partitioned else "(id)")
+    )
+    op.execute(
+        "ALTER TABLE tasks ADD CONSTRAINT tasks_recurrence_rule_id_fkey "
+        "FOREIGN KEY (recurrence_rule_id) REFERENCES recurrence_rules (id)"
+    )
+    for name, columns in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON tasks ({columns})")
+    for name, timing in TRIGGERS.items():
+        op.execute(
+            f"CREATE TRIGGER {name} {timing} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION task_counters_apply()"
+        )
+
+
+def upgrade() -> None:
+    """Turn tasks into a table range partitioned by month of created_at."""
+    _rebuild_tasks(partitioned=True)
+
+
+def downgrade() -> None:
+    """Turn tasks back into a plain table and restore the task_id foreign keys."""
+    _rebuild_tasks(partitioned=False)
+    for table in REFERENCING:
+        op.execute(
+            f"DELETE FROM {table} WHERE NOT EXISTS "
+            f"(SELECT 1 FROM tasks WHERE tasks.id = {table}.task_id)"
+        )
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_task_id_fkey "
+            "FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE"
+        )
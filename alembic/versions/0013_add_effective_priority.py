@@ -0,0 +1,27 @@
+"""add effective_priority to tasks table
+
+Revision ID: 0013_effective_priority
+Revises: 0012_partition_tasks
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0013_effective_priority"
+down_revision = "0012_partition_tasks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add effective_priority column to tasks table."""
+    op.add_column("tasks", sa.Column("effective_priority", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove effective_priority column from tasks table."""
+    op.drop_column("tasks", "effective_priority")
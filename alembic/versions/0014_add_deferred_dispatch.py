@@ -0,0 +1,47 @@
+"""add deferred flag for delayed dispatch of scheduled tasks
+
+Revision ID: 0014_deferred_dispatch
+Revises: 0013_effective_priority
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0014_deferred_dispatch"
+down_revision = "0013_effective_priority"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add deferred column to tasks and the partial index of deferred tasks.
+
+    Existing scheduled tasks already have their broker messages and are left
+    as they are.
+    """
+    op.add_column(
+        "tasks",
+        sa.Column("deferred", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    # Partitioned tables cannot be indexed concurrently; no row matches yet,
+    # so the build only scans
+    op.create_index(
+        "ix_tasks_deferred_scheduled_for",
+        "tasks",
+        ["scheduled_for"],
+        postgresql_where=sa.text("deferred"),
+    )
+
+
+def downgrade() -> None:
+    """Stage deferred tasks in the outbox and drop the deferred column."""
+    op.execute(
+        "INSERT INTO task_outbox (task_id, created_at) "
+        "SELECT id, now() FROM tasks WHERE deferred"
+    )
+    op.drop_index("ix_tasks_deferred_scheduled_for", table_name="tasks")
+    op.drop_column("tasks", "deferred")
@@ -0,0 +1,39 @@
+"""index idempotency_keys.created_at for purging expired keys
+
+Revision ID: 0015_idempotency_key_expiry
+Revises: 0014_deferred_dispatch
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0015_idempotency_key_expiry"
+down_revision = "0014_deferred_dispatch"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add the created_at index the outbox relay purges expired keys by."""
+    # Build concurrently so task creation keeps binding keys meanwhile
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_idempotency_keys_created_at",
+            "idempotency_keys",
+            ["created_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the created_at index."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_idempotency_keys_created_at",
+            table_name="idempotency_keys",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
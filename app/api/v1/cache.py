@@ -0,0 +1,14 @@
+import asyncio
+
+from fastapi import APIRouter
+
+from app.schemas.task import ResultCacheStats
+from app.services.result_cache import shared_stats
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get("/results", response_model=ResultCacheStats)
+async def result_cache_stats():
+    """Get worker result cache hit/miss counters aggregated across processes."""
+    return await asyncio.to_thread(shared_stats)
@@ -2,7 +2,8 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter
 
-from app.schemas.task import HealthResponse
+from app.db.session import database_pool_stats
+from app.schemas.task import DatabasePoolStats, HealthResponse
 
 router = APIRouter(tags=["health"])
 
@@ -11,3 +12,9 @@ router = APIRouter(tags=["health"])
 async def health_check():
     """Health check endpoint."""
     return HealthResponse(status="healthy", timestamp=datetime.now(timezone.utc))
+
+
+@router.get("/health/db", response_model=DatabasePoolStats)
+async def database_pool_health():
+    """Connection pool occupancy and checkout wait times of this API process."""
+    return database_pool_stats()
@@ -0,0 +1,16 @@
+import asyncio
+
+from fastapi import APIRouter
+
+from app.schemas.task import QueueStatsResponse
+from app.services.queue_stats import queue_stats
+
+router = APIRouter(prefix="/queues", tags=["queues"])
+
+
+@router.get("", response_model=QueueStatsResponse)
+async def get_queue_stats():
+    """Get backlog per priority queue: broker length, worker-held messages,
+    oldest waiting task and task counts per status. Cached for a few seconds.
+    """
+    return await asyncio.to_thread(queue_stats)
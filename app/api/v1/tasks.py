@@ -1,125 +1,393 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+import asyncio
+import json
+from typing import Awaitable, Callable, Optional
 
-from app.celery_app.tasks import enqueue_task
-from app.db.session import get_db
-from app.exceptions import InvalidTaskStatusError, TaskNotFoundError
-from app.models.task import TaskStatus, TaskType
+import orjson
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import get_async_db
+from app.exceptions import (
+    DuplicateIdempotencyKeyError,
+    InvalidTaskStatusError,
+    TaskNotFoundError,
+)
+from app.models.task import Task, TaskStatus, TaskType
 from app.schemas.task import (
+    BulkActionResponse,
+    BulkCreateResponse,
+    BulkReprioritize,
+    BulkTaskAction,
     RetryResponse,
     TaskCreateBatch,
+    TaskCreateBulk,
     TaskCreateSingle,
     TaskList,
     TaskRead,
+    TaskResultsPage,
     TaskUpdate,
+    TotalMode,
 )
-from app.services.task_service import TaskService
+from app.services.task_events import TERMINAL_STATUSES, get_event_hub, task_event
+from app.services.task_read_cache import get_task_read_cache
+from app.services.task_service import AsyncTaskService, parse_list_fields
+
+settings = get_settings()
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Client-supplied key making task creation safe to retry
+IdempotencyKeyHeader = Header(None, alias="Idempotency-Key", max_length=255)
+
+
+class TaskJSONResponse(ORJSONResponse):
+    """ORJSONResponse writing UTC datetimes with a ``Z`` suffix, like pydantic.
+
+    Used for rows returned without response model validation, so they render
+    exactly like the validated task responses.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+            | orjson.OPT_UTC_Z,
+        )
+
+
+async def _create_once(
+    service: AsyncTaskService,
+    idempotency_key: Optional[str],
+    create: Callable[[], Awaitable[Task]],
+) -> Task:
+    """Create a task unless its Idempotency-Key was already used.
+
+    A repeated key returns the originally created task without inserting or
+    enqueuing anything.
+    """
+    if idempotency_key:
+        existing = await service.get_by_idempotency_key(idempotency_key)
+        if existing:
+            return existing
+
+    try:
+        return await create()
+    except DuplicateIdempotencyKeyError:
+        return await service.get_by_idempotency_key(idempotency_key)
+
 
 @router.post("", response_model=TaskRead, status_code=201)
-def create_single(payload: TaskCreateSingle, db: Session = Depends(get_db)):
+async def create_single(
+    payload: TaskCreateSingle,
+    idempotency_key: Optional[str] = IdempotencyKeyHeader,
+    db: AsyncSession = Depends(get_async_db),
+):
     """Create a single task with two integers for addition."""
-    service = TaskService(db)
-    task = service.create_single(
-        a=payload.a,
-        b=payload.b,
-        priority=payload.priority or 2,
-        scheduled_for=payload.scheduled_for,
-        recurring=payload.recurring.dict() if payload.recurring else None,
+    service = AsyncTaskService(db)
+    return await _create_once(
+        service,
+        idempotency_key,
+        lambda: service.create_single(
+            a=payload.a,
+            b=payload.b,
+            priority=payload.priority or 2,
+            scheduled_for=payload.scheduled_for,
+            recurring=payload.recurring.dict() if payload.recurring else None,
+            idempotency_key=idempotency_key,
+        ),
     )
-    enqueue_task(task)
-    db.commit()
-    db.refresh(task)
-    return task
 
 
 @router.post("/batch", response_model=TaskRead, status_code=201)
-def create_batch(payload: TaskCreateBatch, db: Session = Depends(get_db)):
+async def create_batch(
+    payload: TaskCreateBatch,
+    idempotency_key: Optional[str] = IdempotencyKeyHeader,
+    db: AsyncSession = Depends(get_async_db),
+):
     """Create a batch task with multiple pairs of integers for addition."""
-    service = TaskService(db)
+    service = AsyncTaskService(db)
     pairs = [p.dict() for p in payload.pairs]
-    task = service.create_batch(
-        pairs=pairs,
-        priority=payload.priority or 2,
-        scheduled_for=payload.scheduled_for,
-        recurring=payload.recurring.dict() if payload.recurring else None,
+    return await _create_once(
+        service,
+        idempotency_key,
+        lambda: service.create_batch(
+            pairs=pairs,
+            priority=payload.priority or 2,
+            scheduled_for=payload.scheduled_for,
+            recurring=payload.recurring.dict() if payload.recurring else None,
+            idempotency_key=idempotency_key,
+        ),
     )
-    enqueue_task(task)
-    db.commit()
-    db.refresh(task)
-    return task
+
+
+@router.post("/bulk", response_model=BulkCreateResponse, status_code=201)
+async def create_bulk(
+    payload: TaskCreateBulk, db: AsyncSession = Depends(get_async_db)
+):
+    """Create many single and/or batch tasks with one multi-row insert."""
+    service = AsyncTaskService(db)
+    created = await service.create_bulk([spec.dict() for spec in payload.tasks])
+    return BulkCreateResponse(task_ids=[row.id for row in created])
+
+
+@router.post("/bulk/retry", response_model=BulkActionResponse)
+async def bulk_retry(payload: BulkTaskAction, db: AsyncSession = Depends(get_async_db)):
+    """Retry all failed tasks matching a filter with one set-based update."""
+    service = AsyncTaskService(db)
+    task_ids = await service.bulk_retry(payload.filter.dict())
+    return BulkActionResponse(affected=len(task_ids))
+
+
+@router.post("/bulk/reprioritize", response_model=BulkActionResponse)
+async def bulk_reprioritize(
+    payload: BulkReprioritize, db: AsyncSession = Depends(get_async_db)
+):
+    """Change the priority of all tasks matching a filter.
+
+    Waiting tasks are re-dispatched to their new queue; messages already
+    queued become stale instead of being revoked one by one.
+    """
+    service = AsyncTaskService(db)
+    task_ids = await service.bulk_reprioritize(payload.filter.dict(), payload.priority)
+    return BulkActionResponse(affected=len(task_ids))
+
+
+@router.post("/bulk/delete", response_model=BulkActionResponse)
+async def bulk_delete(
+    payload: BulkTaskAction, db: AsyncSession = Depends(get_async_db)
+):
+    """Delete all tasks matching a filter."""
+    service = AsyncTaskService(db)
+    task_ids = await service.bulk_delete(payload.filter.dict())
+    return BulkActionResponse(affected=len(task_ids))
 
 
 @router.get("", response_model=TaskList)
-def list_tasks(
+async def list_tasks(
     status: list[TaskStatus] = Query([TaskStatus.success]),
     type: TaskType = Query(TaskType.single, alias="type"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    total: TotalMode = Query(TotalMode.exact),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Get paginated list of tasks filtered by status and type."""
-    service = TaskService(db)
-    items, total = service.list_tasks(
-        status=status, type_=type, limit=limit, offset=offset
+    """Get paginated list of tasks filtered by status and type.
+
+    Pass the returned ``next_cursor`` as ``cursor`` for constant-cost deep
+    pagination, and ``total=capped`` or ``total=none`` to bound or skip counting.
+    ``fields`` is a comma separated subset of task fields to return, e.g.
+    ``fields=id,status,result`` to leave out batch ``pairs`` and ``results``.
+    """
+    service = AsyncTaskService(db)
+    items, count, next_cursor = await service.list_task_rows(
+        status=status,
+        type_=type,
+        fields=parse_list_fields(fields),
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        total_mode=total,
+    )
+    # Rows are already plain dicts; skip response model validation
+    return TaskJSONResponse(
+        {"items": items, "total": count, "next_cursor": next_cursor}
     )
-    return {"items": items, "total": total}
+
+
+@router.get("/events")
+async def stream_task_events(
+    task_id: list[int] = Query([]),
+    status: list[TaskStatus] = Query([]),
+    type: Optional[TaskType] = Query(None, alias="type"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Stream task status transitions as server-sent events.
+
+    Subscribe to specific tasks with repeated ``task_id`` parameters and/or
+    filter by ``status`` and ``type``. For a task id subscription the current
+    state of each task is sent first and the stream ends once every task has
+    reached a terminal status.
+    """
+    service = AsyncTaskService(db)
+    hub = get_event_hub()
+    watched = set(task_id)
+    heartbeat = settings.task_events_heartbeat_seconds
+
+    async def events():
+        async with hub.subscribe(
+            task_ids=watched, statuses={s.value for s in status}, type_=type
+        ) as subscription:
+            pending = set(watched)
+            if watched:
+                # Subscribed before reading, so no transition can slip between
+                for task in await service.get_many(watched):
+                    if subscription.matches(task_event(task, task.status)):
+                        yield _sse(task_event(task, task.status))
+                    if task.status in TERMINAL_STATUSES:
+                        pending.discard(task.id)
+                await db.close()
+                if not pending:
+                    return
+
+            while True:
+                event = await subscription.get(timeout=heartbeat)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield _sse(event)
+                if event["status"] in TERMINAL_STATUSES:
+                    pending.discard(event["task_id"])
+                    if watched and not pending:
+                        return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: dict) -> str:
+    """Format an event as one server-sent event frame."""
+    return f"event: status\ndata: {json.dumps(event)}\n\n"
+
+
+async def _wait_for_terminal(
+    service: AsyncTaskService, task_ids: list[int], timeout: float
+) -> list[Task]:
+    """Wait until every task is terminal or ``timeout`` expires, then re-read.
+
+    Waiting is driven by the task event stream; the database is read once
+    before waiting and once after, and no connection is held in between.
+    """
+    async with get_event_hub().subscribe(task_ids=set(task_ids)) as subscription:
+        tasks = await service.get_many(set(task_ids), with_payload=True)
+        pending = {t.id for t in tasks if t.status not in TERMINAL_STATUSES}
+        if not pending:
+            return tasks
+
+        await service.db.close()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while pending:
+            event = await subscription.get(timeout=max(deadline - loop.time(), 0))
+            if event is None:
+                break
+            if event["status"] in TERMINAL_STATUSES:
+                pending.discard(event["task_id"])
+
+    return await service.get_many(set(task_ids), with_payload=True)
+
+
+@router.get("/wait", response_model=list[TaskRead])
+async def wait_for_tasks(
+    ids: list[int] = Query(..., min_length=1, max_length=100),
+    wait: float = Query(30, ge=0, le=settings.task_wait_max_seconds),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Long-poll until all given tasks are terminal or ``wait`` seconds pass.
+
+    Returns the tasks that exist, in request order, with their latest state.
+    """
+    service = AsyncTaskService(db)
+    tasks = {t.id: t for t in await _wait_for_terminal(service, ids, wait)}
+    return [tasks[task_id] for task_id in dict.fromkeys(ids) if task_id in tasks]
 
 
 @router.get("/{task_id}", response_model=TaskRead)
-def get_task(task_id: int, db: Session = Depends(get_db)):
-    """Get a specific task by ID."""
-    service = TaskService(db)
-    task = service.get(task_id)
+async def get_task(
+    task_id: int,
+    wait: float = Query(0, ge=0, le=settings.task_wait_max_seconds),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a specific task by ID.
+
+    With ``wait`` > 0 the request long-polls: it returns as soon as the task
+    reaches ``success`` or ``failed``, or with its current state after
+    ``wait`` seconds.
+    """
+    service = AsyncTaskService(db)
+    cache = get_task_read_cache()
+    if cache is not None:
+        # Only terminal tasks are cached, so a hit never needs to wait
+        payload = await cache.get(task_id)
+        if payload:
+            return Response(content=payload, media_type="application/json")
+
+    if wait:
+        tasks = await _wait_for_terminal(service, [task_id], wait)
+        task = tasks[0] if tasks else None
+    else:
+        task = await service.get(task_id, with_payload=True)
     if not task:
         raise TaskNotFoundError(task_id)
+
+    if cache is not None and task.status in TERMINAL_STATUSES:
+        payload = TaskRead.model_validate(task, from_attributes=True).model_dump_json()
+        payload = payload.encode()
+        await cache.put(task.id, payload)
+        return Response(content=payload, media_type="application/json")
     return task
 
 
 @router.put("/{task_id}", response_model=TaskRead)
-def update_task(task_id: int, task_update: TaskUpdate, db: Session = Depends(get_db)):
+async def update_task(
+    task_id: int, task_update: TaskUpdate, db: AsyncSession = Depends(get_async_db)
+):
     """Update task properties, mainly priority."""
-    service = TaskService(db)
-    task = service.get(task_id)
+    service = AsyncTaskService(db)
+    task = await service.get(task_id, with_payload=True)
     if not task:
         raise TaskNotFoundError(task_id)
 
     if task_update.priority is not None:
-        task = service.update_priority(task, task_update.priority)
+        task = await service.update_priority(task, task_update.priority)
     else:
-        db.refresh(task)
+        await db.refresh(task)
 
     return task
 
 
 @router.delete("/{task_id}", status_code=204)
-def delete_task(task_id: int, db: Session = Depends(get_db)):
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
     """Delete a task permanently."""
-    service = TaskService(db)
-    task = service.get(task_id)
+    service = AsyncTaskService(db)
+    task = await service.get(task_id)
     if not task:
         raise TaskNotFoundError(task_id)
-    service.delete(task)
+    await service.delete(task)
+
+
+@router.get("/{task_id}/results", response_model=TaskResultsPage)
+async def get_task_results(
+    task_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a page of a batch task's results without loading the whole array."""
+    service = AsyncTaskService(db)
+    page = await service.get_results_page(task_id, offset, limit)
+    if page is None:
+        raise TaskNotFoundError(task_id)
+    return TaskJSONResponse(page)
 
 
 @router.post("/{task_id}/retry", response_model=RetryResponse)
-def retry_task(task_id: int, db: Session = Depends(get_db)):
+async def retry_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
     """Retry a failed task by resetting its status and re-enqueuing."""
-    service = TaskService(db)
-    task = service.get(task_id)
+    service = AsyncTaskService(db)
+    task = await service.get(task_id)
     if not task:
         raise TaskNotFoundError(task_id)
 
     if task.status not in [TaskStatus.failed]:
         raise InvalidTaskStatusError(task_id, task.status.value, "failed")
 
-    task.status = TaskStatus.pending
-    task.error_message = None
-    task.started_at = None
-    task.finished_at = None
-    db.commit()
-    enqueue_task(task)
-
+    await service.retry(task)
     return RetryResponse(task_id=task.id, retried=True)
@@ -1,6 +1,11 @@
+import os
+
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 
 from app.core.config import get_settings
+from app.db.session import dispose_inherited_pool
+from app.utils.metrics import mark_process_dead, start_exporter
 
 settings = get_settings()
 
@@ -16,6 +21,12 @@ celery_app.conf.update(
     task_acks_late=True,
     task_reject_on_worker_lost=True,
     worker_max_tasks_per_child=1000,
+    # Reserve one message per pool process, so queue weights and aged
+    # priorities take effect when a process frees up rather than at fetch
+    worker_prefetch_multiplier=1,
+    broker_transport_options={
+        "queue_order_strategy": "app.celery_app.scheduling:WeightedCycle"
+    },
     timezone="UTC",
     enable_utc=True,
     # Define priority queues
@@ -25,12 +36,56 @@ celery_app.conf.update(
             "queue": "medium_priority"
         },
         "app.celery_app.tasks.execute_task_low_priority": {"queue": "low_priority"},
+        "app.celery_app.tasks.execute_batch_high_priority": {"queue": "high_priority"},
+        "app.celery_app.tasks.execute_batch_medium_priority": {
+            "queue": "medium_priority"
+        },
+        "app.celery_app.tasks.execute_batch_low_priority": {"queue": "low_priority"},
         "app.celery_app.tasks.schedule_recurring_tasks": {"queue": "medium_priority"},
+        "app.celery_app.tasks.maintain_task_partitions": {"queue": "low_priority"},
+        "app.celery_app.tasks.dispatch_scheduled_tasks": {"queue": "high_priority"},
+        "app.celery_app.tasks.age_waiting_tasks": {"queue": "high_priority"},
     },
     beat_schedule={
         "scan-recurrences": {
             "task": "app.celery_app.tasks.schedule_recurring_tasks",
             "schedule": settings.recurrence_scan_interval_seconds,
-        }
+        },
+        "dispatch-scheduled-tasks": {
+            "task": "app.celery_app.tasks.dispatch_scheduled_tasks",
+            "schedule": settings.scheduled_dispatch_interval_seconds,
+        },
+        "age-waiting-tasks": {
+            "task": "app.celery_app.tasks.age_waiting_tasks",
+            "schedule": settings.priority_aging_interval_seconds,
+        },
+        "maintain-task-partitions": {
+            "task": "app.celery_app.tasks.maintain_task_partitions",
+            "schedule": settings.task_partition_maintenance_interval_seconds,
+        },
     },
 )
+
+
+@worker_process_init.connect
+def reset_database_pool(**kwargs):
+    """Give each prefork child its own connection pool."""
+    dispose_inherited_pool()
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """Serve metrics aggregated over all pool children from the main process.
+
+    Prefork children only share samples through PROMETHEUS_MULTIPROC_DIR,
+    which must be set (to a directory private to this worker) for them to
+    be included.
+    """
+    if settings.worker_metrics_port:
+        start_exporter(settings.worker_metrics_port)
+
+
+@worker_process_shutdown.connect
+def release_process_metrics(pid=None, **kwargs):
+    """Drop live gauges of an exiting pool child."""
+    mark_process_dead(pid or os.getpid())
@@ -0,0 +1,93 @@
+"""
+Outbox relay: publishes staged task dispatches to the broker.
+
+API requests, the recurrence scheduler and priority changes only write rows
+to ``task_outbox`` in their own transaction. This process drains those rows
+in batches, publishes each batch over one broker connection and marks the
+rows dispatched. Several relays can run side by side. Once a minute it also
+purges dispatched outbox rows and expired Idempotency-Keys.
+
+Run with: python -m app.celery_app.outbox_relay
+"""
+
+import signal
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.celery_app.tasks import enqueue_tasks, log
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.services.task_service import TaskService
+
+settings = get_settings()
+
+PURGE_INTERVAL_SECONDS = 60
+
+
+def relay_batch(service: TaskService, batch_size: int) -> int:
+    """Publish one batch of undispatched outbox rows and return its size.
+
+    Publishing happens while the rows are locked; if it fails the
+    transaction rolls back and the rows are retried on the next pass.
+    Rows staged for the same task collapse into one message, and any
+    remaining duplicate publish is dropped by the worker's claim step.
+    Rows of tasks that are still deferred (e.g. staged by a priority change)
+    are marked dispatched without publishing; the delayed dispatcher stages
+    those tasks again when they are due.
+    """
+    rows = service.pending_dispatches(batch_size)
+    if not rows:
+        service.db.commit()
+        return 0
+
+    enqueue_tasks({row.id: row for row in rows if not row.deferred}.values())
+    service.mark_dispatched([row.outbox_id for row in rows])
+    return len(rows)
+
+
+def run():
+    """Drain the outbox until SIGTERM/SIGINT."""
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    db = SessionLocal()
+    service = TaskService(db)
+    purged_at = time.monotonic()
+    log("Outbox relay started")
+
+    try:
+        while not stopping:
+            try:
+                sent = relay_batch(service, settings.outbox_batch_size)
+            except Exception as e:
+                log(f"Outbox relay batch failed: {e}")
+                db.rollback()
+                sent = 0
+
+            if time.monotonic() - purged_at > PURGE_INTERVAL_SECONDS:
+                purged_at = time.monotonic()
+                cutoff = datetime.now(timezone.utc) - timedelta(
+                    seconds=settings.outbox_retention_seconds
+                )
+                try:
+                    service.purge_dispatched(cutoff)
+                    service.purge_idempotency_keys()
+                except Exception as e:
+                    log(f"Outbox purge failed: {e}")
+                    db.rollback()
+
+            if sent < settings.outbox_batch_size:
+                time.sleep(settings.outbox_poll_interval_seconds)
+    finally:
+        db.close()
+        log("Outbox relay stopped")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,70 @@
+"""
+Weighted fair consumption of the priority queues by one worker pool.
+
+With ``WORKER_SCHEDULING=weighted`` a single worker consumes all priority
+queues. Kombu's Redis transport asks its queue cycle for the order in which
+BRPOP checks the queues, and reports the queue each message came from.
+``WeightedCycle`` orders the queues by smooth weighted round robin, so while
+every queue has a backlog they are served in proportion to
+``QUEUE_WEIGHTS`` (high:medium:low), and an idle queue's share goes to the
+others instead of sitting unused.
+
+Enabled through the ``queue_order_strategy`` broker transport option.
+"""
+
+from kombu.utils.scheduling import round_robin_cycle
+
+from app.core.config import get_settings
+
+QUEUES = ("high_priority", "medium_priority", "low_priority")
+
+
+def parse_queue_weights(spec: str) -> dict[str, int]:
+    """Parse a ``high:medium:low`` weight spec such as ``6:3:1``."""
+    weights = [int(weight) for weight in spec.split(":")]
+    if len(weights) != len(QUEUES) or min(weights) < 1:
+        raise ValueError(f"expected {len(QUEUES)} positive weights, got {spec!r}")
+    return dict(zip(QUEUES, weights))
+
+
+class WeightedCycle(round_robin_cycle):
+    """Queue cycle serving queues in proportion to their weights.
+
+    Every served message adds each queue's weight to its credit and charges
+    the served queue the weights added, so credits always sum to zero and
+    the queue owed the most service is checked first. Queues checked before
+    the one that delivered were empty; they lose their credit rather than
+    bank it and later starve the others with a burst. Queues without a
+    configured weight (e.g. the default queue) weigh 1.
+    """
+
+    def __init__(self, it=None):
+        super().__init__(it)
+        self.weights = parse_queue_weights(get_settings().queue_weights)
+        self.credit: dict[str, int] = {}
+        self.order: list[str] = []
+
+    def consume(self, n):
+        """Order the queues for the next BRPOP, most credit first."""
+        self.order = sorted(
+            self.items[:n],
+            key=lambda queue: (-self.credit.get(queue, 0), -self.weight(queue)),
+        )
+        return self.order
+
+    def rotate(self, last_used):
+        """Account for a message received from ``last_used``."""
+        if last_used not in self.order:
+            return last_used
+        served = self.order.index(last_used)
+        for queue in self.order[:served]:
+            self.credit[queue] = 0
+        contenders = self.order[served:]
+        for queue in contenders:
+            self.credit[queue] = self.credit.get(queue, 0) + self.weight(queue)
+        self.credit[last_used] -= sum(self.weight(queue) for queue in contenders)
+        return last_used
+
+    def weight(self, queue: str) -> int:
+        """Get the weight of ``queue``."""
+        return self.weights.get(queue, 1)
@@ -1,16 +1,31 @@
 import time
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
 
 from app.celery_app.app import celery_app
+from app.core.config import get_settings
 from app.db.session import SessionLocal
-from app.models.task import (
-    RecurrenceInterval,
-    RecurrenceRule,
-    Task,
-    TaskStatus,
-    TaskType,
-)
+from app.models.task import Task, TaskStatus, TaskType
+from app.services.result_cache import ResultCache, payload_key
+from app.services.task_events import publish_events, task_event
+from app.services.task_partitions import TaskPartitionService
+from app.services.task_read_cache import invalidate_task_reads_sync
 from app.services.task_service import TaskService
+from app.utils.columnar import pack_results, unpack_results
+from app.utils.metrics import (
+    SCHEDULER_TICK_DURATION,
+    TASK_EXECUTION_DURATION,
+    TASK_FAILURES,
+    TASK_QUEUE_WAIT,
+    TASK_RETRIES,
+)
+
+settings = get_settings()
+
+# Optional memoization of results by payload hash, see app.services.result_cache
+result_cache = ResultCache.from_settings() if settings.result_cache_enabled else None
 
 
 # Basic logging to stdout
@@ -25,7 +40,8 @@ MAX_RETRIES = 3
 RETRY_DELAY = 30
 MAX_RETRY_DELAY = 300
 
-# Queue delays for different priorities
+# Queue delays for different priorities, applied as a countdown at dispatch time
+# so workers are never blocked sleeping on them
 DELAYS = {
     "high_priority": 0,
     "medium_priority": 5,
@@ -33,6 +49,23 @@ DELAYS = {
 }
 
 
+def queue_delay(queue_name: str) -> int:
+    """Get the dispatch delay of a queue.
+
+    Weighted scheduling orders the queues by consumption weights instead;
+    delayed messages would be fetched early and held outside the weighting.
+    """
+    if settings.worker_scheduling == "weighted":
+        return 0
+    return DELAYS.get(queue_name, 0)
+
+
+def retry_delay(retry_count: int, queue_name: str) -> int:
+    """Get the backoff before retry ``retry_count + 1`` of a queue's message."""
+    backoff = min(RETRY_DELAY * (2**retry_count), MAX_RETRY_DELAY)
+    return backoff + queue_delay(queue_name)
+
+
 class TaskError(Exception):
     pass
 
@@ -40,30 +73,67 @@ class TaskError(Exception):
 @celery_app.task(
     bind=True, acks_late=True, max_retries=MAX_RETRIES, queue="high_priority"
 )
-def execute_task_high_priority(self, task_id: str):
-    """Execute task on high priority queue with no delay."""
-    return _execute_task_with_delay(self, task_id, DELAYS["high_priority"])
+def execute_task_high_priority(
+    self, task_id: str, dispatch_version: Optional[int] = None
+):
+    """Execute task on high priority queue."""
+    return _execute_task(self, task_id, dispatch_version)
 
 
 @celery_app.task(
     bind=True, acks_late=True, max_retries=MAX_RETRIES, queue="medium_priority"
 )
-def execute_task_medium_priority(self, task_id: str):
-    """Execute task on medium priority queue with 5s delay."""
-    return _execute_task_with_delay(self, task_id, DELAYS["medium_priority"])
+def execute_task_medium_priority(
+    self, task_id: str, dispatch_version: Optional[int] = None
+):
+    """Execute task on medium priority queue."""
+    return _execute_task(self, task_id, dispatch_version)
 
 
 @celery_app.task(
     bind=True, acks_late=True, max_retries=MAX_RETRIES, queue="low_priority"
 )
-def execute_task_low_priority(self, task_id: str):
-    """Execute task on low priority queue with 10s delay."""
-    return _execute_task_with_delay(self, task_id, DELAYS["low_priority"])
+def execute_task_low_priority(
+    self, task_id: str, dispatch_version: Optional[int] = None
+):
+    """Execute task on low priority queue."""
+    return _execute_task(self, task_id, dispatch_version)
+
 
+@celery_app.task(
+    bind=True, acks_late=True, max_retries=MAX_RETRIES, queue="high_priority"
+)
+def execute_batch_high_priority(self, items: list):
+    """Execute a micro-batch of tasks on high priority queue."""
+    return _execute_batch(self, items)
 
-def _execute_task_with_delay(self, task_id: str, queue_delay: int):
-    """Execute task with specified queue delay and retry logic."""
+
+@celery_app.task(
+    bind=True, acks_late=True, max_retries=MAX_RETRIES, queue="medium_priority"
+)
+def execute_batch_medium_priority(self, items: list):
+    """Execute a micro-batch of tasks on medium priority queue."""
+    return _execute_batch(self, items)
+
+
+@celery_app.task(
+    bind=True, acks_late=True, max_retries=MAX_RETRIES, queue="low_priority"
+)
+def execute_batch_low_priority(self, items: list):
+    """Execute a micro-batch of tasks on low priority queue."""
+    return _execute_batch(self, items)
+
+
+def _execute_task(self, task_id: str, dispatch_version: Optional[int] = None):
+    """Execute task with retry logic.
+
+    The task is claimed with a single conditional UPDATE, so a redelivered or
+    duplicate message for a task that is already running or finished, or a
+    message superseded by a newer dispatch version, is dropped instead of
+    executing the work twice.
+    """
     db = SessionLocal()
+    service = TaskService(db)
     task = None
     retry_count = self.request.retries
     queue_name = self.request.delivery_info.get("routing_key", "unknown")
@@ -73,52 +143,27 @@ def _execute_task_with_delay(self, task_id: str, queue_delay: int):
             f"Starting task {task_id} on {queue_name} queue (attempt {retry_count + 1})"
         )
 
-        if queue_delay > 0:
-            log(f"Task {task_id} applying {queue_delay}s delay")
-            time.sleep(queue_delay)
-
-        task = db.get(Task, task_id)
+        task = service.claim(int(task_id), retry_count, dispatch_version)
         if not task:
-            log(f"Task {task_id} not found")
-            raise TaskError(f"Task {task_id} not found")
-
-        if task.status not in (
-            TaskStatus.pending,
-            TaskStatus.queued,
-            TaskStatus.failed,
-        ):
-            log(f"Task {task_id} has invalid status: {task.status}")
-            raise TaskError(f"Task {task_id} has invalid status: {task.status}")
-
-        # Update task to running
-        task.status = TaskStatus.running
-        task.started_at = datetime.now(timezone.utc)
-        task.retry_count = retry_count
-        db.commit()
+            log(f"Task {task_id} is missing, already claimed or superseded, skipping")
+            return
+        publish_events([task_event(task, TaskStatus.running)])
+        _invalidate_reclaimed([task])
 
         # Execute the actual work
-        if task.type == TaskType.single:
-            _execute_single_task(task)
-        else:
-            _execute_batch_task(task)
+        outcome = _timed_outcome(task, queue_name)
 
         # Mark as successful
-        task.status = TaskStatus.success
-        task.finished_at = datetime.now(timezone.utc)
-        db.commit()
+        if service.finish(
+            task.id,
+            status=TaskStatus.success,
+            finished_at=datetime.now(timezone.utc),
+            **outcome,
+        ):
+            publish_events([task_event(task, TaskStatus.success)])
 
         log(f"Task {task_id} completed successfully on {queue_name} queue")
 
-    except TaskError as e:
-        log(f"Task {task_id} failed: {e}")
-        if task:
-            task.status = TaskStatus.failed
-            task.error_message = str(e)
-            task.finished_at = datetime.now(timezone.utc)
-            task.retry_count = retry_count
-            db.commit()
-        return
-
     except Exception as e:
         log(
             f"Task {task_id} failed on {queue_name} \
@@ -126,29 +171,161 @@ def _execute_task_with_delay(self, task_id: str, queue_delay: int):
         )
 
         if task:
-            task.status = (
-                TaskStatus.failed if retry_count >= MAX_RETRIES else TaskStatus.queued
-            )
-            task.error_message = str(e)
-            if retry_count >= MAX_RETRIES:
-                task.finished_at = datetime.now(timezone.utc)
-            task.retry_count = retry_count
-            db.commit()
+            db.rollback()
+            final = retry_count >= MAX_RETRIES
+            failure = {
+                "status": TaskStatus.failed if final else TaskStatus.queued,
+                "error_message": str(e),
+            }
+            if final:
+                failure["finished_at"] = datetime.now(timezone.utc)
+            if service.finish(task.id, **failure):
+                publish_events([task_event(task, failure["status"])])
 
         # Retry with backoff
         if retry_count < MAX_RETRIES:
-            retry_delay = min(RETRY_DELAY * (2**retry_count), MAX_RETRY_DELAY)
-            log(f"Task {task_id} will retry in {retry_delay} seconds")
-            raise self.retry(countdown=retry_delay, exc=e)
+            TASK_RETRIES.labels(queue_name).inc()
+            delay = retry_delay(retry_count, queue_name)
+            log(f"Task {task_id} will retry in {delay} seconds")
+            raise self.retry(countdown=delay, exc=e)
         else:
+            TASK_FAILURES.labels(queue_name).inc()
             log(f"Task {task_id} failed permanently after {MAX_RETRIES + 1} attempts")
             raise
     finally:
         db.close()
 
 
-def _execute_single_task(task: Task):
-    """Execute single addition task and store result."""
+def _execute_batch(self, items: list):
+    """Execute many tasks with one claim and one bulk outcome write.
+
+    ``items`` are ``[task_id, dispatch_version]`` pairs. Each task keeps the
+    single-task retry semantics: a task that fails is marked ``queued`` and
+    re-published on its own as a first retry with the usual backoff. If the
+    claim itself fails nothing was claimed, so the whole batch message is
+    retried instead.
+    """
+    db = SessionLocal()
+    service = TaskService(db)
+    queue_name = self.request.delivery_info.get("routing_key", "unknown")
+    started = time.perf_counter()
+    tasks = None
+    outcomes = []
+    failed = []
+
+    try:
+        tasks = service.claim_many([(int(i), int(v)) for i, v in items])
+        publish_events(task_event(task, TaskStatus.running) for task in tasks)
+        _invalidate_reclaimed(tasks)
+        now = datetime.now(timezone.utc)
+        for task in tasks:
+            try:
+                outcome = _timed_outcome(task, queue_name)
+            except Exception as e:
+                failed.append(task)
+                outcomes.append(_retry_values(task.id, e))
+            else:
+                outcomes.append(
+                    {
+                        "id": task.id,
+                        "status": TaskStatus.success,
+                        "finished_at": now,
+                        **outcome,
+                    }
+                )
+        service.finish_many(outcomes)
+
+    except Exception as e:
+        log(f"Batch of {len(items)} tasks failed on {queue_name} queue: {e}")
+        db.rollback()
+        if tasks is None:
+            # Acking would strand the unclaimed tasks as pending
+            delay = retry_delay(self.request.retries, queue_name)
+            log(f"Batch of {len(items)} tasks will retry in {delay} seconds")
+            raise self.retry(countdown=delay, exc=e)
+        # Hand every claimed task back to the single-task retry path
+        failed = tasks
+        outcomes = [_retry_values(task.id, e) for task in tasks]
+        service.finish_many(outcomes)
+    finally:
+        db.close()
+
+    statuses = {outcome["id"]: outcome["status"] for outcome in outcomes}
+    publish_events(task_event(task, statuses[task.id]) for task in tasks)
+
+    for task in failed:
+        _publish_retry(task, queue_name)
+    TASK_RETRIES.labels(queue_name).inc(len(failed))
+
+    elapsed = time.perf_counter() - started
+    log(
+        f"Batch of {len(tasks)}/{len(items)} tasks finished on {queue_name} queue "
+        f"in {elapsed:.3f}s ({len(failed)} to retry)"
+    )
+
+
+def _invalidate_reclaimed(tasks: list[Task]):
+    """Invalidate cached reads of claimed tasks that had already finished.
+
+    Only a task claimed out of ``failed`` still carries ``finished_at``; it
+    may be cached as terminal, while tasks coming from the queue never are.
+    """
+    reclaimed = [task.id for task in tasks if task.finished_at is not None]
+    if reclaimed:
+        invalidate_task_reads_sync(reclaimed)
+
+
+def _retry_values(task_id: int, error: Exception) -> dict:
+    """Outcome values for a first-attempt failure that will be retried."""
+    return {"id": task_id, "status": TaskStatus.queued, "error_message": str(error)}
+
+
+def _publish_retry(task: Task, queue_name: str):
+    """Re-publish a task that failed inside a batch as its first retry."""
+    get_task_function_by_priority(task.queue_priority).apply_async(
+        args=[str(task.id), task.dispatch_version],
+        countdown=RETRY_DELAY + queue_delay(queue_name),
+        retries=1,
+    )
+    log(f"Task {task.id} will retry in {RETRY_DELAY} seconds")
+
+
+def _timed_outcome(task: Task, queue_name: str) -> dict:
+    """Compute a claimed task's outcome, recording queue wait and duration."""
+    if not task.retry_count and task.started_at:
+        due = max(task.created_at, task.scheduled_for or task.created_at)
+        TASK_QUEUE_WAIT.labels(queue_name).observe(
+            max((task.started_at - due).total_seconds(), 0.0)
+        )
+
+    started = time.perf_counter()
+    try:
+        return _compute_outcome(task)
+    finally:
+        TASK_EXECUTION_DURATION.labels(queue_name, task.type.value).observe(
+            time.perf_counter() - started
+        )
+
+
+def _compute_outcome(task: Task) -> dict:
+    """Run the task kernel, reusing a memoized result for identical payloads."""
+    key = payload_key(task) if result_cache is not None else None
+    packed = result_cache.get(key) if key else None
+    if packed is None:
+        if task.type == TaskType.single:
+            packed = pack_results([_execute_single_task(task)])
+        else:
+            packed = _execute_batch_task(task)
+        if key:
+            result_cache.set(key, packed)
+
+    if task.type == TaskType.single:
+        return {"result": int(unpack_results(packed)[0])}
+    return {"results_packed": packed}
+
+
+def _execute_single_task(task: Task) -> int:
+    """Execute single addition task and return its result."""
     if task.a is None or task.b is None:
         raise ValueError("Task missing operands")
 
@@ -156,77 +333,160 @@ def _execute_single_task(task: Task):
     if task.a == 99 and task.b == 99:
         raise ValueError("Demo failure: 99+99 always fails")
 
-    task.result = task.a + task.b
+    return task.a + task.b
 
 
-def _execute_batch_task(task: Task):
-    """Execute batch addition task for multiple pairs of numbers."""
-    pairs = task.pairs or []
+def _execute_batch_task(task: Task) -> bytes:
+    """Execute batch addition as one vectorized kernel and return packed results."""
+    pairs = task.pair_array()
+    a, b = pairs[:, 0], pairs[:, 1]
 
     # Test failure case
-    for pair in pairs:
-        if pair.get("a") == 99 and pair.get("b") == 99:
-            raise ValueError("Demo failure: batch contains 99+99")
-
-    results = []
-    for pair in pairs:
-        result = pair.get("a", 0) + pair.get("b", 0)
-        results.append(result)
+    if np.any((a == 99) & (b == 99)):
+        raise ValueError("Demo failure: batch contains 99+99")
 
-    task.results = results
+    return pack_results(a + b)
 
 
 @celery_app.task(bind=True, queue="medium_priority")
 def schedule_recurring_tasks(self):
-    """Check for due recurring tasks and create new task instances."""
+    """Create task instances for due recurring rules, one locked chunk at a time.
+
+    Chunks are claimed with SKIP LOCKED, so several scheduler processes can
+    drain the due rules concurrently without firing any rule twice.
+    """
     db = SessionLocal()
+    service = TaskService(db)
+    chunk_size = settings.recurrence_scan_chunk_size
+    started = time.perf_counter()
+    fired = 0
     try:
-        now = datetime.now(timezone.utc)
-        rules = (
-            db.query(RecurrenceRule)
-            .filter(RecurrenceRule.active.is_(True), RecurrenceRule.next_run_at <= now)
-            .all()
+        while True:
+            count, _ = service.schedule_due_recurrences(
+                datetime.now(timezone.utc), chunk_size
+            )
+            fired += count
+            if count < chunk_size:
+                break
+
+    except Exception as e:
+        log(f"Error in schedule_recurring_tasks: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    SCHEDULER_TICK_DURATION.observe(elapsed)
+    if fired:
+        log(
+            f"Fired {fired} recurring rules in {elapsed:.2f}s "
+            f"({fired / max(elapsed, 1e-6):.0f} rules/s)"
         )
 
-        for rule in rules:
-            try:
-                service = TaskService(db)
-                payload = rule.base_payload
-                payload["priority"] = rule.priority
-
-                if "pairs" in payload:
-                    task = service.create_batch(
-                        pairs=payload["pairs"], priority=payload.get("priority", 2)
-                    )
-                else:
-                    task = service.create_single(
-                        a=payload.get("a", 0),
-                        b=payload.get("b", 0),
-                        priority=payload.get("priority", 2),
-                    )
-
-                log(f"Created recurring task {task.id} from rule {rule.id}")
-
-                # Update next run time
-                if rule.interval_type == RecurrenceInterval.minutely:
-                    rule.next_run_at = now + timedelta(minutes=rule.interval_value)
-                elif rule.interval_type == RecurrenceInterval.hourly:
-                    rule.next_run_at = now + timedelta(hours=rule.interval_value)
-                elif rule.interval_type == RecurrenceInterval.daily:
-                    rule.next_run_at = now + timedelta(days=rule.interval_value)
-
-                db.commit()
-                enqueue_task(task)
 
-            except Exception as e:
-                log(f"Failed to process recurring rule {rule.id}: {e}")
-                db.rollback()
+@celery_app.task(bind=True, queue="low_priority")
+def maintain_task_partitions(self):
+    """Create upcoming tasks partitions and drop expired ones.
+
+    Partitions older than ``task_retention_days`` whose tasks are all
+    terminal are detached, exported to ``task_archive_dir`` if set, and
+    dropped. A partition detached by an interrupted run is dropped by the
+    next one.
+    """
+    db = SessionLocal()
+    service = TaskPartitionService(db)
+    now = datetime.now(timezone.utc)
+    try:
+        for name in service.ensure_partitions(now, settings.task_partitions_ahead):
+            log(f"Created tasks partition {name}")
+
+        if settings.task_retention_days:
+            service.detach_expired(now - timedelta(days=settings.task_retention_days))
+        for name in service.detached_partitions():
+            dropped = service.drop_detached(name, settings.task_archive_dir or None)
+            log(f"Dropped tasks partition {name} with {dropped} tasks")
 
     except Exception as e:
-        log(f"Error in schedule_recurring_tasks: {e}")
+        log(f"Error in maintain_task_partitions: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, queue="high_priority")
+def dispatch_scheduled_tasks(self):
+    """Stage deferred tasks due within the dispatch lookahead, chunk by chunk.
+
+    Tasks scheduled further ahead are only kept in the database; staging
+    them shortly before they are due means the relay publishes them with a
+    countdown of at most ``scheduled_dispatch_lookahead_seconds``.
+    """
+    db = SessionLocal()
+    service = TaskService(db)
+    chunk_size = settings.scheduled_dispatch_chunk_size
+    horizon = datetime.now(timezone.utc) + timedelta(
+        seconds=settings.scheduled_dispatch_lookahead_seconds
+    )
+    released = 0
+    try:
+        while True:
+            count = len(service.release_scheduled(horizon, chunk_size))
+            released += count
+            if count < chunk_size:
+                break
+
+    except Exception as e:
+        log(f"Error in dispatch_scheduled_tasks: {e}")
+        db.rollback()
     finally:
         db.close()
 
+    if released:
+        log(f"Staged {released} scheduled tasks for dispatch")
+
+
+@celery_app.task(bind=True, queue="high_priority")
+def age_waiting_tasks(self):
+    """Raise the priority of tasks pending longer than priority_aging_seconds.
+
+    Each overdue task moves up one level per period, so under sustained
+    high priority load a low priority task reaches the high queue after two
+    periods at most.
+    """
+    if not settings.priority_aging_seconds:
+        return
+
+    db = SessionLocal()
+    service = TaskService(db)
+    chunk_size = settings.priority_aging_chunk_size
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.priority_aging_seconds
+    )
+    aged = 0
+    try:
+        while True:
+            count = len(service.age_waiting(cutoff, chunk_size))
+            aged += count
+            if count < chunk_size:
+                break
+
+    except Exception as e:
+        log(f"Error in age_waiting_tasks: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+    if aged:
+        log(f"Raised the priority of {aged} waiting tasks")
+
+
+def get_batch_function_by_priority(priority: int):
+    """Get the micro-batch executor function for a priority level."""
+    return {
+        1: execute_batch_high_priority,
+        3: execute_batch_low_priority,
+    }.get(priority, execute_batch_medium_priority)
+
 
 def get_task_function_by_priority(priority: int):
     """Get appropriate task executor function based on priority level."""
@@ -241,64 +501,74 @@ def get_task_function_by_priority(priority: int):
         return execute_task_medium_priority
 
 
-def enqueue_task(task: Task):
-    """Queue task for execution, handling immediate or scheduled execution."""
+def enqueue_tasks(tasks) -> int:
+    """Queue many tasks, publishing every message over one broker connection.
+
+    ``tasks`` may be ``Task`` instances or rows exposing ``id``,
+    ``queue_priority``, ``scheduled_for``, ``dispatch_version`` and
+    ``next_retries``. Tasks that are ready now are grouped per queue into
+    micro-batch messages of up to ``task_batch_size``; scheduled tasks and
+    tasks waiting for a retry keep one message each so they keep their own
+    countdown and retry count.
+    """
     now = datetime.now(timezone.utc)
-    task_function = get_task_function_by_priority(task.priority)
-    queue_name = {1: "high_priority", 2: "medium_priority", 3: "low_priority"}.get(
-        task.priority, "medium_priority"
+    batch_size = settings.task_batch_size
+    ready = {}
+    count = 0
+    with celery_app.producer_or_acquire() as producer:
+        for task in tasks:
+            count += 1
+            scheduled = task.scheduled_for and task.scheduled_for > now
+            if batch_size > 1 and not scheduled and not task.next_retries:
+                ready.setdefault(task.queue_priority, []).append(task)
+            else:
+                _publish_task(task, producer=producer)
+
+        for priority, group in ready.items():
+            while group:
+                chunk, group = group[:batch_size], group[batch_size:]
+                _publish_batch(priority, chunk, producer)
+
+    if count:
+        log(f"Enqueued {count} tasks in one broker session")
+    return count
+
+
+def _publish_batch(priority: int, tasks: list, producer=None):
+    """Publish one micro-batch message for ready tasks of the same priority."""
+    if len(tasks) == 1:
+        _publish_task(tasks[0], producer=producer)
+        return
+    queue_name = get_queue_name_by_priority(priority)
+    get_batch_function_by_priority(priority).apply_async(
+        args=[[[task.id, task.dispatch_version] for task in tasks]],
+        countdown=queue_delay(queue_name) or None,
+        producer=producer,
     )
 
-    if task.scheduled_for and task.scheduled_for > now:
-        delta = (task.scheduled_for - now).total_seconds()
-        task_function.apply_async(args=[str(task.id)], countdown=delta)
-        log(f"Task {task.id} scheduled for future execution on {queue_name} queue")
-    else:
-        task_function.apply_async(args=[str(task.id)])
-        log(f"Task {task.id} enqueued for immediate execution on {queue_name} queue")
-
 
-def migrate_task_to_priority_queue(task: Task, old_priority: int, new_priority: int):
-    """Move task between priority queues when priority changes."""
-    if task.status not in (TaskStatus.pending, TaskStatus.queued):
-        log(
-            f"Cannot migrate task {task.id} - \
-                status is {task.status}, not pending/queued"
-        )
-        return False
+def _publish_task(task: Task, producer=None) -> tuple[str, bool]:
+    """Publish the execution message for a task and return (queue, scheduled).
 
-    if old_priority == new_priority:
-        log(f"Task {task.id} priority unchanged ({old_priority}), no migration needed")
-        return True
-
-    old_queue = {1: "high_priority", 2: "medium_priority", 3: "low_priority"}.get(
-        old_priority, "medium_priority"
-    )
-    new_queue = {1: "high_priority", 2: "medium_priority", 3: "low_priority"}.get(
-        new_priority, "medium_priority"
+    The priority delay of the target queue is added to the countdown, so the
+    broker holds the message back instead of a worker sleeping on it.
+    """
+    now = datetime.now(timezone.utc)
+    task_function = get_task_function_by_priority(task.queue_priority)
+    queue_name = get_queue_name_by_priority(task.queue_priority)
+    countdown = queue_delay(queue_name)
+
+    scheduled = bool(task.scheduled_for and task.scheduled_for > now)
+    if scheduled:
+        countdown += (task.scheduled_for - now).total_seconds()
+
+    task_function.apply_async(
+        args=[str(task.id), task.dispatch_version],
+        countdown=countdown or None,
+        retries=task.next_retries,
+        producer=producer,
     )
-
-    log(f"Migrating task {task.id} from {old_queue} queue to {new_queue} queue")
-
-    try:
-        task_id_str = str(task.id)
-
-        # Try to revoke from all queues
-        for queue_name in ["high_priority", "medium_priority", "low_priority"]:
-            try:
-                celery_app.control.revoke(
-                    task_id_str, terminate=False, signal="SIGUSR1"
-                )
-            except Exception:
-                pass  # Continue if revoke fails
-
-        enqueue_task(task)
-        log(f"Successfully migrated task {task.id} to {new_queue} queue")
-        return True
-
-    except Exception as e:
-        log(f"Failed to migrate task {task.id} from {old_queue} to {new_queue}: {e}")
-        return False
+    return queue_name, scheduled
 
 
 def get_queue_name_by_priority(priority: int) -> str:
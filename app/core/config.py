@@ -16,10 +16,22 @@ class Settings(BaseSettings):
     postgres_password: str = "postgres"
     postgres_db: str = "tasks"
 
+    # Connection pooling, per process (API worker or Celery child)
+    db_pool_size: int = 5
+    db_max_overflow: int = 5
+    db_pool_timeout: int = 10  # Seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # Replace connections older than this
+    db_statement_timeout_ms: int = 30000  # 0 disables
+    # PgBouncer transaction mode: no local pool, no prepared statement caching
+    # and no startup options (set statement_timeout on the database role)
+    db_pgbouncer: bool = False
+
     # Redis / Broker
     redis_host: str = "redis"
     redis_port: int = 6379
 
+    redis_cache_db: int = 2  # Shared caches and counters, separate from broker
+
     # Celery
     celery_result_backend_db: int = 1
     celery_task_default_queue: str = "tasks"
@@ -28,10 +40,75 @@ class Settings(BaseSettings):
     recurrence_scan_interval_seconds: int = (
         10  # Reduced to 10 seconds for better demo responsiveness
     )
+    recurrence_scan_chunk_size: int = 500  # Rules locked and fired per transaction
+
+    # Outbox relay
+    outbox_batch_size: int = 500  # Dispatches published per relay transaction
+    outbox_poll_interval_seconds: float = 0.2  # Idle wait when the outbox is empty
+    outbox_retention_seconds: int = 3600  # Keep dispatched rows for inspection
+
+    # Worker scheduling: "dedicated" runs one worker per priority queue and
+    # holds lower priorities back with a fixed countdown; "weighted" has one
+    # worker pool consume all queues in proportion to queue_weights instead
+    worker_scheduling: str = "dedicated"
+    queue_weights: str = "6:3:1"  # high:medium:low share of consumption
+    # Pending tasks waiting longer than this are raised one priority level,
+    # once per period, by the age_waiting_tasks beat job; 0 disables aging.
+    # Off by default: dedicated workers never starve a queue, while weighted
+    # scheduling enables it (see docker-compose.weighted.yml)
+    priority_aging_seconds: int = 0
+    priority_aging_interval_seconds: int = 15
+    priority_aging_chunk_size: int = 1000  # Tasks aged per transaction
+
+    # Delayed dispatch: tasks scheduled further ahead than the lookahead stay
+    # in the database until the dispatch_scheduled_tasks beat job stages them,
+    # so the broker and workers never hold ETA messages longer than that
+    scheduled_dispatch_lookahead_seconds: int = 30
+    scheduled_dispatch_interval_seconds: int = 5
+    scheduled_dispatch_chunk_size: int = 1000  # Tasks staged per transaction
+
+    # Micro-batching: ready tasks relayed together share one worker message;
+    # 1 keeps one message per task. The relay poll interval bounds the wait.
+    task_batch_size: int = 100
+    # A task still running this long after its claim is assumed orphaned by a
+    # dead worker and may be claimed by a redelivered message; 0 disables
+    task_running_timeout_seconds: int = 600
+
+    # Result memoization
+    result_cache_enabled: bool = False
+    result_cache_ttl_seconds: int = 3600
+    result_cache_max_entries: int = 10000  # Per worker process
+
+    # Read-through cache of finished tasks for GET /tasks/{id}
+    task_read_cache_enabled: bool = True
+    task_read_cache_ttl_seconds: int = 300  # Shared Redis tier
+    task_read_cache_local_ttl_seconds: int = 30  # Bounds staleness if pub/sub lags
+    task_read_cache_max_entries: int = 10000  # Per API process
+
+    # Idempotency-Key header on task creation
+    idempotency_key_ttl_seconds: int = 86400
+
+    # Task status event stream
+    task_events_heartbeat_seconds: float = 15.0  # SSE keep-alive comment interval
+    task_wait_max_seconds: float = 60.0  # Upper bound for long-poll ``wait``
+
+    # Queue stats endpoint
+    queue_stats_ttl_seconds: float = 5.0  # Snapshot reuse across pollers
+    queue_stats_inspect_timeout: float = 0.5  # Wait for worker inspect replies
+
+    # Partitioning and retention of the tasks table
+    task_partitions_ahead: int = 2  # Future monthly partitions kept created
+    task_partition_maintenance_interval_seconds: int = 3600
+    task_retention_days: int = 0  # Drop terminal tasks older than this, 0 keeps all
+    task_archive_dir: str = ""  # Export dropped partitions here first if set
+
+    # Listing
+    list_total_cap: int = 10000  # Upper bound for total when total=capped
 
     # Logging and Monitoring
     log_level: str = "INFO"
     structured_logging: bool = True
+    worker_metrics_port: int = 0  # Celery worker /metrics exporter, 0 disables
 
     class Config:
         env_file = ".env"
@@ -45,11 +122,24 @@ class Settings(BaseSettings):
             f"{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
         )
 
+    @property
+    def async_database_url(self) -> str:
+        """Construct asyncpg PostgreSQL database URL from settings."""
+        return (
+            f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@"
+            f"{self.postgres_host}:{self.postgres_port}/{self.postgres_db}"
+        )
+
     @property
     def redis_url(self) -> str:
         """Construct Redis URL for broker from settings."""
         return f"redis://{self.redis_host}:{self.redis_port}/0"
 
+    @property
+    def redis_cache_url(self) -> str:
+        """Construct Redis URL for shared caches from settings."""
+        return f"redis://{self.redis_host}:{self.redis_port}/{self.redis_cache_db}"
+
     @property
     def celery_result_backend(self) -> str:
         """Construct Redis URL for Celery result backend from settings."""
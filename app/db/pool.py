@@ -0,0 +1,107 @@
+"""
+Connection pool classes that record checkout waits and connections in use.
+"""
+
+import threading
+import time
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.utils.metrics import (
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_IN_USE,
+)
+
+
+class CheckoutTimer:
+    """Thread-safe accumulator of pool checkout wait times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def record(self, elapsed: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += elapsed
+            self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_seconds_total": round(self.wait_seconds_total, 6),
+                "checkout_wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class _TimedCheckoutMixin:
+    """Times ``_do_get``, which blocks while the pool is exhausted."""
+
+    # Value of the ``engine`` label on pool metrics
+    metrics_label = "sync"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_timer = CheckoutTimer()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            entry = super()._do_get()
+        except Exception:
+            elapsed = time.perf_counter() - started
+            self.checkout_timer.record(elapsed, timed_out=True)
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_label).inc()
+            raise
+        elapsed = time.perf_counter() - started
+        self.checkout_timer.record(elapsed)
+        DB_POOL_CHECKOUT_WAIT.labels(self.metrics_label).observe(elapsed)
+        DB_POOL_IN_USE.labels(self.metrics_label).inc()
+        return entry
+
+    def _do_return_conn(self, record):
+        DB_POOL_IN_USE.labels(self.metrics_label).dec()
+        super()._do_return_conn(record)
+
+    def recreate(self):
+        pool = super().recreate()
+        # Keep counting across dispose(), which swaps in a recreated pool
+        pool.checkout_timer = self.checkout_timer
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool recording checkout wait times."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool recording checkout wait times."""
+
+    metrics_label = "async"
+
+
+def pool_stats(pool: Pool) -> dict:
+    """Summarize pool occupancy and checkout waits for monitoring."""
+    if isinstance(pool, NullPool):
+        # Connections are pooled externally (PgBouncer), nothing is held here
+        return {"pool": "null"}
+
+    stats = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    timer = getattr(pool, "checkout_timer", None)
+    if timer is not None:
+        stats.update(timer.snapshot())
+    return stats
@@ -0,0 +1,18 @@
+from functools import lru_cache
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import get_settings
+
+
+@lru_cache()
+def get_redis() -> redis.Redis:
+    """Get cached Redis client for shared caches and counters."""
+    return redis.Redis.from_url(get_settings().redis_cache_url)
+
+
+@lru_cache()
+def get_async_redis() -> aioredis.Redis:
+    """Get cached asyncio Redis client for the API process."""
+    return aioredis.Redis.from_url(get_settings().redis_cache_url)
@@ -1,18 +1,78 @@
+from uuid import uuid4
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.core.config import get_settings
+from app.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_stats
 
 settings = get_settings()
 
+
+def _pool_kwargs(poolclass) -> dict:
+    """Pool arguments for an engine, honouring the PgBouncer profile."""
+    if settings.db_pgbouncer:
+        return {"poolclass": NullPool}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+
+def _sync_connect_args() -> dict:
+    """psycopg2 connection arguments."""
+    if settings.db_pgbouncer or not settings.db_statement_timeout_ms:
+        return {}
+    return {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+
+
+def _async_connect_args() -> dict:
+    """asyncpg connection arguments."""
+    if settings.db_pgbouncer:
+        # Transaction pooling hands each transaction to any server connection,
+        # so prepared statements must be unnamed-per-use and never cached
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    if not settings.db_statement_timeout_ms:
+        return {}
+    return {
+        "server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}
+    }
+
+
 engine = create_engine(
-    settings.database_url, future=True, echo=False, pool_pre_ping=True
+    settings.database_url,
+    future=True,
+    echo=False,
+    connect_args=_sync_connect_args(),
+    **_pool_kwargs(TimedQueuePool),
 )
 
 SessionLocal = sessionmaker(
     bind=engine, autoflush=False, expire_on_commit=False, future=True
 )
 
+# Async engine used by the FastAPI routes so queries run on the event loop
+async_engine = create_async_engine(
+    settings.async_database_url,
+    echo=False,
+    connect_args=_async_connect_args(),
+    **_pool_kwargs(TimedAsyncAdaptedQueuePool),
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
@@ -20,10 +80,24 @@ class Base(DeclarativeBase):
     pass
 
 
-def get_db():
-    """Database session dependency for FastAPI endpoints."""
-    db = SessionLocal()
-    try:
+def dispose_inherited_pool():
+    """Drop pooled connections inherited from a parent process after fork.
+
+    ``close=False`` leaves the sockets to the parent that opened them; the
+    child starts with a fresh, empty pool.
+    """
+    engine.dispose(close=False)
+
+
+def database_pool_stats() -> dict:
+    """Pool occupancy and checkout wait times for this process."""
+    return {
+        "sync_pool": pool_stats(engine.pool),
+        "async_pool": pool_stats(async_engine.pool),
+    }
+
+
+async def get_async_db():
+    """Async database session dependency for FastAPI endpoints."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
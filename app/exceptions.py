@@ -34,3 +34,11 @@ class TaskValidationError(TaskError):
 
     def __init__(self, message: str, task_id: int = None):
         super().__init__(f"Task validation error: {message}", task_id)
+
+
+class DuplicateIdempotencyKeyError(TaskError):
+    """Raised when an Idempotency-Key was already used to create another task."""
+
+    def __init__(self, key: str):
+        self.key = key
+        super().__init__(f"Idempotency key '{key}' was already used")
@@ -1,12 +1,17 @@
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.responses import JSONResponse
 
 from app.api.v1.router import v1_router  # Versioned API only
 from app.core.config import get_settings
+from app.db.redis import get_async_redis
+from app.db.session import async_engine
 from app.exceptions import InvalidTaskStatusError, TaskError, TaskNotFoundError
+from app.services.task_events import get_event_hub
 from app.utils.logger import logger
+from app.utils.metrics import HTTP_REQUEST_DURATION, render_metrics
 
 settings = get_settings()
 
@@ -16,11 +21,16 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     logger.info(f"Starting {settings.app_name}")
+    # Listen for task events and cache invalidations from other processes
+    get_event_hub().start()
 
     yield
 
     # Shutdown
     logger.info(f"Shutting down {settings.app_name}")
+    await get_event_hub().close()
+    await get_async_redis().aclose()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -31,6 +41,24 @@ app = FastAPI(
 )
 
 
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe request latency labelled by the matched route template."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.labels(
+            request.method,
+            route.path if route is not None else "unmatched",
+            str(status),
+        ).observe(time.perf_counter() - started)
+
+
 # Exception handlers
 @app.exception_handler(TaskNotFoundError)
 async def task_not_found_handler(request: Request, exc: TaskNotFoundError):
@@ -60,6 +88,13 @@ async def task_error_handler(request: Request, exc: TaskError):
 app.include_router(v1_router)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus exposition of API metrics."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+
 @app.get("/")
 async def root():
     """Get API information and available endpoints."""
@@ -75,5 +110,6 @@ async def root():
             "docs": "/docs",
             "tasks": "/api/v1/tasks",
             "health": "/api/v1/health",
+            "metrics": "/metrics",
         },
     }
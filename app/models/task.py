@@ -2,10 +2,32 @@ import enum
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import JSON, DateTime, Enum, ForeignKey, Integer, Text
+import numpy as np
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    SmallInteger,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
+from app.utils.columnar import (
+    pack_pairs,
+    pack_results,
+    pairs_to_dicts,
+    unpack_pairs,
+    unpack_results,
+)
 
 
 def utc_now():
@@ -57,6 +79,22 @@ class Task(Base):
     """Database model for tasks that perform addition operations."""
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Matches the list filter (status, type) and keyset order (created_at, id)
+        Index(
+            "ix_tasks_status_type_created_at_id", "status", "type", "created_at", "id"
+        ),
+        # Only the future tasks the delayed dispatcher still has to stage
+        Index(
+            "ix_tasks_deferred_scheduled_for",
+            "scheduled_for",
+            postgresql_where=text("deferred"),
+        ),
+        # Monthly partitions, see migration 0012_partition_tasks and
+        # app.services.task_partitions. The database primary key is
+        # (id, created_at); ids alone stay unique through the sequence.
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     type: Mapped[TaskType] = mapped_column(
@@ -68,19 +106,33 @@ class Task(Base):
     priority: Mapped[int] = mapped_column(
         Integer, nullable=False, default=2, index=True
     )
+    # Raised above priority while the task waits too long, see
+    # TaskService.age_waiting; null while the task runs at its own priority
+    effective_priority: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     # Single task fields
     a: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     b: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     result: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
-    # Batch payload & results
-    pairs: Mapped[Optional[dict]] = mapped_column("pairs", JSON, nullable=True)
-    results: Mapped[Optional[dict]] = mapped_column("results", JSON, nullable=True)
+    # Batch pairs & results, kept out of the tasks row (see TaskPayload); never
+    # loaded implicitly, queries that need them use selectinload(Task.payload)
+    payload: Mapped[Optional["TaskPayload"]] = relationship(
+        "TaskPayload",
+        primaryjoin="Task.id == foreign(TaskPayload.task_id)",
+        lazy="raise",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
     scheduled_for: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True, index=True
     )
+    # Scheduled beyond the dispatch lookahead and not staged in the outbox yet,
+    # see TaskService.release_scheduled
+    deferred: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=False, server_default=text("false")
+    )
     started_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
@@ -97,6 +149,8 @@ class Task(Base):
 
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     retry_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Bumped on re-dispatch; workers drop messages carrying an older version
+    dispatch_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=utc_now, nullable=False
@@ -105,6 +159,54 @@ class Task(Base):
         DateTime(timezone=True), default=utc_now, onupdate=utc_now, nullable=False
     )
 
+    @property
+    def pairs(self) -> Optional[list[dict]]:
+        """Batch pairs in ``[{"a": .., "b": ..}]`` form."""
+        if self.type != TaskType.batch or self.payload is None:
+            return None
+        return pairs_to_dicts(unpack_pairs(self.payload.pairs))
+
+    @pairs.setter
+    def pairs(self, value: Optional[list[dict]]):
+        if value is None:
+            self.payload = None
+        elif self.payload is None:
+            self.payload = TaskPayload.from_pairs(value)
+        else:
+            self.payload.pairs = pack_pairs(value)
+            self.payload.pair_count = len(value)
+
+    @property
+    def results(self) -> Optional[list[int]]:
+        """Batch results as a list of ints."""
+        payload = self.payload if self.type == TaskType.batch else None
+        if payload is None or payload.results is None:
+            return None
+        return unpack_results(payload.results).tolist()
+
+    @results.setter
+    def results(self, value: Optional[list[int]]):
+        if self.payload is not None:
+            self.payload.results = pack_results(value) if value is not None else None
+
+    @property
+    def queue_priority(self) -> int:
+        """Priority whose queue the task is dispatched to."""
+        return self.effective_priority or self.priority
+
+    @property
+    def next_retries(self) -> int:
+        """Celery retry count of the task's next attempt.
+
+        A ``queued`` task is waiting for a retry of attempt ``retry_count``;
+        re-dispatching it must not reset its retry budget.
+        """
+        return self.retry_count + 1 if self.status == TaskStatus.queued else 0
+
+    def pair_array(self) -> np.ndarray:
+        """Batch pairs as an ``(n, 2)`` int64 array for vectorized execution."""
+        return unpack_pairs(self.payload.pairs if self.payload else b"")
+
     def mark_running(self):
         """Mark task as currently running and set start time."""
         self.status = TaskStatus.running
@@ -120,3 +222,84 @@ class Task(Base):
         self.status = TaskStatus.failed
         self.error_message = error
         self.finished_at = utc_now()
+
+
+class TaskPayload(Base):
+    """Packed pairs and results of a batch task.
+
+    Kept apart from ``tasks`` so status reads and updates touch a small row.
+    Both columns use uncompressed out-of-line storage (see migration
+    ``0011_task_payloads``), so a slice of ``results`` is read without
+    fetching the whole array.
+    """
+
+    __tablename__ = "task_payloads"
+
+    # No foreign key: tasks is partitioned (see AsyncTaskService.delete)
+    task_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    pair_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Packed as int64 arrays, see app.utils.columnar
+    pairs: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    results: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+
+    @classmethod
+    def from_pairs(cls, pairs: list[dict], **kwargs) -> "TaskPayload":
+        """Build a payload from pairs in ``[{"a": .., "b": ..}]`` form."""
+        return cls(pairs=pack_pairs(pairs), pair_count=len(pairs), **kwargs)
+
+
+class IdempotencyKey(Base):
+    """Database model mapping a client Idempotency-Key to the task it created."""
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    # No foreign key: tasks is partitioned (see AsyncTaskService.delete)
+    task_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utc_now, nullable=False, index=True
+    )
+
+
+class TaskOutbox(Base):
+    """Database model for task dispatches awaiting publication to the broker.
+
+    Rows are written in the same transaction as the task change they dispatch
+    and published by the outbox relay, so a broker outage delays tasks
+    instead of losing them.
+    """
+
+    __tablename__ = "task_outbox"
+    __table_args__ = (
+        Index(
+            "ix_task_outbox_undispatched",
+            "id",
+            postgresql_where=text("dispatched_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # No foreign key: tasks is partitioned (see AsyncTaskService.delete)
+    task_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utc_now, nullable=False
+    )
+    dispatched_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True, index=True
+    )
+
+
+class TaskCounter(Base):
+    """Number of tasks per status, type and priority, split over shards.
+
+    Maintained by statement-level triggers on ``tasks`` (see migration
+    ``0010_task_counters``); a key's count is the sum over its shards.
+    """
+
+    __tablename__ = "task_counters"
+
+    status: Mapped[TaskStatus] = mapped_column(Enum(TaskStatus), primary_key=True)
+    type: Mapped[TaskType] = mapped_column(Enum(TaskType), primary_key=True)
+    priority: Mapped[int] = mapped_column(Integer, primary_key=True)
+    shard: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    n: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -4,14 +4,23 @@ Task schemas for the task management API.
 
 from __future__ import annotations
 
+import enum
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, root_validator, validator
 
 from app.models.task import RecurrenceInterval, TaskStatus, TaskType
 
 Priority = int  # 1 (highest) .. 3 (lowest) priority levels
+Operand = int  # Batch operands and their sum are stored as packed int64
+INT64_MIN, INT64_MAX = -(2**63), 2**63 - 1
+
+
+class TotalMode(str, enum.Enum):
+    exact = "exact"  # sum of the matching task_counters rows
+    capped = "capped"  # that sum, limited to settings.list_total_cap
+    none = "none"  # skip counting, total is null
 
 
 class RecurringIn(BaseModel):
@@ -52,8 +61,14 @@ class TaskCreateSingle(TaskBase):
 
 
 class Pair(BaseModel):
-    a: int
-    b: int
+    a: Operand = Field(ge=INT64_MIN, le=INT64_MAX)
+    b: Operand = Field(ge=INT64_MIN, le=INT64_MAX)
+
+    @root_validator(skip_on_failure=True)
+    def sum_fits_int64(cls, values):
+        if not INT64_MIN <= values["a"] + values["b"] <= INT64_MAX:
+            raise ValueError("a + b must fit in a signed 64-bit integer")
+        return values
 
 
 class TaskCreateBatch(TaskBase):
@@ -62,6 +77,42 @@ class TaskCreateBatch(TaskBase):
     recurring: Optional[RecurringIn] = None
 
 
+class TaskCreateBulk(BaseModel):
+    tasks: List[Union[TaskCreateSingle, TaskCreateBatch]] = Field(
+        min_items=1, max_items=5000
+    )
+
+
+class TaskFilter(BaseModel):
+    """Tasks matching every given criterion; at least one is required."""
+
+    ids: Optional[List[int]] = Field(default=None, min_items=1, max_items=100000)
+    status: Optional[List[TaskStatus]] = Field(default=None, min_items=1)
+    type: Optional[TaskType] = None
+    priority: Optional[Priority] = Field(default=None, ge=1, le=3)
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    recurrence_rule_id: Optional[int] = None
+
+    @root_validator(skip_on_failure=True)
+    def require_criterion(cls, values):
+        if all(value is None for value in values.values()):
+            raise ValueError("at least one filter criterion is required")
+        return values
+
+
+class BulkTaskAction(BaseModel):
+    filter: TaskFilter
+
+
+class BulkReprioritize(BulkTaskAction):
+    priority: Priority = Field(ge=1, le=3)
+
+
+class BulkActionResponse(BaseModel):
+    affected: int
+
+
 class TaskUpdate(BaseModel):
     priority: Optional[Priority] = Field(default=None, ge=1, le=3)
 
@@ -78,6 +129,7 @@ class TaskRead(BaseModel):
     type: TaskType
     status: TaskStatus
     priority: int
+    effective_priority: Optional[int] = None
     a: Optional[int] = None
     b: Optional[int] = None
     result: Optional[int] = None
@@ -95,9 +147,44 @@ class TaskRead(BaseModel):
         orm_mode = True
 
 
+class TaskListItem(BaseModel):
+    """A listed task; only the fields selected with ``fields`` are present."""
+
+    id: Optional[int] = None
+    type: Optional[TaskType] = None
+    status: Optional[TaskStatus] = None
+    priority: Optional[int] = None
+    effective_priority: Optional[int] = None
+    a: Optional[int] = None
+    b: Optional[int] = None
+    result: Optional[int] = None
+    pairs: Optional[List[dict]] = None
+    results: Optional[List[int]] = None
+    scheduled_for: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    recurring: Optional[RecurrenceInfo] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+
+
 class TaskList(BaseModel):
-    items: List[TaskRead]
+    items: List[TaskListItem]
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class TaskResultsPage(BaseModel):
+    task_id: int
+    status: TaskStatus
     total: int
+    offset: int
+    results: Optional[List[int]] = None
+
+
+class BulkCreateResponse(BaseModel):
+    task_ids: List[int]
 
 
 class RetryResponse(BaseModel):
@@ -105,6 +192,44 @@ class RetryResponse(BaseModel):
     retried: bool
 
 
+class ResultCacheStats(BaseModel):
+    local_hits: int
+    redis_hits: int
+    misses: int
+
+
+class QueueStats(BaseModel):
+    name: str
+    priority: int
+    broker_length: Optional[int] = None
+    reserved: Optional[int] = None
+    scheduled: Optional[int] = None
+    oldest_waiting_seconds: Optional[float] = None
+    status_counts: Dict[str, int]
+
+
+class QueueStatsResponse(BaseModel):
+    generated_at: datetime
+    queues: List[QueueStats]
+
+
+class PoolStats(BaseModel):
+    pool: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+    checkouts: Optional[int] = None
+    checkout_timeouts: Optional[int] = None
+    checkout_wait_seconds_total: Optional[float] = None
+    checkout_wait_seconds_max: Optional[float] = None
+
+
+class DatabasePoolStats(BaseModel):
+    sync_pool: PoolStats
+    async_pool: PoolStats
+
+
 class HealthResponse(BaseModel):
     status: str
     timestamp: datetime
@@ -0,0 +1,154 @@
+"""
+Backlog and throughput snapshot of the priority queues.
+
+Combines broker queue lengths, worker-held messages (via Celery inspect) and
+per-status task counts from the database. Snapshots are cached in-process
+for ``queue_stats_ttl_seconds`` so polling dashboards cost one collection per
+interval regardless of how many clients poll.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from app.celery_app.app import celery_app
+from app.celery_app.tasks import get_queue_name_by_priority
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.models.task import Task, TaskCounter, TaskStatus
+from app.utils.logger import logger
+
+PRIORITIES = (1, 2, 3)
+# Statuses counted as waiting when computing the oldest waiting task
+WAITING_STATUSES = (TaskStatus.pending, TaskStatus.queued)
+
+_lock = threading.Lock()
+_cached: Optional[tuple[float, dict]] = None
+
+
+def queue_stats() -> dict:
+    """Return the cached snapshot, collecting a fresh one when it expired."""
+    global _cached
+    ttl = get_settings().queue_stats_ttl_seconds
+    with _lock:
+        if _cached is None or time.monotonic() - _cached[0] >= ttl:
+            snapshot = collect_queue_stats()
+            _cached = (time.monotonic(), snapshot)
+        return _cached[1]
+
+
+def collect_queue_stats() -> dict:
+    """Collect broker, worker and database figures for every priority queue."""
+    now = datetime.now(timezone.utc)
+    names = {priority: get_queue_name_by_priority(priority) for priority in PRIORITIES}
+    lengths = _broker_lengths(names.values())
+    if any(length is not None for length in lengths.values()):
+        reserved, scheduled = _worker_message_counts()
+    else:
+        # Broker unreachable: inspect would only retry until it times out
+        reserved, scheduled = None, None
+    counts, oldest = _database_counts(now)
+
+    queues = []
+    for priority, name in names.items():
+        waiting_since = oldest.get(priority)
+        queues.append(
+            {
+                "name": name,
+                "priority": priority,
+                "broker_length": lengths.get(name),
+                "reserved": reserved.get(name, 0) if reserved is not None else None,
+                "scheduled": scheduled.get(name, 0) if scheduled is not None else None,
+                "oldest_waiting_seconds": (
+                    max((now - waiting_since).total_seconds(), 0.0)
+                    if waiting_since
+                    else None
+                ),
+                "status_counts": counts.get(priority, {}),
+            }
+        )
+    return {"generated_at": now, "queues": queues}
+
+
+def _broker_lengths(names) -> dict[str, Optional[int]]:
+    """Ready messages per broker queue, all priority sub-queues included."""
+    lengths = dict.fromkeys(names)
+    try:
+        with celery_app.connection_for_read() as conn:
+            conn.ensure_connection(max_retries=1, interval_start=0)
+            channel = conn.default_channel
+            for name in lengths:
+                try:
+                    declared = channel.queue_declare(queue=name, passive=True)
+                except conn.channel_errors:
+                    # Not declared yet: no worker consumed and nothing published
+                    lengths[name] = 0
+                else:
+                    lengths[name] = declared.message_count
+    except Exception as e:
+        logger.warning(f"Queue stats: broker unavailable: {e}")
+    return lengths
+
+
+def _worker_message_counts() -> tuple[Optional[dict], Optional[dict]]:
+    """Messages prefetched (reserved) and held for an ETA (scheduled) by workers.
+
+    Returns ``(None, None)`` when no worker answers within the inspect timeout.
+    """
+    inspect = celery_app.control.inspect(
+        timeout=get_settings().queue_stats_inspect_timeout
+    )
+    try:
+        reserved_replies = inspect.reserved()
+        scheduled_replies = inspect.scheduled()
+    except Exception as e:
+        logger.warning(f"Queue stats: worker inspect failed: {e}")
+        return None, None
+
+    def by_queue(replies, unwrap) -> Optional[dict]:
+        if replies is None:
+            return None
+        counts: dict[str, int] = {}
+        for messages in replies.values():
+            for message in messages:
+                info = unwrap(message).get("delivery_info") or {}
+                queue = info.get("routing_key", "unknown")
+                counts[queue] = counts.get(queue, 0) + 1
+        return counts
+
+    return (
+        by_queue(reserved_replies, lambda m: m),
+        by_queue(scheduled_replies, lambda m: m.get("request", {})),
+    )
+
+
+def _database_counts(now: datetime) -> tuple[dict, dict]:
+    """Task counts per priority and status, and the oldest due waiting task.
+
+    Counts come from the trigger-maintained counters, which are keyed by the
+    task's own ``priority``; a task raised by aging is still counted there.
+    The oldest waiting task is looked up per queue the task is dispatched to,
+    so an aged task counts towards the queue it now waits in.
+    """
+    counts_stmt = (
+        select(TaskCounter.priority, TaskCounter.status, func.sum(TaskCounter.n))
+        .group_by(TaskCounter.priority, TaskCounter.status)
+        .having(func.sum(TaskCounter.n) != 0)
+    )
+    due = func.coalesce(Task.scheduled_for, Task.created_at)
+    queue_priority = func.coalesce(Task.effective_priority, Task.priority)
+    oldest_stmt = (
+        select(queue_priority, func.min(due))
+        .where(Task.status.in_(WAITING_STATUSES), due <= now)
+        .group_by(queue_priority)
+    )
+
+    counts: dict[int, dict[str, int]] = {}
+    with SessionLocal() as db:
+        for priority, status, count in db.execute(counts_stmt):
+            counts.setdefault(priority, {})[status.value] = int(count)
+        oldest = dict(db.execute(oldest_stmt).all())
+    return counts, oldest
@@ -0,0 +1,142 @@
+"""
+Content-addressed memoization of task results.
+
+Results are keyed by a hash of the normalized (packed) payload, so repeated
+operands - e.g. every run of a recurring rule - reuse a previous result
+instead of executing the kernel again. Lookups go through a per-process LRU
+tier first, then a shared Redis tier.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import redis
+
+from app.core.config import get_settings
+from app.db.redis import get_redis
+from app.models.task import Task, TaskType
+from app.utils.columnar import pack_pairs
+from app.utils.logger import logger
+
+STATS_KEY = "result_cache:stats"
+STATS_FLUSH_INTERVAL = 10  # seconds between pushes of local counters to Redis
+
+
+def payload_key(task: Task) -> Optional[str]:
+    """Hash a task's normalized payload, or None when it has no operands."""
+    if task.type == TaskType.batch:
+        body = b"batch:" + task.pair_array().tobytes()
+    elif task.a is None or task.b is None:
+        return None
+    else:
+        body = b"single:" + pack_pairs([{"a": task.a, "b": task.b}])
+    return "result:" + hashlib.sha256(body).hexdigest()
+
+
+class ResultCache:
+    """Two-tier cache of packed results with LRU size and TTL eviction."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, client: redis.Redis):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.client = client
+        self._local: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+        self._unflushed = dict.fromkeys(self._counts, 0)
+        self._flushed_at = time.monotonic()
+
+    @classmethod
+    def from_settings(cls) -> "ResultCache":
+        """Build a cache configured from application settings."""
+        settings = get_settings()
+        return cls(
+            max_entries=settings.result_cache_max_entries,
+            ttl_seconds=settings.result_cache_ttl_seconds,
+            client=get_redis(),
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Look up a result, promoting Redis hits into the local tier."""
+        value = self._get_local(key)
+        if value is not None:
+            self._count("local_hits")
+            return value
+
+        try:
+            value = self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Result cache lookup failed: {e}")
+            value = None
+
+        if value is None:
+            self._count("misses")
+            return None
+
+        self._set_local(key, value)
+        self._count("redis_hits")
+        return value
+
+    def set(self, key: str, value: bytes):
+        """Store a result in both tiers."""
+        self._set_local(key, value)
+        try:
+            self.client.set(key, value, ex=self.ttl_seconds)
+        except redis.RedisError as e:
+            logger.warning(f"Result cache store failed: {e}")
+
+    def stats(self) -> dict:
+        """Get this process's hit/miss counters and local tier size."""
+        with self._lock:
+            return {**self._counts, "local_entries": len(self._local)}
+
+    def _get_local(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: bytes):
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def _count(self, name: str):
+        """Bump a counter and periodically push the deltas to the shared hash."""
+        with self._lock:
+            self._counts[name] += 1
+            self._unflushed[name] += 1
+            if time.monotonic() - self._flushed_at < STATS_FLUSH_INTERVAL:
+                return
+            pending = self._unflushed
+            self._unflushed = dict.fromkeys(self._counts, 0)
+            self._flushed_at = time.monotonic()
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for field, amount in pending.items():
+                if amount:
+                    pipe.hincrby(STATS_KEY, field, amount)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Result cache stats flush failed: {e}")
+
+
+def shared_stats() -> dict:
+    """Get hit/miss counters aggregated across all worker processes."""
+    raw = get_redis().hgetall(STATS_KEY)
+    counts = {field.decode(): int(value) for field, value in raw.items()}
+    return {
+        name: counts.get(name, 0) for name in ("local_hits", "redis_hits", "misses")
+    }
@@ -0,0 +1,186 @@
+"""
+Task status events over Redis pub/sub.
+
+Workers publish every status transition to one channel. Each API process
+holds a single subscription to that channel and fans events out to in-memory
+asyncio queues, so idle streaming clients cost a queue each rather than a
+connection or a thread.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.db.redis import get_async_redis, get_redis
+from app.models.task import Task, TaskStatus, TaskType
+from app.services.task_read_cache import INVALIDATION_CHANNEL, get_task_read_cache
+from app.utils.logger import logger
+
+CHANNEL = "task-events"
+# Statuses after which a task emits no further events unless retried by hand
+TERMINAL_STATUSES = (TaskStatus.success, TaskStatus.failed)
+SUBSCRIBER_BUFFER = 256  # Events buffered per slow client before dropping
+READY_TIMEOUT = 2.0  # Seconds a new subscriber waits for the channel subscription
+
+
+def task_event(task: Task, status: TaskStatus) -> dict:
+    """Build the event payload announcing ``task`` entered ``status``."""
+    return {
+        "task_id": task.id,
+        "status": status.value,
+        "type": task.type.value,
+        "priority": task.priority,
+        "at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def publish_events(events: Iterable[dict]):
+    """Publish status events in one pipeline; failures are logged, not raised.
+
+    Events are a notification channel only - the database stays the source of
+    truth - so a Redis outage must never fail task execution.
+    """
+    events = list(events)
+    if not events:
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for event in events:
+            pipe.publish(CHANNEL, json.dumps(event))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Task events: publish failed: {e}")
+
+
+class Subscription:
+    """Buffered stream of events matching a task id set and/or filters."""
+
+    def __init__(
+        self,
+        task_ids: Optional[set[int]] = None,
+        statuses: Optional[set[str]] = None,
+        type_: Optional[TaskType] = None,
+    ):
+        self.task_ids = task_ids or None
+        self.statuses = statuses or None
+        self.type = type_.value if type_ else None
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=SUBSCRIBER_BUFFER)
+
+    def matches(self, event: dict) -> bool:
+        return (
+            (self.task_ids is None or event["task_id"] in self.task_ids)
+            and (self.statuses is None or event["status"] in self.statuses)
+            and (self.type is None or event["type"] == self.type)
+        )
+
+    def offer(self, event: dict):
+        """Queue an event without blocking, dropping the oldest when full."""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next matching event, or None when ``timeout`` elapses first."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class TaskEventHub:
+    """Per-process fan-out of the shared Redis event channel.
+
+    ``on_change`` is called with the id of every task that had an event or
+    an invalidation, e.g. to evict process-local caches.
+    """
+
+    def __init__(
+        self,
+        client: aioredis.Redis,
+        on_change: Optional[Callable[[int], None]] = None,
+    ):
+        self.client = client
+        self.on_change = on_change
+        self._subscriptions: set[Subscription] = set()
+        self._reader: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+
+    @asynccontextmanager
+    async def subscribe(self, **filters) -> AsyncIterator[Subscription]:
+        """Register a subscription for the duration of the ``async with``.
+
+        Waits briefly for the channel subscription to be live, so a caller
+        that reads task state after entering sees every later transition.
+        """
+        subscription = Subscription(**filters)
+        self._subscriptions.add(subscription)
+        self.start()
+        try:
+            await asyncio.wait_for(self._ready.wait(), READY_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Task events: channel not subscribed, events may lag")
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
+
+    def dispatch(self, event: dict):
+        """Deliver an event to every matching local subscription."""
+        if self.on_change is not None:
+            self.on_change(event["task_id"])
+        for subscription in tuple(self._subscriptions):
+            if subscription.matches(event):
+                subscription.offer(event)
+
+    def start(self):
+        """Start reading the channels, if not already running."""
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+    async def _read(self):
+        """Forward channel messages to subscriptions, reconnecting on errors."""
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL, INVALIDATION_CHANNEL)
+                self._ready.set()
+                async for message in pubsub.listen():
+                    try:
+                        self._handle(message)
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Task events: ignoring malformed event")
+            except redis.RedisError as e:
+                self._ready.clear()
+                logger.warning(f"Task events: subscription lost: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def _handle(self, message: dict):
+        data = json.loads(message["data"])
+        if message["channel"] == INVALIDATION_CHANNEL.encode():
+            if self.on_change is not None:
+                for task_id in data["task_ids"]:
+                    self.on_change(task_id)
+        else:
+            self.dispatch(data)
+
+
+@lru_cache()
+def get_event_hub() -> TaskEventHub:
+    """Get the event hub of this API process."""
+    cache = get_task_read_cache()
+    return TaskEventHub(
+        get_async_redis(), on_change=cache.evict_local if cache else None
+    )
@@ -0,0 +1,198 @@
+"""
+Monthly range partitions of the tasks table.
+
+``tasks`` is partitioned by ``created_at`` (see migration
+``0012_partition_tasks``) into ``tasks_pYYYY_MM`` tables plus
+``tasks_default``, which only catches rows outside every monthly partition.
+Partitions are created ahead of time; once a month is past the retention
+period and all its tasks are terminal, its partition is detached, optionally
+exported as gzip-compressed CSV, and dropped.
+"""
+
+import gzip
+import os
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+PARTITION_PATTERN = re.compile(r"^tasks_p(\d{4})_(\d{2})$")
+# Statuses a task no longer leaves on its own
+TERMINAL_STATUSES = ("success", "failed", "revoked")
+# Detaching locks the whole tasks table; give up rather than queue behind
+# long transactions and block every other query meanwhile
+DETACH_LOCK_TIMEOUT = "5s"
+
+# Rows of other tables belonging to the tasks of a partition
+_REFERENCING = ("task_payloads", "task_outbox", "idempotency_keys")
+
+
+def month_start(moment: datetime) -> datetime:
+    """Get the start of the UTC month containing ``moment``."""
+    return moment.astimezone(timezone.utc).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    """Get the first day of the month ``months`` after ``month``."""
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(month: datetime) -> str:
+    """Get the name of the partition holding tasks created in ``month``."""
+    return f"tasks_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Get the month a monthly partition covers, or None for other tables."""
+    match = PARTITION_PATTERN.match(name)
+    if not match:
+        return None
+    return datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+
+
+class TaskPartitionService:
+    """Creates, detaches and drops monthly partitions of the tasks table."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def attached_partitions(self) -> list[str]:
+        """Get the monthly partitions currently attached to tasks, oldest first."""
+        names = self.db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'tasks'::regclass"
+            )
+        ).scalars()
+        return sorted(name for name in names if partition_month(name))
+
+    def detached_partitions(self) -> list[str]:
+        """Get monthly partitions that were detached but not dropped yet."""
+        names = self.db.execute(
+            text(
+                "SELECT relname FROM pg_class "
+                "WHERE relkind = 'r' AND NOT relispartition "
+                "AND relnamespace = current_schema()::regnamespace "
+                "AND relname LIKE 'tasks\\_p%'"
+            )
+        ).scalars()
+        return sorted(name for name in names if partition_month(name))
+
+    def ensure_partitions(self, now: datetime, months_ahead: int) -> list[str]:
+        """Create the partitions of the current and next ``months_ahead`` months.
+
+        Returns the names of the partitions created.
+        """
+        attached = set(self.attached_partitions())
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(month_start(now), offset)
+            name = partition_name(month)
+            if name in attached:
+                continue
+            self.db.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF tasks FOR VALUES "
+                    f"FROM ('{month.isoformat()}') "
+                    f"TO ('{add_months(month, 1).isoformat()}')"
+                )
+            )
+            self.db.commit()
+            created.append(name)
+        return created
+
+    def detach_expired(self, cutoff: datetime) -> list[str]:
+        """Detach partitions ending before ``cutoff`` whose tasks are all terminal.
+
+        Each partition is detached in its own short transaction, which also
+        removes its tasks from ``task_counters`` since detaching fires no
+        delete triggers. Returns the names of the detached partitions.
+        """
+        detached = []
+        for name in self.attached_partitions():
+            if add_months(partition_month(name), 1) > cutoff:
+                break
+            # Cheap check first, repeated once the partition is locked
+            if self._has_live_tasks(name):
+                continue
+
+            self.db.execute(text(f"SET LOCAL lock_timeout = '{DETACH_LOCK_TIMEOUT}'"))
+            self.db.execute(text(f"ALTER TABLE tasks DETACH PARTITION {name}"))
+            if self._has_live_tasks(name):
+                self.db.rollback()
+                continue
+            self.db.execute(
+                text(
+                    "INSERT INTO task_counters (status, type, priority, shard, n) "
+                    f"SELECT status, type, priority, 0, -count(*) FROM {name} "
+                    "GROUP BY status, type, priority "
+                    "ORDER BY status, type, priority "
+                    "ON CONFLICT (status, type, priority, shard) "
+                    "DO UPDATE SET n = task_counters.n + EXCLUDED.n"
+                )
+            )
+            self.db.commit()
+            detached.append(name)
+        return detached
+
+    def drop_detached(self, name: str, archive_dir: Optional[str] = None) -> int:
+        """Drop a detached partition and the rows belonging to its tasks.
+
+        With ``archive_dir`` any tasks and their payloads are first exported
+        to ``<name>.tasks.csv.gz`` and ``<name>.task_payloads.csv.gz`` there.
+        The configured statement timeout is lifted for this transaction, as
+        exporting and deleting a month of tasks may well exceed it. Returns
+        the number of tasks dropped.
+        """
+        if partition_month(name) is None:
+            raise ValueError(f"not a tasks partition: {name}")
+
+        self.db.execute(text("SET LOCAL statement_timeout = 0"))
+        count = self.db.execute(text(f"SELECT count(*) FROM {name}")).scalar_one()
+        if archive_dir and count:
+            self._export(f"SELECT * FROM {name}", archive_dir, f"{name}.tasks")
+            self._export(
+                f"SELECT p.* FROM task_payloads p JOIN {name} t ON t.id = p.task_id",
+                archive_dir,
+                f"{name}.task_payloads",
+            )
+
+        for table in _REFERENCING:
+            self.db.execute(
+                text(f"DELETE FROM {table} WHERE task_id IN (SELECT id FROM {name})")
+            )
+        self.db.execute(text(f"DROP TABLE {name}"))
+        self.db.commit()
+        return count
+
+    def _has_live_tasks(self, name: str) -> bool:
+        """Check whether a partition holds any task that is not terminal."""
+        statuses = ", ".join(f"'{status}'" for status in TERMINAL_STATUSES)
+        return self.db.execute(
+            text(
+                f"SELECT EXISTS (SELECT 1 FROM {name} "
+                f"WHERE status NOT IN ({statuses}))"
+            )
+        ).scalar_one()
+
+    def _export(self, query: str, archive_dir: str, stem: str):
+        """Write the rows of ``query`` to ``<archive_dir>/<stem>.csv.gz``.
+
+        The file is written under a temporary name and renamed when complete,
+        so a partial export is never mistaken for a finished one.
+        """
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"{stem}.csv.gz")
+        cursor = self.db.connection().connection.cursor()
+        try:
+            with gzip.open(f"{path}.partial", "wb") as out:
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH CSV HEADER", out)
+        finally:
+            cursor.close()
+        os.replace(f"{path}.partial", path)
@@ -0,0 +1,162 @@
+"""
+Read-through cache of serialized terminal tasks.
+
+``success`` and ``failed`` tasks rarely change, so their ``TaskRead`` JSON is
+kept in a per-process LRU tier and a shared Redis tier. Every change to a
+task that may be cached invalidates it: the Redis entry is replaced by a
+short-lived tombstone and an invalidation message makes every API process
+drop its local copy. Cache fills use ``SET NX``, so a read that raced with an
+invalidation cannot store the stale payload over the tombstone.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import get_settings
+from app.db.redis import get_async_redis, get_redis
+from app.utils.logger import logger
+
+KEY_PREFIX = "task-read:"
+INVALIDATION_CHANNEL = "task-invalidations"
+# Long enough to outlive any read that started before the invalidation
+TOMBSTONE_SECONDS = 10
+# Task ids tombstoned per pipeline round trip and invalidation message
+INVALIDATION_CHUNK = 1000
+
+
+def cache_key(task_id: int) -> str:
+    return f"{KEY_PREFIX}{task_id}"
+
+
+def tombstone(pipe, task_id: int):
+    """Queue a tombstone for ``task_id`` on a Redis pipeline."""
+    pipe.set(cache_key(task_id), b"", ex=TOMBSTONE_SECONDS)
+
+
+def invalidation_chunks(task_ids: list[int]) -> Iterable[list[int]]:
+    """Split ``task_ids`` into chunks invalidated with one pipeline each."""
+    for start in range(0, len(task_ids), INVALIDATION_CHUNK):
+        end = start + INVALIDATION_CHUNK
+        yield task_ids[start:end]
+
+
+class TaskReadCache:
+    """Two-tier cache of ``TaskRead`` JSON payloads keyed by task id."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: int,
+        local_ttl_seconds: int,
+        client: aioredis.Redis,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.local_ttl_seconds = local_ttl_seconds
+        self.client = client
+        self._local: OrderedDict[int, tuple[float, bytes]] = OrderedDict()
+
+    @classmethod
+    def from_settings(cls) -> "TaskReadCache":
+        """Build a cache configured from application settings."""
+        settings = get_settings()
+        return cls(
+            max_entries=settings.task_read_cache_max_entries,
+            ttl_seconds=settings.task_read_cache_ttl_seconds,
+            local_ttl_seconds=settings.task_read_cache_local_ttl_seconds,
+            client=get_async_redis(),
+        )
+
+    async def get(self, task_id: int) -> Optional[bytes]:
+        """Cached payload for ``task_id``, promoting Redis hits locally."""
+        entry = self._local.get(task_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._local.move_to_end(task_id)
+                return entry[1]
+            del self._local[task_id]
+
+        try:
+            payload = await self.client.get(cache_key(task_id))
+        except redis.RedisError as e:
+            logger.warning(f"Task read cache: Redis get failed: {e}")
+            return None
+        if not payload:
+            # Missing or tombstoned
+            return None
+        self._store_local(task_id, payload)
+        return payload
+
+    async def put(self, task_id: int, payload: bytes):
+        """Fill the cache unless the task was invalidated in the meantime."""
+        try:
+            stored = await self.client.set(
+                cache_key(task_id), payload, ex=self.ttl_seconds, nx=True
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Task read cache: Redis set failed: {e}")
+            return
+        if stored:
+            self._store_local(task_id, payload)
+
+    async def invalidate(self, task_ids: Iterable[int]):
+        """Tombstone ``task_ids`` in Redis and evict them in every process."""
+        task_ids = list(task_ids)
+        for task_id in task_ids:
+            self.evict_local(task_id)
+        try:
+            for chunk in invalidation_chunks(task_ids):
+                pipe = self.client.pipeline(transaction=False)
+                for task_id in chunk:
+                    tombstone(pipe, task_id)
+                pipe.publish(INVALIDATION_CHANNEL, json.dumps({"task_ids": chunk}))
+                await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Task read cache: invalidation failed: {e}")
+
+    def evict_local(self, task_id: int):
+        """Drop the local copy of ``task_id``, if any."""
+        self._local.pop(task_id, None)
+
+    def _store_local(self, task_id: int, payload: bytes):
+        self._local[task_id] = (time.monotonic() + self.local_ttl_seconds, payload)
+        self._local.move_to_end(task_id)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+
+@lru_cache()
+def get_task_read_cache() -> Optional[TaskReadCache]:
+    """Get this process's task read cache, or None when disabled."""
+    if not get_settings().task_read_cache_enabled:
+        return None
+    return TaskReadCache.from_settings()
+
+
+async def invalidate_task_reads(task_ids: Iterable[int]):
+    """Invalidate cached reads of ``task_ids`` from async code."""
+    cache = get_task_read_cache()
+    if cache is not None:
+        await cache.invalidate(task_ids)
+
+
+def invalidate_task_reads_sync(task_ids: Iterable[int]):
+    """Invalidate cached reads of ``task_ids`` from workers and scripts."""
+    if not get_settings().task_read_cache_enabled:
+        return
+    task_ids = list(task_ids)
+    try:
+        for chunk in invalidation_chunks(task_ids):
+            pipe = get_redis().pipeline(transaction=False)
+            for task_id in chunk:
+                tombstone(pipe, task_id)
+            pipe.publish(INVALIDATION_CHANNEL, json.dumps({"task_ids": chunk}))
+            pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Task read cache: invalidation failed: {e}")
@@ -1,31 +1,961 @@
+import base64
+import json
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    BigInteger,
+    Integer,
+    Row,
+    Select,
+    any_,
+    case,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
+from app.core.config import get_settings
+from app.exceptions import DuplicateIdempotencyKeyError, TaskValidationError
 from app.models.task import (
+    IdempotencyKey,
     RecurrenceInterval,
     RecurrenceRule,
     Task,
+    TaskCounter,
+    TaskOutbox,
+    TaskPayload,
     TaskStatus,
     TaskType,
+    utc_now,
+)
+from app.schemas.task import TotalMode
+from app.services.task_read_cache import invalidate_task_reads
+from app.utils.columnar import (
+    INT64,
+    pack_pairs,
+    pairs_to_dicts,
+    unpack_pairs,
+    unpack_results,
 )
 
+# Statuses from which a worker may start executing a task
+CLAIMABLE_STATUSES = (TaskStatus.pending, TaskStatus.queued, TaskStatus.failed)
+# Statuses of tasks still waiting to run, re-dispatched when their queue changes
+REDISPATCHABLE_STATUSES = (TaskStatus.pending, TaskStatus.queued)
+
+
+def encode_cursor(task: Task) -> str:
+    """Encode the keyset position after ``task`` as an opaque cursor string."""
+    raw = json.dumps([task.created_at.isoformat(), task.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by ``encode_cursor`` into (created_at, id)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError) as exc:
+        raise TaskValidationError(f"invalid cursor '{cursor}'") from exc
+
+
+def _task_filters(status: list[TaskStatus], type_: Optional[TaskType]) -> list:
+    """Build WHERE clauses for the status/type task listing filter."""
+    filters = []
+    if status:
+        filters.append(Task.status.in_(status))
+    if type_:
+        filters.append(Task.type == type_)
+    return filters
+
+
+def _page_statement(
+    filters: list, cursor: Optional[str], limit: int, offset: int, columns: tuple
+):
+    """Build a keyset page query that fetches one extra row to detect more pages."""
+    stmt = select(*columns).where(*filters)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Task.created_at, Task.id) < tuple_(created_at, last_id)
+        )
+    return (
+        stmt.order_by(Task.created_at.desc(), Task.id.desc())
+        .limit(limit + 1)
+        .offset(offset)
+    )
+
+
+def _split_page(rows: list[Row], limit: int) -> tuple[list[Row], Optional[str]]:
+    """Trim the look-ahead row from a page and derive the next cursor."""
+    items = rows[:limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def _decode_pairs(packed: Optional[bytes]):
+    """Decode a packed batch payload column, like ``Task.pairs``."""
+    if packed is not None:
+        return pairs_to_dicts(unpack_pairs(packed))
+    return None
+
+
+def _decode_results(packed: Optional[bytes]):
+    """Decode a packed batch results column, like ``Task.results``."""
+    if packed is not None:
+        return unpack_results(packed).tolist()
+    return None
+
+
+# Task list fields and the columns backing them; ``recurring`` is never
+# loaded for listings, matching TaskRead built from a Task
+LIST_FIELD_COLUMNS = {
+    "id": (Task.id,),
+    "type": (Task.type,),
+    "status": (Task.status,),
+    "priority": (Task.priority,),
+    "effective_priority": (Task.effective_priority,),
+    "a": (Task.a,),
+    "b": (Task.b,),
+    "result": (Task.result,),
+    "pairs": (TaskPayload.pairs,),
+    "results": (TaskPayload.results,),
+    "scheduled_for": (Task.scheduled_for,),
+    "started_at": (Task.started_at,),
+    "finished_at": (Task.finished_at,),
+    "recurring": (),
+    "created_at": (Task.created_at,),
+    "updated_at": (Task.updated_at,),
+    "error_message": (Task.error_message,),
+}
+# List fields read from task_payloads
+PAYLOAD_FIELDS = {"pairs", "results"}
+_LIST_FIELD_DECODERS = {
+    "pairs": _decode_pairs,
+    "results": _decode_results,
+    "recurring": lambda: None,
+}
+
+
+def parse_list_fields(fields: Optional[str]) -> list[str]:
+    """Parse a comma separated ``fields`` selection, defaulting to all fields."""
+    if not fields:
+        return list(LIST_FIELD_COLUMNS)
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [name for name in names if name not in LIST_FIELD_COLUMNS]
+    if unknown:
+        raise TaskValidationError(f"unknown fields {', '.join(unknown)}")
+    return names or list(LIST_FIELD_COLUMNS)
+
+
+def _list_projection(fields: list[str]):
+    """Select only the columns behind ``fields`` and build response rows.
+
+    Returns the columns to select (always including the keyset columns) and
+    a function turning a result tuple into a plain dict, so listing never
+    loads heavy columns that were not asked for nor builds ORM objects.
+    """
+    columns = {str(Task.created_at): Task.created_at, str(Task.id): Task.id}
+    for name in fields:
+        columns.update((str(column), column) for column in LIST_FIELD_COLUMNS[name])
+    position = {key: i for i, key in enumerate(columns)}
+
+    plan = []
+    for name in fields:
+        indexes = tuple(position[str(c)] for c in LIST_FIELD_COLUMNS[name])
+        plan.append((name, indexes, _LIST_FIELD_DECODERS.get(name)))
+
+    def build(row: tuple) -> dict:
+        out = {}
+        for name, indexes, decode in plan:
+            if decode is None:
+                out[name] = row[indexes[0]]
+            else:
+                out[name] = decode(*(row[i] for i in indexes))
+        return out
+
+    return tuple(columns.values()), build
+
+
+def _count_statement(
+    status: list[TaskStatus], type_: Optional[TaskType], total_mode: TotalMode
+):
+    """Build the total count query for a listing, or None when not counting.
+
+    Totals are read from the trigger-maintained ``task_counters`` table, so
+    counting costs a handful of rows whatever the size of ``tasks``.
+    """
+    if total_mode == TotalMode.none:
+        return None
+
+    filters = []
+    if status:
+        filters.append(TaskCounter.status.in_(status))
+    if type_:
+        filters.append(TaskCounter.type == type_)
+    total = func.coalesce(func.sum(TaskCounter.n), 0)
+    if total_mode == TotalMode.capped:
+        total = func.least(total, get_settings().list_total_cap)
+    return select(cast(total, BigInteger)).where(*filters)
+
+
+def _recurrence_rule_row(recurring: dict, base_payload: dict, priority: int) -> dict:
+    """Build recurrence rule column values from a recurring spec."""
+    return {
+        "interval_type": RecurrenceInterval(recurring["interval_type"]),
+        "interval_value": recurring["interval_value"],
+        "next_run_at": datetime.now(timezone.utc),
+        "base_payload": base_payload,
+        "priority": priority,
+    }
+
+
+def _base_payload(spec: dict) -> dict:
+    """Build the recurrence base payload for a single or batch task spec."""
+    if "pairs" in spec:
+        return {"pairs": spec["pairs"], "type": "batch"}
+    return {"a": spec["a"], "b": spec["b"], "type": "single"}
+
+
+def _defers(scheduled_for: Optional[datetime]) -> bool:
+    """Check whether a task scheduled for ``scheduled_for`` is kept back.
+
+    Tasks due beyond the dispatch lookahead get no outbox row when created;
+    the delayed dispatcher stages them shortly before they are due.
+    """
+    if scheduled_for is None:
+        return False
+    if scheduled_for.tzinfo is None:
+        scheduled_for = scheduled_for.replace(tzinfo=timezone.utc)
+    lookahead = get_settings().scheduled_dispatch_lookahead_seconds
+    return scheduled_for > utc_now() + timedelta(seconds=lookahead)
+
+
+def _task_row(spec: dict) -> dict:
+    """Build task column values for a bulk insert.
+
+    Every row carries the same keys so the whole list is sent as a single
+    multi-row INSERT instead of being split by key set.
+    """
+    is_batch = "pairs" in spec
+    return {
+        "type": TaskType.batch if is_batch else TaskType.single,
+        "a": None if is_batch else spec["a"],
+        "b": None if is_batch else spec["b"],
+        "priority": spec.get("priority") or 2,
+        "scheduled_for": spec.get("scheduled_for"),
+        "deferred": _defers(spec.get("scheduled_for")),
+        "recurrence_rule_id": None,
+    }
+
+
+def _bulk_rule_rows(specs: list[dict]) -> list[dict]:
+    """Build recurrence rule rows for the bulk specs that ask for recurrence."""
+    return [
+        _recurrence_rule_row(
+            spec["recurring"],
+            base_payload=_base_payload(spec),
+            priority=spec.get("priority") or 2,
+        )
+        for spec in specs
+        if spec.get("recurring")
+    ]
+
+
+def _bulk_task_rows(specs: list[dict], rule_ids: list[int]) -> list[dict]:
+    """Build task rows for bulk specs, linking the freshly inserted rule ids."""
+    rule_ids = iter(rule_ids)
+    rows = []
+    for spec in specs:
+        row = _task_row(spec)
+        if spec.get("recurring"):
+            row["recurrence_rule_id"] = next(rule_ids)
+        rows.append(row)
+    return rows
+
+
+def _payload_rows(specs: list[dict], created: list[Row]) -> list[dict]:
+    """Build payload rows for the batch specs among freshly inserted tasks."""
+    return [
+        {
+            "task_id": row.id,
+            "pair_count": len(spec["pairs"]),
+            "pairs": pack_pairs(spec["pairs"]),
+        }
+        for spec, row in zip(specs, created)
+        if "pairs" in spec
+    ]
+
+
+def _recurring_spec(rule: RecurrenceRule) -> dict:
+    """Build the task spec for one firing of a recurrence rule."""
+    payload = rule.base_payload or {}
+    if "pairs" in payload:
+        spec = {"pairs": payload["pairs"]}
+    else:
+        spec = {"a": payload.get("a", 0), "b": payload.get("b", 0)}
+    return {**spec, "priority": rule.priority}
+
+
+def _recurring_task_row(rule: RecurrenceRule) -> dict:
+    """Build the task row for one firing of a recurrence rule."""
+    row = _task_row(_recurring_spec(rule))
+    row["recurrence_rule_id"] = rule.id
+    return row
+
+
+def _recurrence_delta(rule: RecurrenceRule) -> timedelta:
+    """Get the time between two runs of a recurrence rule."""
+    if rule.interval_type == RecurrenceInterval.minutely:
+        return timedelta(minutes=rule.interval_value)
+    if rule.interval_type == RecurrenceInterval.hourly:
+        return timedelta(hours=rule.interval_value)
+    return timedelta(days=rule.interval_value)
+
+
+def _advanced_rule_values(rule: RecurrenceRule, now: datetime) -> dict:
+    """Compute next_run_at/active for a rule that has just fired.
+
+    Run-once rules (interval 0) are deactivated. Rules that fell behind skip
+    the missed runs instead of firing once per scan until they catch up.
+    """
+    if rule.interval_value == 0:
+        return {"next_run_at": rule.next_run_at, "active": False}
+
+    delta = _recurrence_delta(rule)
+    next_run_at = rule.next_run_at + delta
+    if next_run_at <= now:
+        next_run_at = now + delta
+    return {"next_run_at": next_run_at, "active": True}
+
+
+def _idempotency_cutoff() -> datetime:
+    """Get the creation time before which Idempotency-Keys have expired."""
+    ttl = get_settings().idempotency_key_ttl_seconds
+    return datetime.now(timezone.utc) - timedelta(seconds=ttl)
+
+
+def _bind_idempotency_key_statement(key: str, task_id: int):
+    """Insert an Idempotency-Key, taking over the key only if it has expired.
+
+    Returns the bound task id, or no row when a live key already exists.
+    """
+    stmt = pg_insert(IdempotencyKey).values(
+        key=key, task_id=task_id, created_at=utc_now()
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.key],
+        set_={
+            "task_id": stmt.excluded.task_id,
+            "created_at": stmt.excluded.created_at,
+        },
+        where=IdempotencyKey.created_at <= _idempotency_cutoff(),
+    ).returning(IdempotencyKey.task_id)
+
+
+def _bulk_insert_statement():
+    """Multi-row task INSERT returning the columns needed to enqueue."""
+    return insert(Task).returning(
+        Task.id,
+        Task.priority,
+        Task.scheduled_for,
+        Task.dispatch_version,
+        Task.deferred,
+        sort_by_parameter_order=True,
+    )
+
+
+def _outbox_rows(created: list[Row]) -> list[dict]:
+    """Build outbox rows dispatching freshly inserted tasks that are not deferred."""
+    return [{"task_id": row.id} for row in created if not row.deferred]
+
+
+def _pending_dispatches_statement(limit: int):
+    """Select undispatched outbox rows joined to the task fields to publish."""
+    return (
+        select(
+            TaskOutbox.id.label("outbox_id"),
+            Task.id,
+            func.coalesce(Task.effective_priority, Task.priority).label(
+                "queue_priority"
+            ),
+            Task.scheduled_for,
+            Task.dispatch_version,
+            Task.deferred,
+            case(
+                (Task.status == TaskStatus.queued, Task.retry_count + 1), else_=0
+            ).label("next_retries"),
+        )
+        .join(Task, Task.id == TaskOutbox.task_id)
+        .where(TaskOutbox.dispatched_at.is_(None))
+        .order_by(TaskOutbox.id)
+        .limit(limit)
+        .with_for_update(of=TaskOutbox, skip_locked=True)
+    )
+
+
+def _results_slice_statement(task_id: int, offset: int, limit: int):
+    """Select a task's status and a slice of its packed results.
+
+    ``substring`` on the uncompressed out-of-line results column only
+    fetches the storage chunks covering the slice.
+    """
+    width = INT64.itemsize
+    return (
+        select(
+            Task.id,
+            Task.type,
+            Task.status,
+            TaskPayload.pair_count,
+            func.substring(
+                TaskPayload.results, offset * width + 1, limit * width
+            ).label("results"),
+        )
+        .outerjoin_from(Task, TaskPayload, Task.payload)
+        .where(Task.id == task_id)
+    )
+
+
+def _split_results(values: dict) -> tuple[dict, Optional[bytes]]:
+    """Separate packed batch results, stored in task_payloads, from task values."""
+    values = dict(values)
+    return values, values.pop("results_packed", None)
+
+
+def _update_from_values_statement(model, key: str, rows: list[dict], *where):
+    """One UPDATE of ``model`` joined on ``key`` to ``rows`` as a VALUES list.
+
+    psycopg2 sends an executemany UPDATE one row at a time, each firing the
+    statement-level counter triggers; this is a single round trip and a
+    single trigger run. A value missing from a row, or None, keeps the
+    current column value.
+    """
+    table = model.__table__
+    names = [key, *sorted({name for row in rows for name in row} - {key})]
+    source = values(
+        *(column(name, table.c[name].type) for name in names), name="updates"
+    ).data([tuple(row.get(name) for name in names) for row in rows])
+    return (
+        update(model)
+        .where(table.c[key] == source.c[key], *where)
+        .values(
+            {
+                name: func.coalesce(
+                    cast(source.c[name], table.c[name].type), table.c[name]
+                )
+                for name in names[1:]
+            }
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _claimable():
+    """Condition matching tasks a worker may claim.
+
+    Besides tasks waiting to run, a task left ``running`` for longer than
+    ``task_running_timeout_seconds`` is taken over: its worker died and the
+    broker redelivered the late-acked message.
+    """
+    waiting = Task.status.in_(CLAIMABLE_STATUSES)
+    timeout = get_settings().task_running_timeout_seconds
+    if timeout <= 0:
+        return waiting
+    cutoff = utc_now() - timedelta(seconds=timeout)
+    return or_(
+        waiting, (Task.status == TaskStatus.running) & (Task.started_at < cutoff)
+    )
+
+
+def _still_running(task_id):
+    """EXISTS clause matching while the task ``task_id`` is running."""
+    return (
+        select(Task.id)
+        .where(Task.id == task_id, Task.status == TaskStatus.running)
+        .exists()
+    )
+
+
+def _when_redispatchable(value, otherwise):
+    """CASE taking ``value`` only for tasks a reprioritization re-dispatches.
+
+    Other tasks keep their messages valid: a running task's retry message
+    must still be claimable at the version it was sent with.
+    """
+    return case((Task.status.in_(REDISPATCHABLE_STATUSES), value), else_=otherwise)
+
+
+def _reprioritize_statement(task_id: int, new_priority: int):
+    """Change a task's priority and invalidate its queued messages.
+
+    Only waiting tasks are re-dispatched; for any other status just the
+    priority changes.
+    """
+    return (
+        update(Task)
+        .where(Task.id == task_id)
+        .values(
+            priority=new_priority,
+            effective_priority=_when_redispatchable(None, Task.effective_priority),
+            dispatch_version=_when_redispatchable(
+                Task.dispatch_version + 1, Task.dispatch_version
+            ),
+        )
+        .returning(Task)
+        .execution_options(populate_existing=True)
+    )
+
+
+def _delete_task_refs_statements(task_ids: list[int]) -> list:
+    """Delete rows referring to ``task_ids``.
+
+    ``tasks`` is partitioned, so these tables carry no foreign key that
+    would cascade the delete.
+    """
+    return [
+        delete(model)
+        .where(model.task_id.in_(task_ids))
+        .execution_options(synchronize_session=False)
+        for model in (TaskPayload, TaskOutbox, IdempotencyKey)
+    ]
+
+
+def _selection_filters(selection: dict) -> list:
+    """Build WHERE clauses for a ``TaskFilter`` dict of bulk criteria."""
+    filters = []
+    if selection.get("ids") is not None:
+        # One array parameter however many ids are given
+        filters.append(Task.id == any_(literal(selection["ids"], ARRAY(Integer))))
+    if selection.get("status"):
+        filters.append(Task.status.in_(selection["status"]))
+    if selection.get("type"):
+        filters.append(Task.type == selection["type"])
+    if selection.get("priority") is not None:
+        filters.append(Task.priority == selection["priority"])
+    # created_at bounds also prune the partitions scanned
+    if selection.get("created_after"):
+        filters.append(Task.created_at >= selection["created_after"])
+    if selection.get("created_before"):
+        filters.append(Task.created_at < selection["created_before"])
+    if selection.get("recurrence_rule_id") is not None:
+        filters.append(Task.recurrence_rule_id == selection["recurrence_rule_id"])
+    return filters
+
+
+def _stage_dispatches_cte(ids: Select):
+    """Outbox INSERT of a dispatch for every task id selected by ``ids``."""
+    return insert(TaskOutbox).from_select(["task_id", "created_at"], ids).cte("staged")
+
+
+def _bulk_retry_statement(filters: list):
+    """Reset the selected failed tasks to pending and stage their dispatches.
+
+    Resets what ``AsyncTaskService.retry`` does for a single task. One
+    statement: the UPDATEs and the outbox INSERT run as data-modifying
+    CTEs. Returns the ids of the retried tasks.
+    """
+    retried = (
+        update(Task)
+        .where(*filters, Task.status == TaskStatus.failed)
+        .values(
+            status=TaskStatus.pending,
+            result=None,
+            error_message=None,
+            started_at=None,
+            finished_at=None,
+            retry_count=0,
+            effective_priority=None,
+            dispatch_version=Task.dispatch_version + 1,
+            # onupdate is not applied with a second UPDATE in the statement
+            updated_at=func.now(),
+        )
+        .returning(Task.id)
+        .cte("retried")
+    )
+    cleared = (
+        update(TaskPayload)
+        .where(TaskPayload.task_id.in_(select(retried.c.id)))
+        .values(results=None)
+        .cte("cleared")
+    )
+    staged = _stage_dispatches_cte(select(retried.c.id, func.now()))
+    return select(retried.c.id).add_cte(cleared, staged)
+
+
+def _bulk_reprioritize_statement(filters: list, priority: int):
+    """Move the selected tasks to ``priority`` and re-dispatch waiting ones.
+
+    Like ``_reprioritize_statement``, bumping ``dispatch_version`` of the
+    waiting tasks makes messages already queued stale, so no revoke
+    broadcast is needed; other tasks only change priority. Returns the ids
+    of the tasks whose priority changed.
+    """
+    moved = (
+        update(Task)
+        .where(*filters, Task.priority != priority)
+        .values(
+            priority=priority,
+            effective_priority=_when_redispatchable(None, Task.effective_priority),
+            dispatch_version=_when_redispatchable(
+                Task.dispatch_version + 1, Task.dispatch_version
+            ),
+        )
+        .returning(Task.id, Task.status)
+        .cte("moved")
+    )
+    staged = _stage_dispatches_cte(
+        select(moved.c.id, func.now()).where(
+            moved.c.status.in_(REDISPATCHABLE_STATUSES)
+        )
+    )
+    return select(moved.c.id).add_cte(staged)
+
+
+def _bulk_delete_statement(filters: list):
+    """Delete the selected tasks and the rows referring to them.
+
+    Returns the ids of the deleted tasks.
+    """
+    deleted = delete(Task).where(*filters).returning(Task.id).cte("deleted")
+    refs = [
+        delete(model)
+        .where(model.task_id.in_(select(deleted.c.id)))
+        .cte(f"deleted_{model.__tablename__}")
+        for model in (TaskPayload, TaskOutbox, IdempotencyKey)
+    ]
+    return select(deleted.c.id).add_cte(*refs)
+
+
+def _age_waiting_statement(cutoff: datetime, limit: int):
+    """Raise up to ``limit`` tasks pending since before ``cutoff`` one level.
+
+    A task waits from its last change (an earlier aging step included) or
+    its scheduled time, whichever is later. Aged tasks are re-dispatched to
+    the higher queue and their queued messages go stale through
+    ``dispatch_version``, all in one statement. Rows locked elsewhere are
+    skipped. Returns the ids of the aged tasks.
+    """
+    queue_priority = func.coalesce(Task.effective_priority, Task.priority)
+    due = (
+        select(Task.id)
+        .where(
+            Task.status == TaskStatus.pending,
+            queue_priority > 1,
+            func.greatest(Task.updated_at, Task.scheduled_for) < cutoff,
+        )
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    aged = (
+        update(Task)
+        .where(Task.id.in_(due.scalar_subquery()))
+        .values(
+            effective_priority=queue_priority - 1,
+            dispatch_version=Task.dispatch_version + 1,
+        )
+        .returning(Task.id)
+        .cte("aged")
+    )
+    staged = _stage_dispatches_cte(select(aged.c.id, func.now()))
+    return select(aged.c.id).add_cte(staged)
+
+
+def _release_scheduled_statement(horizon: datetime, limit: int):
+    """Stage dispatches of up to ``limit`` deferred tasks due by ``horizon``.
+
+    Due tasks are found through the partial index of deferred tasks and
+    locked with SKIP LOCKED, so concurrent dispatchers take disjoint chunks.
+    Clearing ``deferred`` and the outbox INSERT run in one statement.
+    Returns the ids of the released tasks.
+    """
+    due = (
+        select(Task.id)
+        .where(Task.deferred, Task.scheduled_for <= horizon)
+        .order_by(Task.scheduled_for)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    released = (
+        update(Task)
+        .where(Task.id.in_(due.scalar_subquery()), Task.deferred)
+        .values(deferred=False)
+        .returning(Task.id)
+        .cte("released")
+    )
+    staged = _stage_dispatches_cte(select(released.c.id, func.now()))
+    return select(released.c.id).add_cte(staged)
+
+
+def _insert_ids_statement(model):
+    """Multi-row INSERT returning primary keys in parameter order."""
+    return insert(model).returning(model.id, sort_by_parameter_order=True)
+
 
 class TaskService:
-    """Service class for task management operations."""
+    """Task operations of worker, relay and scheduler processes.
+
+    API routes use ``AsyncTaskService``; this class only holds what the
+    synchronous Celery side needs.
+    """
 
     def __init__(self, db: Session):
         self.db = db
 
-    def create_single(
+    def claim(
+        self, task_id: int, retry_count: int, dispatch_version: Optional[int] = None
+    ) -> Optional[Task]:
+        """Atomically mark a claimable task as running and return it.
+
+        Runs a single ``UPDATE ... WHERE status IN (...) RETURNING``; returns
+        None when the task does not exist, another live delivery already owns
+        it, or the message's ``dispatch_version`` has been superseded. A task
+        stuck ``running`` past the timeout can be claimed again.
+        """
+        conditions = [Task.id == task_id, _claimable()]
+        if dispatch_version is not None:
+            conditions.append(Task.dispatch_version == dispatch_version)
+        stmt = (
+            update(Task)
+            .where(*conditions)
+            .values(
+                status=TaskStatus.running,
+                started_at=utc_now(),
+                retry_count=retry_count,
+            )
+            .returning(Task)
+            .options(selectinload(Task.payload))
+        )
+        task = self.db.execute(stmt).scalar_one_or_none()
+        self.db.commit()
+        return task
+
+    def claim_many(self, items: list[tuple[int, int]]) -> list[Task]:
+        """Atomically mark many claimable tasks as running and return them.
+
+        ``items`` are ``(task_id, dispatch_version)`` pairs; one
+        ``UPDATE ... WHERE (id, dispatch_version) IN (...) RETURNING`` claims
+        every task that is still claimable at that version and skips the rest.
+        """
+        if not items:
+            return []
+        stmt = (
+            update(Task)
+            .where(
+                tuple_(Task.id, Task.dispatch_version).in_(items),
+                _claimable(),
+            )
+            .values(status=TaskStatus.running, started_at=utc_now(), retry_count=0)
+            .returning(Task)
+            .options(selectinload(Task.payload))
+        )
+        tasks = list(self.db.execute(stmt).scalars())
+        self.db.commit()
+        return tasks
+
+    def finish(self, task_id: int, **values) -> bool:
+        """Apply an outcome to a running task, returning False if not running.
+
+        The update only matches while the task is still ``running``, so a late
+        duplicate execution cannot overwrite a newer state.
+        """
+        values, results = _split_results(values)
+        if results is not None:
+            self.db.execute(
+                update(TaskPayload)
+                .where(TaskPayload.task_id == task_id, _still_running(task_id))
+                .values(results=results)
+            )
+        stmt = (
+            update(Task)
+            .where(Task.id == task_id, Task.status == TaskStatus.running)
+            .values(**values)
+        )
+        updated = self.db.execute(stmt).rowcount
+        self.db.commit()
+        return updated == 1
+
+    def finish_many(self, outcomes: list[dict]):
+        """Apply many outcomes, each a dict of values keyed by task ``id``.
+
+        Sent as one UPDATE joined to the outcomes by primary key, guarded like
+        ``finish`` so only tasks still ``running`` are changed. Being a single
+        statement, the counter trigger locks its rows in key order, so
+        concurrent batches cannot deadlock on them.
+        """
+        if not outcomes:
+            return
+        outcomes, results = zip(*map(_split_results, outcomes))
+        payloads = [
+            {"task_id": outcome["id"], "results": packed}
+            for outcome, packed in zip(outcomes, results)
+            if packed is not None
+        ]
+        # Results first: the guard no longer matches once the status moved on
+        if payloads:
+            self.db.execute(
+                _update_from_values_statement(
+                    TaskPayload,
+                    "task_id",
+                    payloads,
+                    _still_running(TaskPayload.task_id),
+                )
+            )
+        self.db.execute(
+            _update_from_values_statement(
+                Task, "id", list(outcomes), Task.status == TaskStatus.running
+            )
+        )
+        self.db.commit()
+
+    def pending_dispatches(self, limit: int) -> list[Row]:
+        """Lock up to ``limit`` undispatched outbox rows with their task data.
+
+        Rows are locked with ``FOR UPDATE SKIP LOCKED`` so several relays can
+        drain the outbox concurrently; the lock lasts until commit.
+        """
+        return self.db.execute(_pending_dispatches_statement(limit)).all()
+
+    def mark_dispatched(self, outbox_ids: list[int]):
+        """Mark outbox rows as published and commit."""
+        self.db.execute(
+            update(TaskOutbox)
+            .where(TaskOutbox.id.in_(outbox_ids))
+            .values(dispatched_at=utc_now())
+        )
+        self.db.commit()
+
+    def purge_dispatched(self, before: datetime) -> int:
+        """Delete outbox rows dispatched before ``before`` and commit."""
+        deleted = self.db.execute(
+            delete(TaskOutbox).where(TaskOutbox.dispatched_at < before)
+        ).rowcount
+        self.db.commit()
+        return deleted
+
+    def purge_idempotency_keys(self) -> int:
+        """Delete Idempotency-Keys past their TTL and commit.
+
+        Expired keys are already ignored on lookup and taken over on reuse;
+        this only keeps the table from growing without bound.
+        """
+        deleted = self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.created_at <= _idempotency_cutoff()
+            )
+        ).rowcount
+        self.db.commit()
+        return deleted
+
+    def release_scheduled(self, horizon: datetime, limit: int) -> list[int]:
+        """Stage dispatches of deferred tasks due by ``horizon`` and commit.
+
+        Handles at most ``limit`` tasks per call. Returns the released ids.
+        """
+        task_ids = list(
+            self.db.execute(_release_scheduled_statement(horizon, limit)).scalars()
+        )
+        self.db.commit()
+        return task_ids
+
+    def age_waiting(self, cutoff: datetime, limit: int) -> list[int]:
+        """Raise tasks pending since before ``cutoff`` one priority level.
+
+        Handles at most ``limit`` tasks per call and commits. Pending tasks
+        are never in the read cache, so nothing is invalidated.
+        """
+        task_ids = list(
+            self.db.execute(_age_waiting_statement(cutoff, limit)).scalars()
+        )
+        self.db.commit()
+        return task_ids
+
+    def _insert_payloads(self, rows: list[dict]):
+        """Insert batch payload rows with one multi-row statement."""
+        if rows:
+            self.db.execute(insert(TaskPayload), rows)
+
+    def _insert_outbox(self, rows: list[dict]):
+        """Insert outbox rows with one multi-row statement."""
+        if rows:
+            self.db.execute(insert(TaskOutbox), rows)
+
+    def schedule_due_recurrences(
+        self, now: datetime, limit: int
+    ) -> tuple[int, list[Row]]:
+        """Fire up to ``limit`` due recurrence rules in one transaction.
+
+        Rules are locked with ``FOR UPDATE SKIP LOCKED`` so concurrent
+        schedulers take disjoint chunks. Their tasks and outbox dispatches are
+        created with multi-row INSERTs and the rules advanced with one
+        UPDATE. Returns the number of rules fired and the created
+        task rows.
+        """
+        rules = (
+            self.db.execute(
+                select(RecurrenceRule)
+                .where(
+                    RecurrenceRule.active.is_(True), RecurrenceRule.next_run_at <= now
+                )
+                .order_by(RecurrenceRule.next_run_at)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        if not rules:
+            self.db.commit()
+            return 0, []
+
+        created = self.db.execute(
+            _bulk_insert_statement(), [_recurring_task_row(rule) for rule in rules]
+        ).all()
+        specs = [_recurring_spec(rule) for rule in rules]
+        self._insert_payloads(_payload_rows(specs, created))
+        self._insert_outbox(_outbox_rows(created))
+        self.db.execute(
+            _update_from_values_statement(
+                RecurrenceRule,
+                "id",
+                [{"id": rule.id, **_advanced_rule_values(rule, now)} for rule in rules],
+            )
+        )
+        self.db.commit()
+        return len(rules), created
+
+
+class AsyncTaskService:
+    """Asyncio variant of TaskService for use with an AsyncSession.
+
+    Statements are shared with TaskService; only execution is awaited. Broker
+    publishes are staged in the outbox and performed by the relay process.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_single(
         self,
         a: int,
         b: int,
         priority: int,
         scheduled_for: Optional[datetime],
         recurring: Optional[dict],
+        idempotency_key: Optional[str] = None,
     ) -> Task:
         """Create a single addition task with optional scheduling and recurrence."""
         task = Task(
@@ -34,25 +964,24 @@ class TaskService:
             b=b,
             priority=priority,
             scheduled_for=scheduled_for,
+            deferred=_defers(scheduled_for),
         )
         if recurring:
-            recurrence_rule = self._create_recurrence_rule(
+            recurrence_rule = await self._create_recurrence_rule(
                 recurring,
                 base_payload={"a": a, "b": b, "type": "single"},
                 priority=priority,
             )
-            task.recurrence_rule = recurrence_rule
-        self.db.add(task)
-        self.db.commit()
-        self.db.refresh(task)
-        return task
+            task.recurrence_rule_id = recurrence_rule.id
+        return await self._commit_new_task(task, idempotency_key)
 
-    def create_batch(
+    async def create_batch(
         self,
         pairs: list[dict],
         priority: int,
         scheduled_for: Optional[datetime],
         recurring: Optional[dict],
+        idempotency_key: Optional[str] = None,
     ) -> Task:
         """Create a batch addition task with multiple pairs of numbers."""
         task = Task(
@@ -60,124 +989,229 @@ class TaskService:
             pairs=pairs,
             priority=priority,
             scheduled_for=scheduled_for,
+            deferred=_defers(scheduled_for),
         )
         if recurring:
-            recurrence_rule = self._create_recurrence_rule(
+            recurrence_rule = await self._create_recurrence_rule(
                 recurring,
                 base_payload={"pairs": pairs, "type": "batch"},
                 priority=priority,
             )
-            task.recurrence_rule = recurrence_rule
+            task.recurrence_rule_id = recurrence_rule.id
+        return await self._commit_new_task(task, idempotency_key)
+
+    async def get_by_idempotency_key(self, key: str) -> Optional[Task]:
+        """Get the task created under an unexpired Idempotency-Key."""
+        stmt = (
+            select(Task)
+            .join(IdempotencyKey, IdempotencyKey.task_id == Task.id)
+            .where(
+                IdempotencyKey.key == key,
+                IdempotencyKey.created_at > _idempotency_cutoff(),
+            )
+            .options(selectinload(Task.payload))
+        )
+        return (await self.db.execute(stmt)).scalar_one_or_none()
+
+    async def _commit_new_task(
+        self, task: Task, idempotency_key: Optional[str]
+    ) -> Task:
+        """Commit a new task with its outbox dispatch and Idempotency-Key binding.
+
+        If a concurrent request already bound the key, the unique index makes
+        this insert wait for it; the new task is then rolled back and
+        DuplicateIdempotencyKeyError is raised so the caller can return the
+        original task.
+        """
         self.db.add(task)
-        self.db.commit()
-        self.db.refresh(task)
+        await self.db.flush()
+        if not task.deferred:
+            self.stage_dispatch(task)
+        if idempotency_key:
+            bound = await self.db.execute(
+                _bind_idempotency_key_statement(idempotency_key, task.id)
+            )
+            if bound.scalar_one_or_none() is None:
+                await self.db.rollback()
+                raise DuplicateIdempotencyKeyError(idempotency_key)
+        await self.db.commit()
         return task
 
-    def list_tasks(
+    async def create_bulk(self, specs: list[dict]) -> list[Row]:
+        """Insert many single/batch tasks with one multi-row INSERT ... RETURNING."""
+        rule_rows = _bulk_rule_rows(specs)
+        rule_ids = []
+        if rule_rows:
+            result = await self.db.execute(
+                _insert_ids_statement(RecurrenceRule), rule_rows
+            )
+            rule_ids = result.scalars().all()
+
+        result = await self.db.execute(
+            _bulk_insert_statement(), _bulk_task_rows(specs, rule_ids)
+        )
+        created = result.all()
+        payload_rows = _payload_rows(specs, created)
+        if payload_rows:
+            await self.db.execute(insert(TaskPayload), payload_rows)
+        outbox_rows = _outbox_rows(created)
+        if outbox_rows:
+            await self.db.execute(insert(TaskOutbox), outbox_rows)
+        await self.db.commit()
+        return created
+
+    async def list_task_rows(
         self,
         *,
         status: list[TaskStatus],
         type_: TaskType,
+        fields: list[str],
         limit: int = 50,
-        offset: int = 0
-    ) -> tuple[list[Task], int]:
-        """Get paginated tasks filtered by status and type with total count."""
-        stmt = select(Task)
-        if status:
-            stmt = stmt.where(Task.status.in_(status))
-        if type_:
-            stmt = stmt.where(Task.type == type_)
-
-        count_stmt = select(func.count()).select_from(Task)
-        if status:
-            count_stmt = count_stmt.where(Task.status.in_(status))
-        if type_:
-            count_stmt = count_stmt.where(Task.type == type_)
-
-        total = self.db.execute(count_stmt).scalar_one()
-        items = (
-            self.db.execute(
-                stmt.order_by(Task.created_at.desc()).limit(limit).offset(offset)
-            )
-            .scalars()
-            .all()
-        )
-        return items, total
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.exact,
+    ) -> tuple[list[dict], Optional[int], Optional[str]]:
+        """Get a keyset page of tasks as plain dicts holding only ``fields``.
 
-    def get(self, task_id: int) -> Optional[Task]:
-        """Get a task by its ID."""
-        return self.db.get(Task, task_id)
+        Only the columns behind ``fields`` are selected and rows are built
+        straight from the result tuples, without ORM objects.
+        """
+        columns, build = _list_projection(fields)
+        filters = _task_filters(status, type_)
+        stmt = _page_statement(filters, cursor, limit, offset, columns)
+        if PAYLOAD_FIELDS.intersection(fields):
+            stmt = stmt.outerjoin_from(Task, TaskPayload, Task.payload)
+        result = await self.db.execute(stmt)
+        rows, next_cursor = _split_page(result.all(), limit)
 
-    def update_priority(self, task: Task, new_priority: int) -> Task:
-        """Update task priority and migrate between queue priorities."""
-        old_priority = task.priority
-        task.priority = new_priority
-        self.db.commit()
-        self.db.refresh(task)
+        total = None
+        count_stmt = _count_statement(status, type_, total_mode)
+        if count_stmt is not None:
+            total = (await self.db.execute(count_stmt)).scalar_one()
+        return [build(row) for row in rows], total, next_cursor
+
+    async def get(self, task_id: int, with_payload: bool = False) -> Optional[Task]:
+        """Get a task by its ID, with its batch pairs/results if ``with_payload``."""
+        options = [selectinload(Task.payload)] if with_payload else None
+        return await self.db.get(Task, task_id, options=options)
 
-        from app.celery_app.tasks import migrate_task_to_priority_queue
+    async def get_many(
+        self, task_ids: set[int], with_payload: bool = False
+    ) -> list[Task]:
+        """Get the existing tasks among ``task_ids``."""
+        stmt = select(Task).where(Task.id.in_(task_ids))
+        if with_payload:
+            stmt = stmt.options(selectinload(Task.payload))
+        result = await self.db.execute(stmt)
+        return list(result.scalars())
 
-        if old_priority != new_priority:
-            migrate_task_to_priority_queue(task, old_priority, new_priority)
+    async def get_results_page(
+        self, task_id: int, offset: int, limit: int
+    ) -> Optional[dict]:
+        """Get up to ``limit`` results of a batch task starting at ``offset``.
 
+        Only the requested byte range of the packed results is read. Returns
+        None when the task does not exist; ``results`` is None until the task
+        has produced them.
+        """
+        result = await self.db.execute(_results_slice_statement(task_id, offset, limit))
+        row = result.one_or_none()
+        if row is None:
+            return None
+        if row.type != TaskType.batch:
+            raise TaskValidationError(f"task {task_id} is not a batch task", task_id)
+        return {
+            "task_id": row.id,
+            "status": row.status,
+            "total": row.pair_count,
+            "offset": offset,
+            "results": _decode_results(row.results),
+        }
+
+    async def update_priority(self, task: Task, new_priority: int) -> Task:
+        """Update task priority and migrate between queue priorities."""
+        if task.priority == new_priority:
+            await self.db.refresh(task)
+            return task
+
+        result = await self.db.execute(_reprioritize_statement(task.id, new_priority))
+        task = result.scalar_one()
+        if task.status in REDISPATCHABLE_STATUSES:
+            self.stage_dispatch(task)
+        await self.db.commit()
+        await invalidate_task_reads([task.id])
         return task
 
-    def delete(self, task: Task):
-        """Delete a task from the database."""
-        self.db.delete(task)
-        self.db.commit()
+    def stage_dispatch(self, task: Task):
+        """Stage a broker dispatch for ``task`` in the current transaction."""
+        self.db.add(TaskOutbox(task_id=task.id))
+
+    async def delete(self, task: Task):
+        """Delete a task and the rows referring to it from the database."""
+        task_id = task.id
+        await self.db.delete(task)
+        await self.db.flush()
+        for stmt in _delete_task_refs_statements([task_id]):
+            await self.db.execute(stmt)
+        await self.db.commit()
+        await invalidate_task_reads([task_id])
+
+    async def bulk_retry(self, selection: dict) -> list[int]:
+        """Retry every failed task matching ``selection`` with one statement."""
+        return await self._run_bulk(
+            _bulk_retry_statement(_selection_filters(selection))
+        )
+
+    async def bulk_reprioritize(self, selection: dict, priority: int) -> list[int]:
+        """Move every task matching ``selection`` to ``priority``."""
+        return await self._run_bulk(
+            _bulk_reprioritize_statement(_selection_filters(selection), priority)
+        )
+
+    async def bulk_delete(self, selection: dict) -> list[int]:
+        """Delete every task matching ``selection``; returns the deleted ids."""
+        return await self._run_bulk(
+            _bulk_delete_statement(_selection_filters(selection))
+        )
 
-    def retry(self, task: Task) -> Task:
-        """Reset task status and clear execution data for retry."""
+    async def _run_bulk(self, statement) -> list[int]:
+        """Execute a bulk statement returning task ids, commit and invalidate."""
+        task_ids = list((await self.db.execute(statement)).scalars())
+        await self.db.commit()
+        await invalidate_task_reads(task_ids)
+        return task_ids
+
+    async def retry(self, task: Task) -> Task:
+        """Reset a failed task to pending and stage its dispatch.
+
+        Execution data and the retry budget are reset, and ``dispatch_version``
+        is bumped so a message left over from an earlier attempt is dropped.
+        """
         task.status = TaskStatus.pending
         task.started_at = None
         task.finished_at = None
         task.error_message = None
+        task.retry_count = 0
+        task.effective_priority = None
+        task.dispatch_version += 1
         if task.type == TaskType.single:
             task.result = None
         else:
-            task.results = None
-        self.db.commit()
-        self.db.refresh(task)
+            await self.db.execute(
+                update(TaskPayload)
+                .where(TaskPayload.task_id == task.id)
+                .values(results=None)
+            )
+        self.stage_dispatch(task)
+        await self.db.commit()
+        await invalidate_task_reads([task.id])
         return task
 
-    def _create_recurrence_rule(
+    async def _create_recurrence_rule(
         self, recurring: dict, base_payload: dict, priority: int
     ) -> RecurrenceRule:
         """Create a recurrence rule for periodic task execution."""
-        interval_type = RecurrenceInterval(recurring["interval_type"])
-        interval_value = recurring["interval_value"]
-        next_run_at = datetime.now(timezone.utc)
-        rule = RecurrenceRule(
-            interval_type=interval_type,
-            interval_value=interval_value,
-            next_run_at=next_run_at,
-            base_payload=base_payload,
-            priority=priority,
-        )
+        rule = RecurrenceRule(**_recurrence_rule_row(recurring, base_payload, priority))
         self.db.add(rule)
-        self.db.flush()
+        await self.db.flush()
         return rule
-
-    def due_recurrences(self, now: datetime) -> list[RecurrenceRule]:
-        """Get all active recurrence rules that are due for execution."""
-        stmt = select(RecurrenceRule).where(
-            RecurrenceRule.active.is_(True), RecurrenceRule.next_run_at <= now
-        )
-        return self.db.execute(stmt).scalars().all()
-
-    def advance_recurrence(self, rule: RecurrenceRule):
-        """Advance recurrence rule to next execution time or deactivate if needed."""
-        if rule.interval_value == 0:
-            rule.active = False
-            self.db.commit()
-            return
-
-        if rule.interval_type == RecurrenceInterval.minutely:
-            delta = timedelta(minutes=rule.interval_value)
-        elif rule.interval_type == RecurrenceInterval.hourly:
-            delta = timedelta(hours=rule.interval_value)
-        else:
-            delta = timedelta(days=rule.interval_value)
-        rule.next_run_at = rule.next_run_at + delta
-        self.db.commit()
@@ -0,0 +1,41 @@
+"""
+Packed int64 storage for batch task pairs and results.
+
+Pairs are stored as an interleaved ``(n, 2)`` little-endian int64 array
+(a0, b0, a1, b1, ...) and results as a flat int64 array, so the worker can
+compute a whole batch with one vectorized NumPy expression.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+INT64 = np.dtype("<i8")
+
+
+def pack_pairs(pairs: Iterable[dict]) -> bytes:
+    """Pack ``[{"a": .., "b": ..}, ...]`` into interleaved int64 bytes."""
+    flat = [value for pair in pairs for value in (pair.get("a", 0), pair.get("b", 0))]
+    return np.array(flat, dtype=INT64).tobytes()
+
+
+def unpack_pairs(blob: bytes) -> np.ndarray:
+    """Return a read-only ``(n, 2)`` int64 view over packed pair bytes."""
+    return np.frombuffer(blob, dtype=INT64).reshape(-1, 2)
+
+
+def pairs_to_dicts(pairs: np.ndarray) -> list[dict]:
+    """Render an ``(n, 2)`` pair array in the API's ``[{"a", "b"}]`` shape."""
+    return [{"a": a, "b": b} for a, b in pairs.tolist()]
+
+
+def pack_results(results: Iterable[int]) -> bytes:
+    """Pack batch results into int64 bytes."""
+    return np.asarray(results, dtype=INT64).tobytes()
+
+
+def unpack_results(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    """Return a read-only int64 view over packed result bytes."""
+    if blob is None:
+        return None
+    return np.frombuffer(blob, dtype=INT64)
@@ -0,0 +1,115 @@
+"""
+Prometheus metrics shared by the API, the workers and the scheduler.
+
+When ``PROMETHEUS_MULTIPROC_DIR`` is set (required for Celery prefork and
+multi-worker uvicorn), every process writes its samples to that directory and
+``metrics_registry()`` aggregates them at scrape time. The directory must be
+private to one API or worker instance and emptied before it starts (the
+container entrypoint does this).
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Task kernels are sub-millisecond, so buckets start well below the defaults
+FAST_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template",
+    ["method", "route", "status"],
+)
+TASK_EXECUTION_DURATION = Histogram(
+    "task_execution_duration_seconds",
+    "Time spent executing a task, excluding claim and result writes",
+    ["queue", "type"],
+    buckets=FAST_BUCKETS,
+)
+TASK_QUEUE_WAIT = Histogram(
+    "task_queue_wait_seconds",
+    "Time from a task becoming due to its first execution attempt",
+    ["queue"],
+    buckets=WAIT_BUCKETS,
+)
+TASK_RETRIES = Counter(
+    "task_retries_total", "Task attempts that failed and were retried", ["queue"]
+)
+TASK_FAILURES = Counter(
+    "task_failures_total", "Tasks that failed permanently", ["queue"]
+)
+SCHEDULER_TICK_DURATION = Histogram(
+    "scheduler_tick_duration_seconds",
+    "Duration of one recurring-task scheduler run",
+    buckets=FAST_BUCKETS + (30.0, 60.0),
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["engine"],
+    buckets=FAST_BUCKETS,
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that failed or timed out",
+    ["engine"],
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Pooled database connections currently checked out",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+
+def metrics_registry():
+    """Registry to expose, aggregating all processes in multiprocess mode."""
+    if not MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render the exposition payload and its content type."""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def start_exporter(port: int):
+    """Serve ``/metrics`` for this process group on ``port`` in a thread."""
+    start_http_server(port, registry=metrics_registry())
+
+
+def mark_process_dead(pid: int):
+    """Drop live gauges of an exited process in multiprocess mode."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -39,4 +39,10 @@ if [ "$RUN_MIGRATIONS" = "true" ] && command -v alembic &> /dev/null; then
   alembic upgrade head || { echo "Migrations failed" >&2; exit 1; }
 fi
 
+# Start every process group with an empty Prometheus multiprocess directory
+if [ -n "${PROMETHEUS_MULTIPROC_DIR:-}" ]; then
+  rm -rf "${PROMETHEUS_MULTIPROC_DIR}"
+  mkdir -p "${PROMETHEUS_MULTIPROC_DIR}"
+fi
+
 exec "$@"
@@ -67,6 +67,7 @@ sleep 5
 check_health "task_db" || exit 1
 check_health "task_redis" || exit 1
 check_health "task_api" || exit 1
+check_health "task_outbox_relay" || exit 1
 check_health "task_worker_high" || exit 1
 check_health "task_worker_medium" || exit 1
 check_health "task_worker_low" || exit 1
@@ -16,7 +16,7 @@ pip install --upgrade pip
 
 # Install testing dependencies
 echo "Installing test dependencies..."
-pip install -r requirements-test.txt
+pip install -r requirements.txt -r requirements-test.txt
 
 echo "✓ Dependencies installed"
 
@@ -0,0 +1,26 @@
+from unittest import mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.session import get_async_db
+from app.main import app
+
+
+@pytest.fixture
+def db():
+    """Database session double; statements executed on it return no rows."""
+    return mock.MagicMock(execute=mock.AsyncMock(), commit=mock.AsyncMock())
+
+
+@pytest.fixture
+def client(db):
+    """API client whose routes run against the ``db`` double."""
+
+    async def override():
+        yield db
+
+    app.dependency_overrides[get_async_db] = override
+    # Not entered as a context manager: no lifespan, so no event hub
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+from pydantic import ValidationError
+
+from app.models.task import TaskType
+from app.schemas.task import TaskCreateBatch, TaskCreateBulk, TaskCreateSingle
+from app.services.task_service import (
+    _bulk_rule_rows,
+    _bulk_task_rows,
+    _outbox_rows,
+    _payload_rows,
+)
+from app.utils.columnar import pack_pairs
+
+SPECS = [
+    {"a": 1, "b": 2, "priority": 1},
+    {"pairs": [{"a": 3, "b": 4}, {"a": 5, "b": 6}]},
+    {"a": 7, "b": 8, "recurring": {"interval_type": "minutely", "interval_value": 5}},
+]
+
+
+class TestBulkCreateRequest:
+    """Test validation of bulk task submissions."""
+
+    def test_mixes_single_and_batch_tasks(self):
+        """Test that each spec is parsed as a single or a batch task."""
+        payload = TaskCreateBulk(tasks=SPECS)
+
+        assert [type(spec) for spec in payload.tasks] == [
+            TaskCreateSingle,
+            TaskCreateBatch,
+            TaskCreateSingle,
+        ]
+
+    @pytest.mark.parametrize("count", [0, 5001])
+    def test_bounds_the_number_of_tasks(self, count):
+        """Test that a submission holds between 1 and 5000 tasks."""
+        with pytest.raises(ValidationError):
+            TaskCreateBulk(tasks=[{"a": 1, "b": 2}] * count)
+
+
+class TestBulkRows:
+    """Test the rows of the multi-row bulk inserts."""
+
+    def test_task_rows_share_one_key_set(self):
+        """Test that every row has the same keys, so one INSERT covers all."""
+        rows = _bulk_task_rows(SPECS, [42])
+
+        assert len({frozenset(row) for row in rows}) == 1
+        assert [row["type"] for row in rows] == [
+            TaskType.single,
+            TaskType.batch,
+            TaskType.single,
+        ]
+        assert [row["priority"] for row in rows] == [1, 2, 2]
+        assert [row["recurrence_rule_id"] for row in rows] == [None, None, 42]
+
+    def test_rules_only_for_recurring_specs(self):
+        """Test that only recurring specs insert a recurrence rule."""
+        (rule,) = _bulk_rule_rows(SPECS)
+
+        assert rule["base_payload"] == {"type": "single", "a": 7, "b": 8}
+
+    def test_payload_and_outbox_rows_follow_created_ids(self):
+        """Test that payloads and dispatches attach to the inserted task ids."""
+        created = [
+            SimpleNamespace(id=10, deferred=False),
+            SimpleNamespace(id=11, deferred=False),
+            SimpleNamespace(id=12, deferred=True),
+        ]
+
+        assert _payload_rows(SPECS, created) == [
+            {"task_id": 11, "pair_count": 2, "pairs": pack_pairs(SPECS[1]["pairs"])}
+        ]
+        assert _outbox_rows(created) == [{"task_id": 10}, {"task_id": 11}]
@@ -0,0 +1,89 @@
+import pytest
+
+from app.celery_app.tasks import _execute_batch_task
+from app.models.task import Task, TaskType
+from app.schemas.task import INT64_MAX, INT64_MIN
+from app.utils.columnar import (
+    INT64,
+    pack_pairs,
+    pack_results,
+    pairs_to_dicts,
+    unpack_pairs,
+    unpack_results,
+)
+
+
+class TestColumnarPacking:
+    """Test packed int64 storage of batch pairs and results."""
+
+    def test_pairs_round_trip(self):
+        """Test that packed pairs decode to the same pairs in order."""
+        pairs = [{"a": 1, "b": 2}, {"a": -3, "b": 4}, {"a": INT64_MIN, "b": INT64_MAX}]
+
+        blob = pack_pairs(pairs)
+
+        assert len(blob) == 2 * len(pairs) * INT64.itemsize
+        assert unpack_pairs(blob).shape == (3, 2)
+        assert pairs_to_dicts(unpack_pairs(blob)) == pairs
+
+    def test_pairs_are_interleaved_little_endian(self):
+        """Test the on-disk layout a0, b0, a1, b1 as little-endian int64."""
+        blob = pack_pairs([{"a": 1, "b": 2}, {"a": 3, "b": 4}])
+
+        assert blob == b"".join(n.to_bytes(8, "little") for n in (1, 2, 3, 4))
+
+    def test_results_round_trip(self):
+        """Test that packed results decode to the same ints."""
+        results = [3, -7, 0, INT64_MAX]
+
+        assert unpack_results(pack_results(results)).tolist() == results
+        assert unpack_results(None) is None
+
+    def test_empty_batch(self):
+        """Test that an empty batch packs to no bytes."""
+        assert pack_pairs([]) == b""
+        assert pairs_to_dicts(unpack_pairs(b"")) == []
+
+
+class TestTaskPayload:
+    """Test the batch payload accessors of tasks."""
+
+    def test_batch_task_exposes_packed_payload(self):
+        """Test that a batch task decodes its pairs and results."""
+        task = Task(type=TaskType.batch, pairs=[{"a": 1, "b": 2}])
+        task.results = [3]
+
+        assert task.pairs == [{"a": 1, "b": 2}]
+        assert task.pair_array().tolist() == [[1, 2]]
+        assert task.results == [3]
+
+    def test_single_task_never_reads_the_payload(self):
+        """Test that single tasks do not touch the raise-on-load payload."""
+        task = Task(type=TaskType.single, a=1, b=2)
+
+        assert task.pairs is None
+        assert task.results is None
+        assert Task.payload.property.lazy == "raise"
+
+
+class TestBatchKernel:
+    """Test the vectorized batch addition kernel."""
+
+    def test_adds_every_pair(self):
+        """Test that the kernel adds all pairs into packed results."""
+        task = Task(type=TaskType.batch, pairs=[{"a": 1, "b": 2}, {"a": -5, "b": 3}])
+
+        assert unpack_results(_execute_batch_task(task)).tolist() == [3, -2]
+
+    def test_int64_extremes_do_not_overflow(self):
+        """Test that operands whose sum fits int64 are added exactly."""
+        task = Task(type=TaskType.batch, pairs=[{"a": INT64_MAX, "b": INT64_MIN}])
+
+        assert unpack_results(_execute_batch_task(task)).tolist() == [-1]
+
+    def test_demo_failure_pair_fails_the_batch(self):
+        """Test that a 99+99 pair anywhere in the batch fails it."""
+        task = Task(type=TaskType.batch, pairs=[{"a": 1, "b": 2}, {"a": 99, "b": 99}])
+
+        with pytest.raises(ValueError, match="99\\+99"):
+            _execute_batch_task(task)
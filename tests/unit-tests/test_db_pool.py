@@ -0,0 +1,110 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool
+
+from app.db import session
+from app.db.pool import TimedQueuePool, pool_stats
+
+
+def _pool(**kwargs):
+    """Build a one-connection timed pool over fake DBAPI connections."""
+    return TimedQueuePool(mock.MagicMock, pool_size=1, max_overflow=0, **kwargs)
+
+
+class TestPoolStats:
+    """Test pool occupancy and checkout wait reporting."""
+
+    def test_queue_pool_reports_occupancy_and_waits(self):
+        """Test that a queue pool reports its connections and checkouts."""
+        pool = _pool()
+        conn = pool.connect()
+
+        stats = pool_stats(pool)
+
+        assert stats["pool"] == "TimedQueuePool"
+        assert stats["size"] == 1
+        assert stats["checked_out"] == 1
+        assert stats["overflow"] == 0
+        assert stats["checkouts"] == 1
+        assert stats["checkout_timeouts"] == 0
+        assert stats["checkout_wait_seconds_max"] >= 0
+        conn.close()
+        assert pool_stats(pool)["checked_in"] == 1
+
+    def test_null_pool_holds_nothing(self):
+        """Test that an externally pooled engine reports no local pool."""
+        assert pool_stats(NullPool(mock.MagicMock)) == {"pool": "null"}
+
+    def test_exhausted_pool_counts_timeouts(self):
+        """Test that a checkout giving up on a full pool is recorded."""
+        pool = _pool(timeout=0.01)
+        conn = pool.connect()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.connect()
+
+        stats = pool_stats(pool)
+        assert stats["checkouts"] == 2
+        assert stats["checkout_timeouts"] == 1
+        assert stats["checkout_wait_seconds_max"] >= 0.01
+        conn.close()
+
+    def test_recreated_pool_keeps_counting(self):
+        """Test that dispose() does not reset the checkout figures."""
+        pool = _pool()
+        pool.connect().close()
+
+        recreated = pool.recreate()
+
+        assert isinstance(recreated, TimedQueuePool)
+        assert recreated.checkout_timer is pool.checkout_timer
+        recreated.connect().close()
+        assert pool_stats(recreated)["checkouts"] == 2
+
+
+class TestEngineSettings:
+    """Test engine arguments for direct and PgBouncer connections."""
+
+    @pytest.fixture
+    def settings(self, monkeypatch):
+        """Settings with a statement timeout, connecting directly."""
+        monkeypatch.setattr(session.settings, "db_pgbouncer", False)
+        monkeypatch.setattr(session.settings, "db_statement_timeout_ms", 5000)
+        return session.settings
+
+    def test_direct_connections_use_the_timed_pool(self, settings):
+        """Test that the pool is sized from settings and pre-pinged."""
+        kwargs = session._pool_kwargs(TimedQueuePool)
+
+        assert kwargs["poolclass"] is TimedQueuePool
+        assert kwargs["pool_size"] == settings.db_pool_size
+        assert kwargs["max_overflow"] == settings.db_max_overflow
+        assert kwargs["pool_pre_ping"] is True
+
+    def test_direct_connections_set_statement_timeout(self, settings):
+        """Test that both drivers apply the statement timeout at connect."""
+        assert session._sync_connect_args() == {"options": "-c statement_timeout=5000"}
+        assert session._async_connect_args() == {
+            "server_settings": {"statement_timeout": "5000"}
+        }
+
+    def test_pgbouncer_leaves_pooling_to_the_bouncer(self, settings):
+        """Test that PgBouncer mode holds no connections in the process."""
+        settings.db_pgbouncer = True
+
+        assert session._pool_kwargs(TimedQueuePool) == {"poolclass": NullPool}
+        assert session._sync_connect_args() == {}
+
+    def test_pgbouncer_disables_named_prepared_statements(self, settings):
+        """Test that asyncpg never reuses a prepared statement name."""
+        settings.db_pgbouncer = True
+
+        args = session._async_connect_args()
+
+        assert args["statement_cache_size"] == 0
+        assert args["prepared_statement_cache_size"] == 0
+        name = args["prepared_statement_name_func"]
+        assert name() != name()
+        assert "server_settings" not in args
@@ -0,0 +1,176 @@
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from celery.exceptions import Retry
+
+from app.celery_app import tasks
+from app.models.task import Task, TaskStatus
+
+
+def _task(priority, scheduled_for=None, task_id=1, next_retries=0):
+    """Build the task fields the publisher reads."""
+    return SimpleNamespace(
+        id=task_id,
+        queue_priority=priority,
+        scheduled_for=scheduled_for,
+        dispatch_version=0,
+        next_retries=next_retries,
+    )
+
+
+@pytest.fixture
+def published():
+    """Capture apply_async calls instead of talking to the broker."""
+    calls = []
+
+    def apply_async(self, args=None, countdown=None, retries=0, **kwargs):
+        calls.append((self.name.rsplit(".", 1)[1], args, countdown, retries))
+
+    with mock.patch("celery.app.task.Task.apply_async", apply_async), mock.patch(
+        "app.celery_app.tasks.celery_app.producer_or_acquire",
+        return_value=nullcontext(),
+    ):
+        yield calls
+
+
+class TestPriorityDelays:
+    """Test priority delays applied as dispatch countdowns."""
+
+    def test_dedicated_queues_are_delayed_by_priority(self, monkeypatch):
+        """Test that lower priority queues get a longer countdown."""
+        monkeypatch.setattr(tasks.settings, "worker_scheduling", "dedicated")
+
+        assert tasks.queue_delay("high_priority") == 0
+        assert tasks.queue_delay("medium_priority") == 5
+        assert tasks.queue_delay("low_priority") == 10
+        assert tasks.queue_delay("unknown") == 0
+
+    def test_publish_uses_countdown_instead_of_sleeping(self, monkeypatch, published):
+        """Test that a ready task is published with its queue delay."""
+        monkeypatch.setattr(tasks.settings, "worker_scheduling", "dedicated")
+
+        tasks._publish_task(_task(3))
+        tasks._publish_task(_task(1))
+
+        assert published == [
+            ("execute_task_low_priority", ["1", 0], 10, 0),
+            ("execute_task_high_priority", ["1", 0], None, 0),
+        ]
+
+    def test_scheduled_task_adds_delay_to_time_until_due(self, monkeypatch, published):
+        """Test that a scheduled task waits for its time plus the queue delay."""
+        monkeypatch.setattr(tasks.settings, "worker_scheduling", "dedicated")
+        due = datetime.now(timezone.utc) + timedelta(seconds=20)
+
+        tasks._publish_task(_task(2, scheduled_for=due))
+
+        countdown = published[0][2]
+        assert 24 < countdown <= 25
+
+
+class TestRetryBudget:
+    """Test that re-dispatching a task keeps its retry count."""
+
+    def test_task_queued_for_retry_keeps_its_attempt(self):
+        """Test that only a task waiting for a retry continues counting."""
+        task = Task(status=TaskStatus.queued, retry_count=1)
+        assert task.next_retries == 2
+
+        task.status = TaskStatus.pending
+        assert task.next_retries == 0
+
+    def test_publish_sends_retry_count(self, monkeypatch, published):
+        """Test that the message carries the retry count of the next attempt."""
+        monkeypatch.setattr(tasks.settings, "worker_scheduling", "dedicated")
+
+        tasks._publish_task(_task(1, next_retries=2))
+
+        assert published == [("execute_task_high_priority", ["1", 0], None, 2)]
+
+    def test_retrying_tasks_are_not_batched(self, monkeypatch, published):
+        """Test that a batch claim cannot reset a pending retry count."""
+        monkeypatch.setattr(tasks.settings, "worker_scheduling", "dedicated")
+        monkeypatch.setattr(tasks.settings, "task_batch_size", 10)
+
+        tasks.enqueue_tasks(
+            [
+                _task(1, task_id=1),
+                _task(1, task_id=2),
+                _task(1, task_id=3, next_retries=1),
+            ]
+        )
+
+        assert published == [
+            ("execute_task_high_priority", ["3", 0], None, 1),
+            ("execute_batch_high_priority", [[[1, 0], [2, 0]]], None, 0),
+        ]
+
+
+class TestMicroBatches:
+    """Test grouping ready tasks into micro-batch messages."""
+
+    def test_ready_tasks_are_chunked_per_queue(self, monkeypatch, published):
+        """Test that ready tasks share messages of up to the batch size."""
+        monkeypatch.setattr(tasks.settings, "worker_scheduling", "dedicated")
+        monkeypatch.setattr(tasks.settings, "task_batch_size", 2)
+        ready = [_task(1, task_id=i) for i in (1, 2, 3)] + [_task(3, task_id=4)]
+
+        assert tasks.enqueue_tasks(ready) == 4
+
+        assert published == [
+            ("execute_batch_high_priority", [[[1, 0], [2, 0]]], None, 0),
+            ("execute_task_high_priority", ["3", 0], None, 0),
+            ("execute_task_low_priority", ["4", 0], 10, 0),
+        ]
+
+    def test_scheduled_tasks_keep_their_own_message(self, monkeypatch, published):
+        """Test that a future task is published alone with its countdown."""
+        monkeypatch.setattr(tasks.settings, "worker_scheduling", "dedicated")
+        due = datetime.now(timezone.utc) + timedelta(seconds=20)
+
+        tasks.enqueue_tasks(
+            [_task(1, task_id=1), _task(1, due, task_id=2), _task(1, task_id=3)]
+        )
+
+        assert [call[0] for call in published] == [
+            "execute_task_high_priority",
+            "execute_batch_high_priority",
+        ]
+        assert published[1][1] == [[[1, 0], [3, 0]]]
+
+    def test_batch_size_one_disables_batching(self, monkeypatch, published):
+        """Test that a batch size of one publishes one message per task."""
+        monkeypatch.setattr(tasks.settings, "task_batch_size", 1)
+
+        tasks.enqueue_tasks([_task(2, task_id=1), _task(2, task_id=2)])
+
+        assert [call[0] for call in published] == ["execute_task_medium_priority"] * 2
+
+
+class TestBatchExecution:
+    """Test how a micro-batch message is settled when things fail."""
+
+    def test_failed_claim_retries_the_whole_message(self, monkeypatch):
+        """Test that a batch whose claim fails is redelivered, not acked."""
+        monkeypatch.setattr(tasks.settings, "worker_scheduling", "dedicated")
+        service = mock.MagicMock()
+        service.claim_many.side_effect = ConnectionError("database is down")
+        monkeypatch.setattr(tasks, "SessionLocal", mock.MagicMock())
+        monkeypatch.setattr(tasks, "TaskService", lambda db: service)
+        worker = SimpleNamespace(
+            request=SimpleNamespace(
+                delivery_info={"routing_key": "medium_priority"}, retries=1
+            ),
+            retry=mock.Mock(return_value=Retry()),
+        )
+
+        with pytest.raises(Retry):
+            tasks._execute_batch(worker, [[1, 0], [2, 0]])
+
+        worker.retry.assert_called_once_with(
+            countdown=65, exc=service.claim_many.side_effect
+        )
+        service.finish_many.assert_not_called()
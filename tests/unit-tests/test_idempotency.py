@@ -0,0 +1,73 @@
+import asyncio
+
+from app.api.v1.tasks import _create_once
+from app.exceptions import DuplicateIdempotencyKeyError
+
+
+class FakeService:
+    """Idempotency-Key lookups over an in-memory key table."""
+
+    def __init__(self, keys=None):
+        self.keys = dict(keys or {})
+
+    async def get_by_idempotency_key(self, key):
+        return self.keys.get(key)
+
+
+class Creator:
+    """Record calls to a task creation callback."""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class TestIdempotentCreate:
+    """Test replaying task creation under an Idempotency-Key."""
+
+    def test_repeated_key_returns_original_task_without_creating(self):
+        """Test that a known key replays the task it created."""
+        create = Creator(result="new")
+        service = FakeService({"key-1": "original"})
+
+        task = asyncio.run(_create_once(service, "key-1", create))
+
+        assert task == "original"
+        assert create.calls == 0
+
+    def test_new_key_creates_task(self):
+        """Test that an unused key creates the task."""
+        create = Creator(result="new")
+
+        task = asyncio.run(_create_once(FakeService(), "key-1", create))
+
+        assert task == "new"
+        assert create.calls == 1
+
+    def test_without_key_always_creates(self):
+        """Test that requests without a key are never deduplicated."""
+        create = Creator(result="new")
+        service = FakeService({None: "original"})
+
+        assert asyncio.run(_create_once(service, None, create)) == "new"
+        assert asyncio.run(_create_once(service, None, create)) == "new"
+        assert create.calls == 2
+
+    def test_concurrent_duplicate_returns_winning_task(self):
+        """Test that losing the key binding race returns the other task."""
+        service = FakeService()
+        create = Creator(error=DuplicateIdempotencyKeyError("key-1"))
+
+        async def race():
+            # The concurrent request commits after our lookup, before our insert
+            service.keys["key-1"] = "winner"
+            return await create()
+
+        assert asyncio.run(_create_once(service, "key-1", race)) == "winner"
@@ -0,0 +1,43 @@
+from prometheus_client import REGISTRY
+
+
+def _requests(method, route, status):
+    """Count requests recorded under the given labels so far."""
+    count = REGISTRY.get_sample_value(
+        "http_request_duration_seconds_count",
+        {"method": method, "route": route, "status": status},
+    )
+    return count or 0
+
+
+class TestRequestLatency:
+    """Test the request latency middleware and the metrics endpoint."""
+
+    def test_request_is_labelled_by_route_template(self, client):
+        """Test that task ids do not create one label value per task."""
+        route = "/api/v1/tasks/{task_id}"
+        before = _requests("GET", route, "422")
+
+        client.get("/api/v1/tasks/first")
+        client.get("/api/v1/tasks/second")
+
+        assert _requests("GET", route, "422") == before + 2
+        assert _requests("GET", "/api/v1/tasks/first", "422") == 0
+
+    def test_unknown_path_is_labelled_unmatched(self, client):
+        """Test that paths matching no route share a single label value."""
+        before = _requests("GET", "unmatched", "404")
+
+        assert client.get("/no/such/path").status_code == 404
+
+        assert _requests("GET", "unmatched", "404") == before + 1
+
+    def test_metrics_endpoint_renders_exposition(self, client):
+        """Test that /metrics serves the Prometheus text format."""
+        client.get("/no/such/path")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "http_request_duration_seconds_bucket" in response.text
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.tasks import TaskJSONResponse
+from app.exceptions import TaskValidationError
+from app.models.task import TaskStatus, TaskType
+from app.schemas.task import TaskListItem, TotalMode
+from app.services import task_service
+from app.services.task_service import (
+    LIST_FIELD_COLUMNS,
+    _count_statement,
+    decode_cursor,
+    encode_cursor,
+    parse_list_fields,
+)
+
+
+class TestCursor:
+    """Test keyset pagination cursors."""
+
+    def test_round_trip(self):
+        """Test that a cursor decodes to the position it was made from."""
+        created_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        cursor = encode_cursor(SimpleNamespace(created_at=created_at, id=42))
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (created_at, 42)
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "", "WzFd", "bnVsbA"])
+    def test_rejects_malformed_cursor(self, cursor):
+        """Test that garbage cursors raise a validation error."""
+        with pytest.raises(TaskValidationError):
+            decode_cursor(cursor)
+
+    def test_bad_cursor_is_a_bad_request(self, client, db):
+        """Test that listing with a malformed cursor answers 400."""
+        response = client.get("/api/v1/tasks", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+        assert "invalid cursor" in response.json()["detail"]
+        db.execute.assert_not_called()
+
+
+class TestListFields:
+    """Test the ``fields`` selection of task listings."""
+
+    def test_defaults_to_every_field(self):
+        """Test that no selection lists every task field."""
+        assert parse_list_fields(None) == list(LIST_FIELD_COLUMNS)
+        assert parse_list_fields(" , ") == list(LIST_FIELD_COLUMNS)
+
+    def test_keeps_order_and_drops_duplicates(self):
+        """Test that selected fields are parsed in request order, once each."""
+        assert parse_list_fields("status, id,status,,result") == [
+            "status",
+            "id",
+            "result",
+        ]
+
+    def test_rejects_unknown_fields(self):
+        """Test that unknown field names are reported."""
+        with pytest.raises(TaskValidationError, match="unknown fields secret, x"):
+            parse_list_fields("id,secret,x")
+
+
+class TestListResponse:
+    """Test the rendering and schema of task listings."""
+
+    def test_datetimes_render_like_validated_responses(self):
+        """Test that raw rows use the same datetime format as TaskRead."""
+        finished_at = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        item = {"id": 1, "status": TaskStatus.success, "finished_at": finished_at}
+
+        body = json.loads(TaskJSONResponse({"items": [item]}).body)
+        expected = json.loads(TaskListItem(**item).json())
+
+        assert body["items"][0]["finished_at"] == expected["finished_at"]
+        assert body["items"][0]["finished_at"] == "2024-05-01T12:30:15.123456Z"
+        assert body["items"][0]["status"] == "success"
+
+    def test_schema_documents_partial_items(self, client):
+        """Test that OpenAPI declares every listed field as optional."""
+        schemas = client.get("/openapi.json").json()["components"]["schemas"]
+
+        items = schemas["TaskList"]["properties"]["items"]["items"]
+        assert items == {"$ref": "#/components/schemas/TaskListItem"}
+        assert "required" not in schemas["TaskListItem"]
+        assert set(schemas["TaskListItem"]["properties"]) == set(LIST_FIELD_COLUMNS)
+
+
+class TestTotals:
+    """Test listing totals read from the task counters."""
+
+    def _sql(self, total_mode, status=(TaskStatus.success,), type_=TaskType.single):
+        """Render the total count query of a listing."""
+        statement = _count_statement(list(status), type_, total_mode)
+        return str(
+            statement.compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+
+    def test_exact_total_sums_counter_rows(self):
+        """Test that totals come from task_counters, not a count of tasks."""
+        sql = self._sql(TotalMode.exact)
+
+        assert "sum(task_counters.n)" in sql
+        assert "FROM task_counters" in sql
+        assert "task_counters.status IN ('success')" in sql
+        assert "task_counters.type = 'single'" in sql
+        assert "FROM tasks" not in sql
+
+    def test_capped_total_is_bounded(self, monkeypatch):
+        """Test that a capped total never exceeds LIST_TOTAL_CAP."""
+        monkeypatch.setattr(task_service.get_settings(), "list_total_cap", 10000)
+
+        assert "least(coalesce(sum(task_counters.n), 0), 10000)" in self._sql(
+            TotalMode.capped
+        )
+
+    def test_no_total_skips_counting(self):
+        """Test that total=none runs no count query."""
+        assert _count_statement([TaskStatus.success], None, TotalMode.none) is None
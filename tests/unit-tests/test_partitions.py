@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+
+from app.services.task_partitions import (
+    TaskPartitionService,
+    add_months,
+    month_start,
+    partition_month,
+    partition_name,
+)
+
+
+class TestMonthlyPartitions:
+    """Test naming and bounds of the monthly tasks partitions."""
+
+    def test_month_start_is_utc(self):
+        """Test that the month is taken in UTC, not local time."""
+        moment = datetime(2024, 6, 1, 1, 30, tzinfo=timezone(timedelta(hours=3)))
+
+        assert month_start(moment) == datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+    @pytest.mark.parametrize(
+        "months, expected",
+        [
+            (0, (2024, 11)),
+            (1, (2024, 12)),
+            (2, (2025, 1)),
+            (14, (2026, 1)),
+            (-11, (2023, 12)),
+        ],
+    )
+    def test_add_months_crosses_years(self, months, expected):
+        """Test month arithmetic across year boundaries."""
+        month = datetime(2024, 11, 1, tzinfo=timezone.utc)
+
+        result = add_months(month, months)
+
+        assert (result.year, result.month, result.day) == (*expected, 1)
+
+    def test_name_round_trip(self):
+        """Test that a partition name maps back to its month."""
+        month = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+        assert partition_name(month) == "tasks_p2024_05"
+        assert partition_month("tasks_p2024_05") == month
+
+    @pytest.mark.parametrize("name", ["tasks", "tasks_default", "tasks_p2024_5", "x"])
+    def test_other_tables_are_not_partitions(self, name):
+        """Test that only monthly partition names are recognized."""
+        assert partition_month(name) is None
+
+
+class TestDropDetached:
+    """Test dropping a detached partition."""
+
+    def test_statement_timeout_is_lifted_before_any_work(self):
+        """Test that exporting and deleting a month is not cut off midway."""
+        db = mock.MagicMock()
+        db.execute.return_value.scalar_one.return_value = 0
+
+        TaskPartitionService(db).drop_detached("tasks_p2024_01")
+
+        sql = [str(call.args[0]) for call in db.execute.call_args_list]
+        assert sql[0] == "SET LOCAL statement_timeout = 0"
+        assert sql[-1] == "DROP TABLE tasks_p2024_01"
+        db.commit.assert_called_once()
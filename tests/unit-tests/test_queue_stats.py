@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.task import TaskStatus
+from app.services import queue_stats
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _sql(statement):
+    """Render a statement as PostgreSQL with literal parameters."""
+    return str(
+        statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def _message(queue):
+    """Build a message as listed by ``inspect().reserved()``."""
+    return {"id": "m", "delivery_info": {"routing_key": queue}}
+
+
+class FakeInspect:
+    """Canned worker replies of a Celery inspect call."""
+
+    def __init__(self, reserved=None, scheduled=None):
+        self._reserved = reserved
+        self._scheduled = scheduled
+
+    def reserved(self):
+        return self._reserved
+
+    def scheduled(self):
+        return self._scheduled
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    """Start every test without a cached snapshot."""
+    monkeypatch.setattr(queue_stats, "_cached", None)
+
+
+class TestWorkerMessageCounts:
+    """Test counting worker-held messages per queue."""
+
+    def test_reserved_and_scheduled_replies_are_unwrapped(self, monkeypatch):
+        """Test that scheduled entries are counted by their nested request."""
+        replies = FakeInspect(
+            reserved={
+                "worker-1": [_message("high_priority"), _message("high_priority")],
+                "worker-2": [_message("low_priority"), {"id": "m"}],
+            },
+            scheduled={
+                "worker-1": [
+                    {
+                        "eta": "2024-05-01T12:01:00",
+                        "request": _message("medium_priority"),
+                    }
+                ],
+                "worker-2": [{"eta": "2024-05-01T12:01:00"}],
+            },
+        )
+        monkeypatch.setattr(
+            queue_stats.celery_app.control, "inspect", lambda timeout: replies
+        )
+
+        reserved, scheduled = queue_stats._worker_message_counts()
+
+        assert reserved == {"high_priority": 2, "low_priority": 1, "unknown": 1}
+        assert scheduled == {"medium_priority": 1, "unknown": 1}
+
+    def test_no_worker_reply_is_unknown(self, monkeypatch):
+        """Test that an unanswered inspect reports no counts rather than zero."""
+        monkeypatch.setattr(
+            queue_stats.celery_app.control, "inspect", lambda timeout: FakeInspect()
+        )
+
+        assert queue_stats._worker_message_counts() == (None, None)
+
+
+class TestCollect:
+    """Test assembling the per-queue snapshot."""
+
+    def test_unreachable_broker_skips_worker_inspect(self, monkeypatch):
+        """Test that inspect is not attempted when no queue length was read."""
+        monkeypatch.setattr(
+            queue_stats, "_broker_lengths", lambda names: dict.fromkeys(names)
+        )
+        inspect = mock.Mock()
+        monkeypatch.setattr(queue_stats, "_worker_message_counts", inspect)
+        monkeypatch.setattr(queue_stats, "_database_counts", lambda now: ({}, {}))
+
+        snapshot = queue_stats.collect_queue_stats()
+
+        inspect.assert_not_called()
+        for queue in snapshot["queues"]:
+            assert queue["broker_length"] is None
+            assert queue["reserved"] is None
+            assert queue["scheduled"] is None
+
+
+class TestDatabaseCounts:
+    """Test the database figures of the snapshot."""
+
+    def test_oldest_waiting_task_is_grouped_by_queue_priority(self, monkeypatch):
+        """Test that an aged task counts towards the queue it now waits in."""
+        db = mock.MagicMock()
+        db.__enter__.return_value = db
+        oldest = NOW - timedelta(minutes=5)
+        db.execute.side_effect = [
+            [(3, TaskStatus.pending, 4), (3, TaskStatus.success, 2)],
+            mock.Mock(all=lambda: [(2, oldest)]),
+        ]
+        monkeypatch.setattr(queue_stats, "SessionLocal", lambda: db)
+
+        counts, waiting_since = queue_stats._database_counts(NOW)
+
+        assert counts == {3: {"pending": 4, "success": 2}}
+        assert waiting_since == {2: oldest}
+        counts_sql, oldest_sql = (_sql(c.args[0]) for c in db.execute.call_args_list)
+        assert "FROM task_counters GROUP BY task_counters.priority" in counts_sql
+        queue_priority = "coalesce(tasks.effective_priority, tasks.priority)"
+        assert f"GROUP BY {queue_priority}" in oldest_sql
+        assert "tasks.status IN ('pending', 'queued')" in oldest_sql
+
+
+class TestSnapshotCache:
+    """Test the in-process TTL cache of snapshots."""
+
+    def test_snapshot_is_reused_until_the_ttl_expires(self, monkeypatch):
+        """Test that polls within the TTL share one collection."""
+        settings = queue_stats.get_settings()
+        monkeypatch.setattr(settings, "queue_stats_ttl_seconds", 5)
+        clock = [100.0]
+        monkeypatch.setattr(
+            queue_stats, "time", SimpleNamespace(monotonic=lambda: clock[0])
+        )
+        collect = mock.Mock(side_effect=[{"n": 1}, {"n": 2}])
+        monkeypatch.setattr(queue_stats, "collect_queue_stats", collect)
+
+        assert queue_stats.queue_stats() == {"n": 1}
+        clock[0] += 4
+        assert queue_stats.queue_stats() == {"n": 1}
+        clock[0] += 1
+        assert queue_stats.queue_stats() == {"n": 2}
+        assert collect.call_count == 2
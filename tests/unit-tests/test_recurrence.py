@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models.task import RecurrenceInterval, RecurrenceRule
+from app.services.task_service import _advanced_rule_values, _recurring_task_row
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _rule(interval_type=RecurrenceInterval.minutely, interval_value=5, **kwargs):
+    """Build a recurrence rule due at ``NOW``."""
+    kwargs.setdefault("next_run_at", NOW)
+    return RecurrenceRule(
+        id=1,
+        interval_type=interval_type,
+        interval_value=interval_value,
+        base_payload={"a": 1, "b": 2},
+        priority=2,
+        **kwargs,
+    )
+
+
+class TestRuleAdvance:
+    """Test scheduling the next run of a fired recurrence rule."""
+
+    @pytest.mark.parametrize(
+        "interval_type, delta",
+        [
+            (RecurrenceInterval.minutely, timedelta(minutes=5)),
+            (RecurrenceInterval.hourly, timedelta(hours=5)),
+            (RecurrenceInterval.daily, timedelta(days=5)),
+        ],
+    )
+    def test_next_run_follows_interval(self, interval_type, delta):
+        """Test that a rule fired on time moves one interval ahead."""
+        values = _advanced_rule_values(_rule(interval_type), NOW)
+
+        assert values == {"next_run_at": NOW + delta, "active": True}
+
+    def test_rule_behind_skips_missed_runs(self):
+        """Test that a late rule fires once instead of catching up run by run."""
+        rule = _rule(next_run_at=NOW - timedelta(hours=1))
+
+        values = _advanced_rule_values(rule, NOW)
+
+        assert values["next_run_at"] == NOW + timedelta(minutes=5)
+
+    def test_run_once_rule_is_deactivated(self):
+        """Test that an interval of 0 fires once."""
+        values = _advanced_rule_values(_rule(interval_value=0), NOW)
+
+        assert values == {"next_run_at": NOW, "active": False}
+
+    def test_fired_task_row_comes_from_base_payload(self):
+        """Test that a fired rule creates a task linked to it."""
+        row = _recurring_task_row(_rule())
+
+        assert (row["a"], row["b"], row["priority"]) == (1, 2, 2)
+        assert row["recurrence_rule_id"] == 1
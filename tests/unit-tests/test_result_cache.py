@@ -0,0 +1,115 @@
+from unittest import mock
+
+import pytest
+import redis
+
+from app.models.task import Task, TaskType
+from app.services.result_cache import ResultCache, payload_key
+
+
+class FakeRedis:
+    """In-memory stand-in for the shared Redis tier."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return mock.MagicMock()
+
+
+def _batch(*pairs):
+    """Build a batch task of ``(a, b)`` pairs."""
+    return Task(type=TaskType.batch, pairs=[{"a": a, "b": b} for a, b in pairs])
+
+
+class TestPayloadKey:
+    """Test content addressing of task payloads."""
+
+    def test_identical_payloads_share_a_key(self):
+        """Test that tasks with the same operands map to one result."""
+        single = Task(type=TaskType.single, a=1, b=2)
+
+        assert payload_key(single) == payload_key(Task(type=TaskType.single, a=1, b=2))
+        assert payload_key(_batch((1, 2), (3, 4))) == payload_key(
+            _batch((1, 2), (3, 4))
+        )
+
+    def test_different_payloads_differ(self):
+        """Test that operand order, pair order and task type change the key."""
+        keys = {
+            payload_key(Task(type=TaskType.single, a=1, b=2)),
+            payload_key(Task(type=TaskType.single, a=2, b=1)),
+            payload_key(_batch((1, 2))),
+            payload_key(_batch((1, 2), (3, 4))),
+            payload_key(_batch((3, 4), (1, 2))),
+        }
+
+        assert len(keys) == 5
+
+    def test_task_without_operands_has_no_key(self):
+        """Test that incomplete single tasks are never memoized."""
+        assert payload_key(Task(type=TaskType.single, a=1)) is None
+
+
+class TestResultCache:
+    """Test the two-tier result cache."""
+
+    @pytest.fixture
+    def shared(self):
+        """Shared tier seen by every cache instance of a test."""
+        return FakeRedis()
+
+    def test_shared_hit_is_promoted_to_local_tier(self, shared):
+        """Test that a value stored by another worker is found and kept."""
+        ResultCache(10, 60, shared).set("k", b"v")
+        cache = ResultCache(10, 60, shared)
+
+        assert cache.get("k") == b"v"
+        shared.data.clear()
+        assert cache.get("k") == b"v"
+        assert cache.stats() == {
+            "local_hits": 1,
+            "redis_hits": 1,
+            "misses": 0,
+            "local_entries": 1,
+        }
+
+    def test_local_tier_evicts_least_recently_used(self, shared):
+        """Test that the local tier keeps at most ``max_entries`` values."""
+        cache = ResultCache(2, 60, shared)
+        cache.set("a", b"1")
+        cache.set("b", b"2")
+        cache.get("a")
+        cache.set("c", b"3")
+        shared.data.clear()
+
+        assert cache.get("a") == b"1"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"3"
+
+    def test_expired_local_entries_are_dropped(self, shared):
+        """Test that local values expire after the TTL."""
+        cache = ResultCache(10, 60, shared)
+        with mock.patch("time.monotonic", return_value=1000.0):
+            cache.set("k", b"v")
+        shared.data.clear()
+
+        with mock.patch("time.monotonic", return_value=1061.0):
+            assert cache.get("k") is None
+
+    def test_redis_errors_count_as_misses(self):
+        """Test that an unreachable shared tier does not fail the task."""
+        client = mock.MagicMock()
+        client.get.side_effect = redis.ConnectionError("down")
+        client.set.side_effect = redis.ConnectionError("down")
+        cache = ResultCache(10, 60, client)
+
+        assert cache.get("k") is None
+        cache.set("k", b"v")
+        assert cache.get("k") == b"v"
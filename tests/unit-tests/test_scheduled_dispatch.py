@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.celery_app import outbox_relay
+from app.services import task_service
+from app.services.task_service import _defers, _release_scheduled_statement, _task_row
+
+
+def _in(seconds):
+    """Return an aware UTC datetime ``seconds`` from now."""
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+@pytest.fixture(autouse=True)
+def lookahead(monkeypatch):
+    """Use a 30 second dispatch lookahead."""
+    settings = task_service.get_settings()
+    monkeypatch.setattr(settings, "scheduled_dispatch_lookahead_seconds", 30)
+
+
+class TestDeferral:
+    """Test which scheduled tasks stay in the database until due."""
+
+    def test_unscheduled_task_is_dispatched(self):
+        """Test that a task without a schedule is never deferred."""
+        assert _defers(None) is False
+
+    def test_task_due_within_lookahead_is_dispatched(self):
+        """Test that near-future tasks are published with a countdown."""
+        assert _defers(_in(-60)) is False
+        assert _defers(_in(20)) is False
+
+    def test_task_due_beyond_lookahead_is_deferred(self):
+        """Test that far-future tasks get no outbox row when created."""
+        assert _defers(_in(40)) is True
+        assert _defers(_in(86400)) is True
+
+    def test_naive_datetimes_are_utc(self):
+        """Test that a naive scheduled time is compared as UTC."""
+        naive = _in(3600).replace(tzinfo=None)
+
+        assert _defers(naive) is True
+        assert _defers(naive - timedelta(seconds=3590)) is False
+
+    def test_bulk_rows_carry_deferral(self):
+        """Test that bulk created tasks are deferred like single creates."""
+        assert _task_row({"a": 1, "b": 2, "scheduled_for": _in(3600)})["deferred"]
+        assert not _task_row({"pairs": [{"a": 1, "b": 2}]})["deferred"]
+
+
+class TestRelease:
+    """Test staging deferred tasks once they are due."""
+
+    def test_release_stages_due_deferred_tasks_once(self):
+        """Test that due tasks are claimed, undeferred and staged together."""
+        horizon = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+        sql = str(
+            _release_scheduled_statement(horizon, 1000).compile(
+                dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+            )
+        )
+
+        assert "WHERE tasks.deferred AND tasks.scheduled_for <= '2024-05-01" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "SET deferred=false" in sql
+        assert "INSERT INTO task_outbox" in sql
+
+    def test_relay_skips_rows_of_deferred_tasks(self):
+        """Test that a still deferred task is not published by the relay."""
+        rows = [
+            SimpleNamespace(outbox_id=1, id=10, deferred=False),
+            SimpleNamespace(outbox_id=2, id=11, deferred=True),
+        ]
+        service = mock.MagicMock()
+        service.pending_dispatches.return_value = rows
+
+        with mock.patch.object(outbox_relay, "enqueue_tasks") as enqueue:
+            assert outbox_relay.relay_batch(service, 10) == 2
+
+        assert [row.id for row in enqueue.call_args.args[0]] == [10]
+        service.mark_dispatched.assert_called_once_with([1, 2])
@@ -0,0 +1,128 @@
+from collections import Counter
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.celery_app import tasks
+from app.celery_app.scheduling import QUEUES, WeightedCycle, parse_queue_weights
+from app.models.task import Task
+from app.services.task_service import _age_waiting_statement, _reprioritize_statement
+
+
+def _sql(statement):
+    """Render a statement as PostgreSQL with literal parameters."""
+    return str(
+        statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def _serve(cycle, backlogged, messages):
+    """Count deliveries when BRPOP takes from the first backlogged queue."""
+    served = Counter()
+    for _ in range(messages):
+        queue = next(q for q in cycle.consume(len(QUEUES)) if q in backlogged)
+        cycle.rotate(queue)
+        served[queue] += 1
+    return served
+
+
+class TestQueueWeights:
+    """Test parsing of QUEUE_WEIGHTS."""
+
+    def test_parses_high_medium_low(self):
+        """Test that weights map to the queues in priority order."""
+        assert parse_queue_weights("6:3:1") == {
+            "high_priority": 6,
+            "medium_priority": 3,
+            "low_priority": 1,
+        }
+
+    @pytest.mark.parametrize("spec", ["6:3", "6:3:1:1", "6:0:1", "6:-1:1", "a:b:c"])
+    def test_rejects_invalid_specs(self, spec):
+        """Test that every queue needs a positive weight."""
+        with pytest.raises(ValueError):
+            parse_queue_weights(spec)
+
+
+class TestWeightedCycle:
+    """Test weighted consumption of the priority queues."""
+
+    @pytest.fixture
+    def cycle(self, monkeypatch):
+        monkeypatch.setattr(tasks.settings, "queue_weights", "6:3:1")
+        return WeightedCycle(QUEUES)
+
+    def test_backlogged_queues_are_served_by_weight(self, cycle):
+        """Test that full queues are served exactly in the 6:3:1 ratio."""
+        served = _serve(cycle, set(QUEUES), 200)
+
+        assert served == {
+            "high_priority": 120,
+            "medium_priority": 60,
+            "low_priority": 20,
+        }
+
+    def test_idle_queue_share_goes_to_the_others(self, cycle):
+        """Test that an empty queue leaves its share to the busy ones."""
+        served = _serve(cycle, {"medium_priority", "low_priority"}, 100)
+
+        assert served == {"medium_priority": 75, "low_priority": 25}
+
+    def test_idle_queue_does_not_bank_credit(self, cycle):
+        """Test that a queue coming back from idle gets no burst."""
+        _serve(cycle, {"medium_priority", "low_priority"}, 50)
+
+        served = _serve(cycle, set(QUEUES), 10)
+
+        assert served == {"high_priority": 6, "medium_priority": 3, "low_priority": 1}
+
+    def test_unweighted_queue_weighs_one(self, cycle):
+        """Test that queues outside QUEUE_WEIGHTS get weight 1."""
+        assert cycle.weight("tasks") == 1
+
+
+class TestPriorityAging:
+    """Test raising long waiting tasks to a higher queue."""
+
+    def test_weighted_scheduling_has_no_priority_delay(self, monkeypatch):
+        """Test that weighted workers get messages without a countdown."""
+        monkeypatch.setattr(tasks.settings, "worker_scheduling", "weighted")
+
+        assert tasks.queue_delay("low_priority") == 0
+
+    def test_queue_priority_prefers_aged_level(self):
+        """Test that an aged task is dispatched at its raised level."""
+        assert Task(priority=3).queue_priority == 3
+        assert Task(priority=3, effective_priority=2).queue_priority == 2
+
+    def test_aging_raises_one_level_and_redispatches(self):
+        """Test that aging bumps the version and stages the dispatch at once."""
+        cutoff = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+        sql = _sql(_age_waiting_statement(cutoff, 100))
+
+        queue_priority = "coalesce(tasks.effective_priority, tasks.priority)"
+        assert f"effective_priority=({queue_priority} - 1)" in sql
+        assert f"{queue_priority} > 1" in sql
+        assert "dispatch_version=(tasks.dispatch_version + 1)" in sql
+        assert "tasks.status = 'pending'" in sql
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "INSERT INTO task_outbox" in sql
+
+    def test_reprioritize_resets_aging(self):
+        """Test that an explicit priority change drops the aged level."""
+        sql = _sql(_reprioritize_statement(7, 2))
+
+        waiting = "WHEN (tasks.status IN ('pending', 'queued'))"
+        assert f"effective_priority=CASE {waiting} THEN NULL" in sql
+        assert f"dispatch_version=CASE {waiting} THEN tasks.dispatch_version + 1" in sql
+
+    def test_reprioritize_keeps_running_task_messages_valid(self):
+        """Test that only waiting tasks get a new dispatch version."""
+        sql = _sql(_reprioritize_statement(7, 2))
+
+        assert "ELSE tasks.dispatch_version END" in sql
+        assert "ELSE tasks.effective_priority END" in sql
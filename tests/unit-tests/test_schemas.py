@@ -0,0 +1,59 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.task import INT64_MAX, INT64_MIN, Pair, TaskFilter
+
+
+class TestPair:
+    """Test batch operand validation."""
+
+    def test_accepts_full_int64_operands(self):
+        """Test that 64-bit operands are accepted while their sum fits."""
+        pair = Pair(a=INT64_MAX, b=-1)
+        assert (pair.a, pair.b) == (INT64_MAX, -1)
+        assert Pair(a=INT64_MIN, b=0).a == INT64_MIN
+
+    @pytest.mark.parametrize(
+        "a, b",
+        [(INT64_MAX + 1, 0), (0, INT64_MIN - 1), (INT64_MAX, 1), (INT64_MIN, -1)],
+    )
+    def test_rejects_operands_or_sums_outside_int64(self, a, b):
+        """Test that values which cannot be packed as int64 are rejected."""
+        with pytest.raises(ValidationError):
+            Pair(a=a, b=b)
+
+
+class TestTaskFilter:
+    """Test filters selecting tasks for bulk actions."""
+
+    def test_requires_a_criterion(self):
+        """Test that an empty filter cannot select every task."""
+        with pytest.raises(ValidationError, match="at least one filter criterion"):
+            TaskFilter()
+
+    def test_explicit_nulls_are_not_criteria(self):
+        """Test that criteria given as null do not count."""
+        with pytest.raises(ValidationError):
+            TaskFilter(status=None, type=None, recurrence_rule_id=None)
+
+    @pytest.mark.parametrize(
+        "criterion",
+        [
+            {"ids": [1]},
+            {"status": ["failed"]},
+            {"type": "batch"},
+            {"priority": 3},
+            {"created_after": "2024-05-01T00:00:00Z"},
+            {"recurrence_rule_id": 0},
+        ],
+    )
+    def test_any_single_criterion_is_enough(self, criterion):
+        """Test that one criterion, even a falsy one, makes a valid filter."""
+        assert TaskFilter(**criterion)
+
+    def test_empty_lists_are_rejected(self):
+        """Test that an empty id or status list is not a criterion."""
+        with pytest.raises(ValidationError):
+            TaskFilter(ids=[])
+        with pytest.raises(ValidationError):
+            TaskFilter(status=[])
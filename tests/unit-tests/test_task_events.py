@@ -0,0 +1,94 @@
+import json
+from unittest import mock
+
+from app.models.task import Task, TaskStatus, TaskType
+from app.services.task_events import (
+    CHANNEL,
+    SUBSCRIBER_BUFFER,
+    Subscription,
+    TaskEventHub,
+    task_event,
+)
+from app.services.task_read_cache import INVALIDATION_CHANNEL
+
+
+def _event(task_id=1, status="success", type_="single"):
+    """Build a status event as published by the workers."""
+    return {"task_id": task_id, "status": status, "type": type_}
+
+
+class TestSubscription:
+    """Test filtering and buffering of task status events."""
+
+    def test_event_describes_the_transition(self):
+        """Test the payload published for a status change."""
+        task = Task(id=7, type=TaskType.batch, priority=3)
+
+        event = task_event(task, TaskStatus.running)
+
+        assert event["task_id"] == 7
+        assert (event["status"], event["type"], event["priority"]) == (
+            "running",
+            "batch",
+            3,
+        )
+
+    def test_matches_every_given_filter(self):
+        """Test that task ids, statuses and type all have to match."""
+        subscription = Subscription(
+            task_ids={1, 2}, statuses={"failed"}, type_=TaskType.single
+        )
+
+        assert subscription.matches(_event(2, "failed"))
+        assert not subscription.matches(_event(3, "failed"))
+        assert not subscription.matches(_event(2, "success"))
+        assert not subscription.matches(_event(2, "failed", "batch"))
+
+    def test_no_filter_matches_everything(self):
+        """Test that an unfiltered subscription sees every event."""
+        assert Subscription(task_ids=set(), statuses=set()).matches(_event())
+
+    def test_slow_subscriber_drops_oldest_events(self):
+        """Test that a full buffer keeps the newest events."""
+        subscription = Subscription()
+        for task_id in range(SUBSCRIBER_BUFFER + 1):
+            subscription.offer(_event(task_id))
+
+        first = subscription.queue.get_nowait()
+
+        assert first["task_id"] == 1
+        assert subscription.queue.qsize() == SUBSCRIBER_BUFFER - 1
+
+
+class TestEventHub:
+    """Test fan-out of channel messages within one API process."""
+
+    def test_dispatches_to_matching_subscriptions(self):
+        """Test that events reach only the subscriptions they match."""
+        evicted = []
+        hub = TaskEventHub(mock.MagicMock(), on_change=evicted.append)
+        watching, other = Subscription(task_ids={1}), Subscription(task_ids={2})
+        hub._subscriptions.update({watching, other})
+
+        hub._handle({"channel": CHANNEL.encode(), "data": json.dumps(_event(1))})
+
+        assert watching.queue.qsize() == 1
+        assert other.queue.empty()
+        assert evicted == [1]
+
+    def test_invalidations_evict_without_events(self):
+        """Test that cache invalidations are not delivered as status events."""
+        evicted = []
+        hub = TaskEventHub(mock.MagicMock(), on_change=evicted.append)
+        subscription = Subscription()
+        hub._subscriptions.add(subscription)
+
+        hub._handle(
+            {
+                "channel": INVALIDATION_CHANNEL.encode(),
+                "data": json.dumps({"task_ids": [4, 5]}),
+            }
+        )
+
+        assert evicted == [4, 5]
+        assert subscription.queue.empty()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+from app.services.task_read_cache import (
+    INVALIDATION_CHANNEL,
+    INVALIDATION_CHUNK,
+    TaskReadCache,
+    cache_key,
+    invalidation_chunks,
+)
+
+
+class FakePipeline:
+    """Buffer pipeline commands and apply them on ``execute``."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value))
+
+    def publish(self, channel, message):
+        self.commands.append(("publish", channel, message))
+
+    async def execute(self):
+        for command, key, value in self.commands:
+            if command == "set":
+                self.client.data[key] = value
+            else:
+                self.client.published.append((key, json.loads(value)))
+
+
+class FakeAsyncRedis:
+    """In-memory stand-in for the shared Redis tier."""
+
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+def _cache(client, max_entries=10):
+    """Build a read cache over ``client``."""
+    return TaskReadCache(max_entries, 300, 30, client)
+
+
+class TestTaskReadCache:
+    """Test the read-through cache of terminal tasks."""
+
+    def test_fill_then_hit(self):
+        """Test that a stored payload is served from the shared tier."""
+        client = FakeAsyncRedis()
+        asyncio.run(_cache(client).put(1, b"{}"))
+
+        assert asyncio.run(_cache(client).get(1)) == b"{}"
+        assert asyncio.run(_cache(client).get(2)) is None
+
+    def test_invalidation_evicts_and_tombstones(self):
+        """Test that an invalidated task is dropped from both tiers."""
+        client = FakeAsyncRedis()
+        cache = _cache(client)
+        asyncio.run(cache.put(1, b"{}"))
+
+        asyncio.run(cache.invalidate([1]))
+
+        assert asyncio.run(cache.get(1)) is None
+        assert client.data[cache_key(1)] == b""
+        assert client.published == [(INVALIDATION_CHANNEL, {"task_ids": [1]})]
+
+    def test_fill_racing_an_invalidation_is_dropped(self):
+        """Test that a stale read cannot overwrite the tombstone."""
+        client = FakeAsyncRedis()
+        cache = _cache(client)
+        asyncio.run(cache.invalidate([1]))
+
+        asyncio.run(cache.put(1, b'{"status": "stale"}'))
+
+        assert asyncio.run(cache.get(1)) is None
+
+    def test_local_tier_is_bounded(self):
+        """Test that the local tier keeps the most recently used entries."""
+        client = FakeAsyncRedis()
+        cache = _cache(client, max_entries=2)
+        for task_id in (1, 2, 3):
+            asyncio.run(cache.put(task_id, b"{}"))
+        client.data.clear()
+
+        assert [asyncio.run(cache.get(i)) for i in (1, 2, 3)] == [None, b"{}", b"{}"]
+
+    def test_invalidations_are_chunked(self):
+        """Test that large invalidations are split into bounded messages."""
+        chunks = list(invalidation_chunks(list(range(INVALIDATION_CHUNK * 2 + 1))))
+
+        assert [len(chunk) for chunk in chunks] == [INVALIDATION_CHUNK] * 2 + [1]
@@ -0,0 +1,169 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.task import Task, TaskOutbox, TaskStatus, TaskType
+from app.services import task_service
+from app.services.task_service import AsyncTaskService, TaskService
+
+
+def _sql(statement):
+    """Render a statement as PostgreSQL with literal parameters."""
+    return str(
+        statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+@pytest.fixture
+def db():
+    """Synchronous session double recording executed statements."""
+    return mock.MagicMock()
+
+
+def _executed(db):
+    """Return the SQL of every statement executed on ``db``."""
+    return [_sql(call.args[0]) for call in db.execute.call_args_list]
+
+
+class TestClaimGuards:
+    """Test the status guards of claiming and finishing tasks."""
+
+    def test_claim_only_matches_waiting_or_stale_running_tasks(self, db):
+        """Test that a claim cannot take a task another worker is running."""
+        TaskService(db).claim(7, 0, dispatch_version=3)
+
+        (sql,) = _executed(db)
+        assert "UPDATE tasks SET status='running'" in sql
+        assert "tasks.status IN ('pending', 'queued', 'failed')" in sql
+        assert "tasks.status = 'running' AND tasks.started_at <" in sql
+        assert "tasks.dispatch_version = 3" in sql
+        assert "RETURNING" in sql
+
+    def test_claim_takeover_can_be_disabled(self, db, monkeypatch):
+        """Test that a zero running timeout never reclaims running tasks."""
+        settings = task_service.get_settings()
+        monkeypatch.setattr(settings, "task_running_timeout_seconds", 0)
+
+        TaskService(db).claim(7, 0)
+
+        (sql,) = _executed(db)
+        assert "tasks.status IN ('pending', 'queued', 'failed')" in sql
+        assert "started_at <" not in sql
+
+    def test_claim_many_guards_each_version(self, db):
+        """Test that a batch claim matches task ids at their dispatch version."""
+        TaskService(db).claim_many([(1, 0), (2, 4)])
+
+        (sql,) = _executed(db)
+        assert "(tasks.id, tasks.dispatch_version) IN ((1, 0), (2, 4))" in sql
+        assert "tasks.status IN ('pending', 'queued', 'failed')" in sql
+
+    def test_claim_many_of_nothing_skips_the_database(self, db):
+        """Test that an empty batch claims nothing."""
+        assert TaskService(db).claim_many([]) == []
+        db.execute.assert_not_called()
+
+    def test_finish_many_sends_one_update_per_table(self, db):
+        """Test that batch outcomes are joined from a VALUES list, not looped."""
+        TaskService(db).finish_many(
+            [
+                {"id": 1, "status": TaskStatus.success, "result": 3},
+                {"id": 2, "status": TaskStatus.queued, "error_message": "boom"},
+                {"id": 3, "status": TaskStatus.success, "results_packed": b"\x01"},
+            ]
+        )
+
+        payloads, outcomes = _executed(db)
+        assert "UPDATE task_payloads SET results=" in payloads
+        assert "WHERE task_payloads.task_id = updates.task_id" in payloads
+        assert "(1, NULL, 3, 'success')" in outcomes
+        assert "(2, 'boom', NULL, 'queued')" in outcomes
+        status = "coalesce(CAST(updates.status AS taskstatus), tasks.status)"
+        assert f"status={status}" in outcomes
+        assert "tasks.id = updates.id AND tasks.status = 'running'" in outcomes
+        for call in db.execute.call_args_list:
+            assert len(call.args) == 1
+
+    def test_finish_only_updates_running_task(self, db):
+        """Test that an outcome cannot overwrite a task that moved on."""
+        db.execute.return_value.rowcount = 0
+
+        assert TaskService(db).finish(7, status="completed") is False
+
+        (sql,) = _executed(db)
+        assert "WHERE tasks.id = 7 AND tasks.status = 'running'" in sql
+
+
+class TestRetry:
+    """Test retrying a failed task."""
+
+    def test_retry_stages_a_new_dispatch(self, monkeypatch):
+        """Test that a retry re-dispatches the task under a new version."""
+        db = mock.MagicMock(commit=mock.AsyncMock(), execute=mock.AsyncMock())
+        monkeypatch.setattr(task_service, "invalidate_task_reads", mock.AsyncMock())
+        task = Task(
+            id=7,
+            type=TaskType.batch,
+            status=TaskStatus.failed,
+            error_message="boom",
+            retry_count=3,
+            dispatch_version=2,
+        )
+
+        asyncio.run(AsyncTaskService(db).retry(task))
+
+        assert task.status == TaskStatus.pending
+        assert (task.error_message, task.retry_count) == (None, 0)
+        assert task.dispatch_version == 3
+        (staged,) = [call.args[0] for call in db.add.call_args_list]
+        assert isinstance(staged, TaskOutbox) and staged.task_id == 7
+        (cleared,) = [_sql(call.args[0]) for call in db.execute.call_args_list]
+        assert "UPDATE task_payloads SET results=NULL" in cleared
+        db.commit.assert_awaited_once()
+
+
+class TestBulkStatements:
+    """Test the single-statement bulk retry and reprioritization."""
+
+    # Rendering the NULLs of an UPDATE nested in a CTE as literals warns
+    @pytest.mark.filterwarnings("ignore:Bound parameter")
+    def test_bulk_retry_resets_like_a_single_retry(self):
+        """Test that bulk retry drops old results, aging and messages."""
+        sql = _sql(task_service._bulk_retry_statement([]))
+
+        assert "tasks.status = 'failed'" in sql
+        assert "effective_priority=NULL" in sql
+        assert "result=NULL" in sql
+        assert "dispatch_version=(tasks.dispatch_version + 1)" in sql
+        assert "UPDATE task_payloads SET results=NULL" in sql
+        assert "INSERT INTO task_outbox" in sql
+
+    def test_bulk_reprioritize_only_redispatches_waiting_tasks(self):
+        """Test that running tasks keep their version and get no dispatch."""
+        sql = _sql(task_service._bulk_reprioritize_statement([], 2))
+
+        waiting = "WHEN (tasks.status IN ('pending', 'queued'))"
+        assert f"dispatch_version=CASE {waiting} THEN tasks.dispatch_version + 1" in sql
+        assert "ELSE tasks.dispatch_version END" in sql
+        assert "WHERE moved.status IN ('pending', 'queued')" in sql
+
+
+class TestIdempotencyKeyPurge:
+    """Test purging expired Idempotency-Keys."""
+
+    def test_purge_deletes_keys_past_their_ttl(self, db, monkeypatch):
+        """Test that only keys created before the TTL cutoff are deleted."""
+        settings = task_service.get_settings()
+        monkeypatch.setattr(settings, "idempotency_key_ttl_seconds", 3600)
+        db.execute.return_value.rowcount = 2
+
+        assert TaskService(db).purge_idempotency_keys() == 2
+
+        (sql,) = _executed(db)
+        assert sql.startswith("DELETE FROM idempotency_keys")
+        assert "WHERE idempotency_keys.created_at <=" in sql
+        db.commit.assert_called_once()
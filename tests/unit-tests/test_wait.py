@@ -0,0 +1,19 @@
+class TestWaitForTasks:
+    """Test request validation of the multi-task long-poll."""
+
+    def test_rejects_more_than_100_ids(self, client, db):
+        """Test that the id list is capped before touching the database."""
+        response = client.get(
+            "/api/v1/tasks/wait", params={"ids": list(range(1, 102)), "wait": 0}
+        )
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["query", "ids"]
+        db.execute.assert_not_called()
+
+    def test_requires_ids(self, client, db):
+        """Test that at least one id is required."""
+        response = client.get("/api/v1/tasks/wait", params={"wait": 0})
+
+        assert response.status_code == 422
+        db.execute.assert_not_called()